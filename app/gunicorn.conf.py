@@ -0,0 +1,103 @@
+"""Gunicorn settings, read from the working directory (app/) by default.
+
+Two pools share this file, picked with GUNICORN_POOL:
+
+- `web` (default) serves every page. Most of a request is spent waiting on the
+  database, so each worker runs threads (`gthread`): workers follow the CPU
+  count and threads follow the share of a request spent off the CPU
+  (GUNICORN_IO_SHARE, default 0.75, gives 4 threads). GUNICORN_MODE=uvicorn
+  runs the ASGI app under uvicorn workers with the async views instead; the
+  workers see each other's seat updates through the shared cache (portal/streams.py),
+  so don't run more than one with a per-process cache (portal.W002).
+- `pdf` serves the transcript PDFs. Rendering is CPU-bound, so it runs plain
+  sync workers, one per CPU, with a longer timeout and earlier recycling. Run
+  it as a second gunicorn and route the `.pdf` paths to it at the proxy
+  (README, "App server (gunicorn)").
+
+With `preload_app` (GUNICORN_PRELOAD, on by default) the master imports the
+Django app once and `when_ready` warms the URLconf, templates and ReportLab
+(university_portal/warmup.py) before any worker is forked, so workers start
+with all of it loaded and share those pages copy-on-write. Code changes then
+need a full restart (not a HUP) to reach the workers.
+
+Workers are recycled after `max_requests` (jittered, so they don't all restart
+at once); `worker_exit` writes the buffered audit rows and the metrics
+snapshot first (portal/lifecycle.py) so a recycled or stopped worker loses
+neither.
+"""
+
+import gc
+import math
+import os
+import sys
+
+# The config is loaded before gunicorn puts the app directory on sys.path.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from university_portal.server_sizing import UVICORN_WORKER, cpu_count, server_plan  # noqa: E402
+
+
+def _env_bool(name, default):
+	return os.environ.get(name, "1" if default else "0").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_int(name, default):
+	value = os.environ.get(name, "").strip()
+	return int(value) if value else default
+
+
+# Worker and thread counts come from server_sizing, which the settings also use
+# for the Postgres pool size and the capacity check (portal.W001).
+plan = server_plan()
+pool = plan.pool
+cpus = cpu_count()
+worker_class = plan.worker_class
+workers = plan.workers
+threads = plan.threads
+wsgi_app = "university_portal.wsgi:application"
+
+if pool == "pdf":
+	timeout = _env_int("GUNICORN_TIMEOUT", 120)
+	max_requests = _env_int("GUNICORN_MAX_REQUESTS", 200)
+	default_port = 8001
+elif worker_class == UVICORN_WORKER:
+	wsgi_app = "university_portal.asgi:application"
+	timeout = _env_int("GUNICORN_TIMEOUT", 30)
+	max_requests = _env_int("GUNICORN_MAX_REQUESTS", 2000)
+	default_port = 8000
+	os.environ.setdefault("DJANGO_ASYNC_VIEWS", "1")
+else:
+	timeout = _env_int("GUNICORN_TIMEOUT", 30)
+	max_requests = _env_int("GUNICORN_MAX_REQUESTS", 2000)
+	default_port = 8000
+
+bind = os.environ.get("GUNICORN_BIND") or f"0.0.0.0:{os.environ.get('PORT', default_port)}"
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", math.ceil(max_requests / 10))
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+# Longer than the proxy's idle timeout would close connections under it; 5 s
+# suits a proxy on the same host or network.
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+# Worker heartbeat files on tmpfs: a slow disk (Docker's overlay) can stall them.
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+preload_app = _env_bool("GUNICORN_PRELOAD", True)
+
+
+def when_ready(server):
+	if not server.cfg.preload_app:
+		return
+	from university_portal.warmup import warm_up
+
+	timings = warm_up()
+	server.log.info("Warmed up before forking: %s", ", ".join(f"{k} {v * 1000:.0f} ms" for k, v in timings.items()))
+	# Keep the garbage collector from touching (and so copying) the preloaded objects in each worker.
+	gc.freeze()
+
+
+def worker_exit(server, worker):
+	from django.apps import apps
+
+	# Uvicorn workers don't get here; they flush on the ASGI lifespan shutdown.
+	if apps.ready:
+		from portal.lifecycle import flush_buffers
+
+		flush_buffers()
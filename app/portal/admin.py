@@ -4,11 +4,15 @@ from .models import (
 	Announcement,
 	AuditLog,
 	Course,
+	CourseRequisite,
+	DegreeProgram,
+	DegreeRequirement,
 	Enrollment,
 	FeeInvoice,
 	Grade,
 	Section,
 	SectionInstructor,
+	StudentProgram,
 	SupportMessage,
 	SupportTicket,
 	Term,
@@ -23,10 +27,18 @@ class TermAdmin(admin.ModelAdmin):
 	list_filter = ("is_active",)
 
 
+class CourseRequisiteInline(admin.TabularInline):
+	model = CourseRequisite
+	fk_name = "course"
+	autocomplete_fields = ("required_course",)
+	extra = 0
+
+
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
 	list_display = ("code", "title", "department", "credits")
 	search_fields = ("code", "title")
+	inlines = (CourseRequisiteInline,)
 
 
 @admin.register(Section)
@@ -56,6 +68,27 @@ class GradeAdmin(admin.ModelAdmin):
 	search_fields = ("student__username", "section__course__code")
 
 
+class DegreeRequirementInline(admin.StackedInline):
+	model = DegreeRequirement
+	autocomplete_fields = ("courses",)
+	extra = 0
+
+
+@admin.register(DegreeProgram)
+class DegreeProgramAdmin(admin.ModelAdmin):
+	list_display = ("code", "name", "total_credits")
+	search_fields = ("code", "name")
+	inlines = (DegreeRequirementInline,)
+
+
+@admin.register(StudentProgram)
+class StudentProgramAdmin(admin.ModelAdmin):
+	list_display = ("student", "program", "cohort", "advisor", "declared_at")
+	list_filter = ("program", "cohort")
+	search_fields = ("student__username", "advisor__username")
+	autocomplete_fields = ("student", "advisor")
+
+
 @admin.register(Announcement)
 class AnnouncementAdmin(admin.ModelAdmin):
 	list_display = ("title", "created_by", "publish_at", "expire_at", "is_pinned")
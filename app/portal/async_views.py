@@ -0,0 +1,205 @@
+"""Async variants of the read-heavy views, for serving the portal over ASGI.
+
+`portal.urls` routes the dashboard, catalog, course detail, announcements,
+grades and timetable here instead of `portal.views` when
+`PORTAL_ASYNC_VIEWS` is on. The pages and their context are the same.
+
+Django's async ORM (`afirst`, `async for`) runs each request's queries one
+after another on that request's sync thread, so `asyncio.gather` over them
+would not overlap anything. Independent queries are therefore run with
+`_pooled`, each in the shared thread pool on its own connection, and
+gathered; dependent single queries use the async ORM directly. Querysets are
+evaluated before rendering, and templates are rendered via `sync_to_async`
+because context processors still query the database.
+
+These views don't run inside `ATOMIC_REQUESTS` transactions (Django rejects
+async views there); they only read.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.db import close_old_connections, transaction
+from django.http import Http404, HttpRequest, HttpResponse
+from django.shortcuts import render
+from django.urls import reverse
+from django.utils import timezone
+
+from . import availability, requisites, streams
+from . import dashboard as dashboard_panels
+from .catalog import search_catalog
+from .dashboard import announcements_for
+from .db_routing import reads_from_replica
+from .models import Course, Enrollment, Grade, Section, Term, with_seats_taken
+from .views import _require_role, _timetable_sections, timetable_feed_token
+
+
+def _pooled(func, *args, **kwargs):
+	"""Awaitable running `func` in the shared thread pool, so gathered calls overlap."""
+
+	def call():
+		close_old_connections()
+		try:
+			return func(*args, **kwargs)
+		finally:
+			close_old_connections()
+
+	return sync_to_async(call, thread_sensitive=False)()
+
+
+async def _render(request: HttpRequest, template_name: str, context: dict) -> HttpResponse:
+	return await sync_to_async(render)(request, template_name, context)
+
+
+def _active_term() -> Term | None:
+	return Term.objects.filter(is_active=True).order_by("-start_date").first()
+
+
+@transaction.non_atomic_requests
+@login_required
+async def dashboard(request: HttpRequest) -> HttpResponse:
+	user = await request.auser()
+	now = timezone.now()
+	versions = await _pooled(dashboard_panels.panel_versions, user.pk)
+	active_term, announcements, my_sections, my_teaching, open_tickets = await asyncio.gather(
+		_pooled(dashboard_panels.active_term, versions),
+		_pooled(dashboard_panels.announcements, user, versions, now),
+		_pooled(dashboard_panels.enrolled_sections, user, versions),
+		_pooled(dashboard_panels.teaching_sections, user, versions),
+		_pooled(dashboard_panels.open_tickets, user, versions),
+	)
+	context = {
+		"active_term": active_term,
+		"announcements": announcements,
+		"my_sections": my_sections,
+		"my_teaching": my_teaching,
+		"open_tickets": open_tickets,
+	}
+	return await _render(request, "portal/dashboard.html", context)
+
+
+@transaction.non_atomic_requests
+@login_required
+@reads_from_replica
+async def courses(request: HttpRequest) -> HttpResponse:
+	try:
+		page = int(request.GET.get("page") or 1)
+	except ValueError:
+		page = 1
+	active_term, result = await asyncio.gather(
+		_pooled(_active_term),
+		_pooled(
+			search_catalog,
+			q=request.GET.get("q") or "",
+			department=request.GET.get("department") or "",
+			level=request.GET.get("level") or "",
+			page=page,
+		),
+	)
+	return await _render(
+		request, "portal/courses.html", {"active_term": active_term, "catalog": result, "courses": result["courses"]}
+	)
+
+
+def _term_sections(course: Course, term: Term) -> list[Section]:
+	return list(Section.objects.select_related("term").filter(course=course, term=term).order_by("section_code"))
+
+
+def _all_sections(course: Course) -> list[Section]:
+	return list(with_seats_taken(Section.objects.select_related("term").filter(course=course).order_by("section_code")))
+
+
+def _enrolled_section_ids(user, course: Course, term: Term | None) -> set[int]:
+	qs = Enrollment.objects.filter(student=user, section__course=course, status=Enrollment.Status.ENROLLED)
+	if term is not None:
+		qs = qs.filter(section__term=term)
+	return set(qs.values_list("section_id", flat=True))
+
+
+@transaction.non_atomic_requests
+@login_required
+@reads_from_replica
+async def course_detail(request: HttpRequest, code: str) -> HttpResponse:
+	user = await request.auser()
+	active_term, course, requirements = await asyncio.gather(
+		_pooled(_active_term),
+		Course.objects.filter(code=code.upper()).afirst(),
+		_pooled(requisites.requirements_map),
+	)
+	if course is None:
+		raise Http404("No Course matches the given query.")
+
+	stream_url = None
+	if active_term:
+		sections, seats, enrolled = await asyncio.gather(
+			_pooled(_term_sections, course, active_term),
+			_pooled(availability.seats_taken, active_term.id),
+			_pooled(_enrolled_section_ids, user, course, active_term),
+		)
+		for section in sections:
+			section.seats_taken = seats.get(section.id, 0)
+		if sections:
+			stream_url = streams.stream_url(user, [section.id for section in sections])
+	else:
+		sections, enrolled = await asyncio.gather(
+			_pooled(_all_sections, course),
+			_pooled(_enrolled_section_ids, user, course, None),
+		)
+	return await _render(
+		request,
+		"portal/course_detail.html",
+		{
+			"active_term": active_term,
+			"course": course,
+			"requirements": requirements.get(course.code),
+			"sections": sections,
+			"enrolled_section_ids": enrolled,
+			"seat_stream_url": stream_url,
+		},
+	)
+
+
+@transaction.non_atomic_requests
+@login_required
+@reads_from_replica
+async def announcements(request: HttpRequest) -> HttpResponse:
+	user = await request.auser()
+	now = timezone.now()
+	qs = await sync_to_async(announcements_for)(user)  # reads the cached role names
+	items = [a async for a in qs[:200] if a.is_active(now)]
+	return await _render(request, "portal/announcements.html", {"announcements": items})
+
+
+@transaction.non_atomic_requests
+@login_required
+@reads_from_replica
+async def grades(request: HttpRequest) -> HttpResponse:
+	await sync_to_async(_require_role)(request, "STUDENT")
+
+	user = await request.auser()
+	grades_qs = (
+		Grade.objects.select_related("section__course", "section__term")
+		.filter(student=user, released=True)
+		.order_by("-section__term__start_date", "section__course__code")
+	)
+	return await _render(request, "portal/grades.html", {"grades": [g async for g in grades_qs]})
+
+
+@transaction.non_atomic_requests
+@login_required
+@reads_from_replica
+async def timetable(request: HttpRequest) -> HttpResponse:
+	await sync_to_async(_require_role)(request, "STUDENT", "FACULTY")
+
+	user = await request.auser()
+	active_term = await Term.objects.filter(is_active=True).order_by("-start_date").afirst()
+	sections_qs = await sync_to_async(_timetable_sections)(user, active_term)
+	feed_url = request.build_absolute_uri(reverse("portal:timetable_feed", kwargs={"token": timetable_feed_token(user)}))
+	return await _render(
+		request,
+		"portal/timetable.html",
+		{"active_term": active_term, "sections": [s async for s in sections_qs], "feed_url": feed_url},
+	)
@@ -0,0 +1,58 @@
+"""Audit log writer with optional in-memory buffering.
+
+By default every audit row is written immediately. With
+`PORTAL_AUDIT_BUFFER_SIZE > 0` rows are queued in process memory and written
+with one `bulk_create` once the queue is full or `PORTAL_AUDIT_FLUSH_SECONDS`
+have passed. Flushes happen at request boundaries (outside any view
+transaction) and from the gunicorn worker exit hook; rows still queued when a
+process is killed are lost, which is why buffering is opt-in.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from django.conf import settings
+
+from . import metrics
+from .models import AuditLog
+
+_lock = threading.Lock()
+_queue: list[AuditLog] = []
+_last_flush = time.monotonic()
+
+
+def write(entry: AuditLog) -> None:
+	if getattr(settings, "PORTAL_AUDIT_BUFFER_SIZE", 0) <= 0:
+		entry.save()
+		return
+	with _lock:
+		_queue.append(entry)
+
+
+def queue_depth() -> int:
+	return len(_queue)
+
+
+def flush() -> int:
+	global _last_flush
+	with _lock:
+		rows = _queue[:]
+		_queue.clear()
+		_last_flush = time.monotonic()
+	if rows:
+		AuditLog.objects.bulk_create(rows, batch_size=500)
+	return len(rows)
+
+
+def flush_if_due() -> None:
+	if not _queue:
+		return
+	size = getattr(settings, "PORTAL_AUDIT_BUFFER_SIZE", 0)
+	interval = getattr(settings, "PORTAL_AUDIT_FLUSH_SECONDS", 5)
+	if len(_queue) >= size or time.monotonic() - _last_flush >= interval:
+		flush()
+
+
+metrics.register_gauge("portal_audit_queue_depth", queue_depth)
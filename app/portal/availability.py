@@ -0,0 +1,162 @@
+"""Short-lived shared cache of section availability for registration traffic.
+
+The per-term listing (course, meeting pattern, capacity) changes rarely and is
+cached under the `schedule` version counter. Seats taken change constantly,
+so they live in a separate per-term entry that is:
+
+- fresh for `PORTAL_AVAILABILITY_FRESH_SECONDS` (default 1s);
+- recomputed by one process at a time (a `cache.add` lock) while the others
+  keep serving the previous copy for up to `PORTAL_AVAILABILITY_STALE_SECONDS`
+  (default 2s), so a burst of reloads never stampedes the database;
+- patched in place when an enrollment commits (`push_section`, wired in
+  `portal.signals`), so a section usually shows as full right away. The same
+  update is published to live seat streams (`portal.pubsub`).
+
+The displayed counts are advisory: `registration_add_drop` re-checks capacity
+under a row lock before enrolling.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import time as dtime
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from . import metrics, pubsub
+from .caching import get_version
+from .db_routing import use_primary
+from .models import Enrollment, Section, Term, with_seats_taken
+
+LISTING_SECONDS = 60 * 10
+SEATS_TTL = 60
+LOCK_SECONDS = 5
+LOCK_POLL_SECONDS = 0.01
+
+
+class CourseRef(NamedTuple):
+	code: str
+	title: str
+
+
+@dataclass
+class SectionRow:
+	id: int
+	course: CourseRef
+	section_code: str
+	capacity: int
+	meeting_days: str
+	start_time: dtime | None
+	end_time: dtime | None
+	location: str
+	enrolled_count: int = 0
+	# Set per student by registration when the student can't add the section (see portal.requisites).
+	unmet_requisites: str = ""
+
+	def has_seats(self) -> bool:
+		return self.enrolled_count < self.capacity
+
+
+def _fresh_seconds() -> float:
+	return getattr(settings, "PORTAL_AVAILABILITY_FRESH_SECONDS", 1.0)
+
+
+def _stale_seconds() -> float:
+	return getattr(settings, "PORTAL_AVAILABILITY_STALE_SECONDS", 2.0)
+
+
+def _seats_key(term_id: int) -> str:
+	return f"portal:avail:seats:{term_id}"
+
+
+def _listing(term: Term) -> list[tuple]:
+	# Plain tuples: unpickling them is far cheaper than model instances.
+	key = f"portal:avail:rows:{term.id}:{get_version('schedule')}"
+	rows = cache.get(key)
+	if rows is None:
+		with use_primary():
+			rows = list(
+				Section.objects.filter(term=term)
+				.order_by("course__code", "section_code")
+				.values_list(
+					"id", "course__code", "course__title", "section_code", "capacity",
+					"meeting_days", "start_time", "end_time", "location",
+				)
+			)
+		cache.set(key, rows, LISTING_SECONDS)
+	return rows
+
+
+def _count_seats(term_id: int) -> dict[int, int]:
+	with use_primary():
+		return dict(
+			Enrollment.objects.filter(section__term_id=term_id, status=Enrollment.Status.ENROLLED)
+			.values_list("section_id")
+			.annotate(n=Count("id"))
+			.order_by()
+		)
+
+
+def seats_taken(term_id: int) -> dict[int, int]:
+	"""Enrolled count per section id for a term (sections with no enrollments are absent)."""
+	key = _seats_key(term_id)
+	entry = cache.get(key)
+	age = time.time() - entry["built"] if entry else None
+	if age is not None and age <= _fresh_seconds():
+		metrics.cache_lookup("availability", True)
+		return entry["seats"]
+
+	lock_key = f"{key}:lock"
+	if cache.add(lock_key, 1, LOCK_SECONDS):
+		try:
+			metrics.cache_lookup("availability", False)
+			seats = _count_seats(term_id)
+			cache.set(key, {"built": time.time(), "seats": seats}, SEATS_TTL)
+			return seats
+		finally:
+			cache.delete(lock_key)
+
+	# Someone else is recomputing: serve the previous copy while it is recent enough,
+	# otherwise wait briefly for theirs before giving up and counting ourselves.
+	if age is not None and age <= _stale_seconds():
+		metrics.cache_lookup("availability", True)
+		return entry["seats"]
+	deadline = time.monotonic() + max(0.0, _stale_seconds() - (age or 0.0))
+	while time.monotonic() < deadline:
+		time.sleep(LOCK_POLL_SECONDS)
+		entry = cache.get(key)
+		if entry and time.time() - entry["built"] <= _fresh_seconds():
+			metrics.cache_lookup("availability", True)
+			return entry["seats"]
+	metrics.cache_lookup("availability", False)
+	return _count_seats(term_id)
+
+
+def term_sections(term: Term) -> list[SectionRow]:
+	"""Sections of a term with current enrolled counts, ordered by course code."""
+	seats = seats_taken(term.id)
+	return [
+		SectionRow(sid, CourseRef(code, title), section_code, capacity, days, start, end, location, seats.get(sid, 0))
+		for sid, code, title, section_code, capacity, days, start, end, location in _listing(term)
+	]
+
+
+def push_section(section_id: int) -> None:
+	"""Publish a section's committed enrolled count and write it into its term's cached entry."""
+	row = with_seats_taken(Section.objects.filter(id=section_id)).values_list("term_id", "seats_taken").first()
+	if row is None:
+		return
+	term_id, count = row
+	pubsub.broker.publish((pubsub.section_topic(section_id), pubsub.term_topic(term_id)), section_id, count)
+	key = _seats_key(term_id)
+	entry = cache.get(key)
+	if entry is None:
+		return
+	# Read-modify-write without a lock: a concurrent push can be lost, but the
+	# entry's build time is kept, so it is still recomputed within the fresh window.
+	entry["seats"][section_id] = count
+	cache.set(key, entry, SEATS_TTL)
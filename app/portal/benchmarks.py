@@ -0,0 +1,209 @@
+"""View-level benchmarks with per-view query budgets.
+
+Each scenario names a view, how to find a suitable user and URL in the current
+database, and the maximum number of SQL queries one request may run. Budgets
+are independent of data size: a view that issues a query per row (N+1) blows
+its budget on the synthetic dataset (`manage.py seed_scale`) even if it fits on
+a small fixture. Used by `manage.py bench_views` and the test suite.
+"""
+
+from __future__ import annotations
+
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Course, Enrollment, SectionInstructor, Term, TranscriptRequest
+from .roles import ROLE_FINANCE, ROLE_IT_ADMIN, ROLE_REGISTRAR, ROLE_STUDENT
+
+
+@dataclass
+class Scenario:
+	name: str
+	max_queries: int
+	# Returns (user, url) or None when the database has nothing suitable.
+	resolve: Callable[[], tuple[object, str] | None]
+
+
+def _active_term():
+	return Term.objects.filter(is_active=True).order_by("-start_date").first()
+
+
+def _student():
+	term = _active_term()
+	enrollment = (
+		Enrollment.objects.select_related("student")
+		.filter(status=Enrollment.Status.ENROLLED, section__term=term, student__groups__name=ROLE_STUDENT)
+		.order_by("id")
+		.first()
+	)
+	return enrollment.student if enrollment else None
+
+
+def _staff(*group_names: str):
+	User = get_user_model()
+	user = User.objects.filter(groups__name__in=group_names, is_active=True).order_by("id").first()
+	return user or User.objects.filter(is_superuser=True, is_active=True).order_by("id").first()
+
+
+def _with_user(user, url: str):
+	return (user, url) if user else None
+
+
+def _dashboard():
+	return _with_user(_student(), reverse("portal:dashboard"))
+
+
+def _registration():
+	return _with_user(_student(), reverse("portal:registration"))
+
+
+def _course_detail():
+	term = _active_term()
+	course = Course.objects.filter(section__term=term).order_by("code").first() if term else None
+	if course is None:
+		return None
+	return _with_user(_student(), reverse("portal:course_detail", kwargs={"code": course.code}))
+
+
+def _registrar_queue():
+	return _with_user(_staff(ROLE_REGISTRAR, ROLE_IT_ADMIN), reverse("portal:registrar_queue"))
+
+
+def _finance():
+	return _with_user(_staff(ROLE_FINANCE, ROLE_IT_ADMIN), reverse("portal:finance"))
+
+
+def _faculty_grades():
+	link = (
+		SectionInstructor.objects.select_related("instructor")
+		.filter(section__term=_active_term())
+		.order_by("id")
+		.first()
+	)
+	if link is None:
+		return None
+	return link.instructor, reverse("portal:faculty_grades", kwargs={"section_id": link.section_id})
+
+
+def _unofficial_pdf():
+	return _with_user(_student(), reverse("portal:unofficial_transcript_pdf"))
+
+
+def _official_pdf():
+	tr = TranscriptRequest.objects.filter(status=TranscriptRequest.Status.ISSUED).order_by("id").first()
+	if tr is None:
+		return None
+	return _with_user(
+		_staff(ROLE_REGISTRAR, ROLE_IT_ADMIN), reverse("portal:official_transcript_pdf", kwargs={"request_id": tr.id})
+	)
+
+
+SCENARIOS: list[Scenario] = [
+	Scenario("dashboard", 2, _dashboard),
+	Scenario("registration_add_drop", 14, _registration),
+	Scenario("course_detail", 14, _course_detail),
+	Scenario("registrar_queue", 12, _registrar_queue),
+	Scenario("finance", 15, _finance),
+	Scenario("faculty_grades", 15, _faculty_grades),
+	Scenario("unofficial_transcript_pdf", 7, _unofficial_pdf),
+	Scenario("official_transcript_pdf", 9, _official_pdf),
+]
+
+
+def _student_page(url_name: str):
+	return lambda: _with_user(_student(), reverse(f"portal:{url_name}"))
+
+
+# Further pages rendered by the template profiler (`manage.py profile_templates`),
+# which needs every page template rendered but no query budgets.
+TEMPLATE_PAGES: list[tuple[str, Callable[[], tuple[object, str] | None]]] = [
+	*((s.name, s.resolve) for s in SCENARIOS if not s.name.endswith("_pdf")),
+	*((name, _student_page(name)) for name in ("profile", "courses", "announcements", "timetable", "grades")),
+	*((name, _student_page(name)) for name in ("transcript_requests", "transcript_request_new", "support", "support_new")),
+	("registrar_schedule", lambda: _with_user(_staff(ROLE_REGISTRAR, ROLE_IT_ADMIN), reverse("portal:registrar_schedule"))),
+	("admin_users_new", lambda: _with_user(_staff(ROLE_IT_ADMIN), reverse("portal:admin_users_new"))),
+]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+	"""Nearest-rank percentile."""
+	if not samples:
+		return 0.0
+	ordered = sorted(samples)
+	rank = max(1, min(len(ordered), int(round(pct / 100.0 * len(ordered) + 0.5))))
+	return ordered[rank - 1]
+
+
+def run(iterations: int = 20, warmup: int = 2, names: list[str] | None = None) -> dict[str, dict]:
+	"""Benchmark each scenario in-process and return latency/query stats per view."""
+	results: dict[str, dict] = {}
+	for scenario in SCENARIOS:
+		if names and scenario.name not in names:
+			continue
+		resolved = scenario.resolve()
+		if resolved is None:
+			results[scenario.name] = {"skipped": "no suitable data", "max_queries": scenario.max_queries}
+			continue
+		user, url = resolved
+		client = Client()
+		client.force_login(user)
+		for _ in range(warmup):
+			client.get(url)
+
+		latencies: list[float] = []
+		queries: list[int] = []
+		status = None
+		for _ in range(max(1, iterations)):
+			with CaptureQueriesContext(connection) as ctx:
+				started = time.perf_counter()
+				response = client.get(url)
+				if getattr(response, "streaming", False):
+					b"".join(response.streaming_content)
+				latencies.append((time.perf_counter() - started) * 1000)
+			queries.append(len(ctx.captured_queries))
+			status = response.status_code
+
+		results[scenario.name] = {
+			"url": url,
+			"status": status,
+			"iterations": len(latencies),
+			"p50_ms": round(percentile(latencies, 50), 3),
+			"p90_ms": round(percentile(latencies, 90), 3),
+			"p99_ms": round(percentile(latencies, 99), 3),
+			"mean_ms": round(statistics.fmean(latencies), 3),
+			"queries": max(queries),
+			"max_queries": scenario.max_queries,
+		}
+	return results
+
+
+def check(results: dict[str, dict], baseline: dict | None = None, threshold: float = 0.25) -> list[str]:
+	"""Return human-readable failures: budget overruns, non-200s and regressions vs. a baseline."""
+	failures: list[str] = []
+	base_views = (baseline or {}).get("views", {})
+	for name, stats in results.items():
+		if "skipped" in stats:
+			continue
+		if stats["status"] != 200:
+			failures.append(f"{name}: HTTP {stats['status']}")
+		if stats["queries"] > stats["max_queries"]:
+			failures.append(f"{name}: {stats['queries']} queries exceeds budget of {stats['max_queries']}")
+		base = base_views.get(name)
+		if base and base.get("p50_ms"):
+			limit = base["p50_ms"] * (1 + threshold)
+			if stats["p50_ms"] > limit:
+				failures.append(
+					f"{name}: p50 {stats['p50_ms']:.1f}ms regressed more than {threshold:.0%} "
+					f"over baseline {base['p50_ms']:.1f}ms"
+				)
+		if base and stats["queries"] > base.get("queries", stats["queries"]):
+			failures.append(f"{name}: {stats['queries']} queries, baseline had {base['queries']}")
+	return failures
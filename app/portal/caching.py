@@ -0,0 +1,48 @@
+"""Cache helpers shared by the portal's cached views.
+
+Cached content is keyed by integer version counters stored in the cache itself.
+Model signals (see `portal.signals`) bump a counter whenever the rows behind it
+change, so stale entries are never read again and simply expire.
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.core.cache import cache
+
+VERSION_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def _version_key(scope: str, key: object = "") -> str:
+	return f"portal:v:{scope}:{key}"
+
+
+def _fresh_version() -> int:
+	# Seeding from the clock means an evicted counter never restarts at a value
+	# that was already used to build cache keys.
+	return time.time_ns() // 1000
+
+
+def get_version(scope: str, key: object = "") -> int:
+	return get_versions([(scope, key)])[(scope, key)]
+
+
+def get_versions(pairs: list[tuple[str, object]]) -> dict[tuple[str, object], int]:
+	"""Fetch several version counters, normally with a single cache round-trip."""
+	keys = {_version_key(scope, key): (scope, key) for scope, key in pairs}
+	found = cache.get_many(list(keys))
+	missing = [k for k in keys if k not in found]
+	if missing:
+		for cache_key in missing:
+			cache.add(cache_key, _fresh_version(), VERSION_TIMEOUT)
+		found.update(cache.get_many(missing))
+	return {pair: int(found.get(cache_key) or 0) for cache_key, pair in keys.items()}
+
+
+def bump_version(scope: str, key: object = "") -> None:
+	cache_key = _version_key(scope, key)
+	try:
+		cache.incr(cache_key)
+	except ValueError:
+		cache.set(cache_key, _fresh_version(), VERSION_TIMEOUT)
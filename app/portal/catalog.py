@@ -0,0 +1,90 @@
+"""Course catalog search with department/level facets."""
+
+from __future__ import annotations
+
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Count, Q
+
+from . import metrics
+from .caching import get_version
+from .db_routing import use_primary
+from .models import Course
+
+PAGE_SIZE = 25
+CACHE_SECONDS = 60 * 10
+
+
+def search_queryset(q: str):
+	"""Courses whose code starts with, or title contains, every word of `q`.
+
+	Codes are stored upper-case, so the code test is a case-sensitive prefix
+	match, which the index on `code` serves (Postgres adds a `varchar_pattern_ops`
+	index for it). A substring match on the title can't use a btree index; on
+	Postgres the trigram index on UPPER(title) from migration 0006 serves it.
+	"""
+	qs = Course.objects.all()
+	for term in q.split():
+		qs = qs.filter(Q(code__startswith=term.upper()) | Q(title__icontains=term))
+	return qs
+
+
+def _facets(q: str, department: str, level: str) -> tuple[list[tuple[str, int]], list[tuple[str, int]], int]:
+	"""Department and level counts from one grouped query.
+
+	Each facet's counts honour the search text and the *other* facet's
+	selection, so picking a department still shows every level available in it.
+	"""
+	departments: dict[str, int] = {}
+	levels: dict[str, int] = {}
+	total = 0
+	rows = search_queryset(q).values_list("department", "level").annotate(n=Count("id")).order_by()
+	for dept, lvl, n in rows:
+		if not level or lvl == level:
+			departments[dept] = departments.get(dept, 0) + n
+		if not department or dept == department:
+			levels[lvl] = levels.get(lvl, 0) + n
+		if (not level or lvl == level) and (not department or dept == department):
+			total += n
+	return sorted(departments.items()), sorted(levels.items()), total
+
+
+def search_catalog(q: str = "", department: str = "", level: str = "", page: int = 1) -> dict:
+	q = " ".join((q or "").split())[:100]
+	params = f"{q}\x1f{department}\x1f{level}\x1f{page}"
+	digest = hashlib.sha1(params.encode("utf-8")).hexdigest()
+	cache_key = f"portal:catalog:{get_version('catalog')}:{digest}"
+	result = cache.get(cache_key)
+	metrics.cache_lookup("catalog", result is not None)
+	if result is not None:
+		return result
+
+	with use_primary():
+		departments, levels, total = _facets(q, department, level)
+		qs = search_queryset(q)
+		if department:
+			qs = qs.filter(department=department)
+		if level:
+			qs = qs.filter(level=level)
+		qs = qs.order_by("code").values("code", "title", "department", "level", "credits")
+
+		paginator = Paginator(qs, PAGE_SIZE)
+		# Reuse the grouped-query total instead of a separate COUNT(*).
+		paginator.count = total
+		page_obj = paginator.get_page(page)
+		courses = list(page_obj.object_list)
+	result = {
+		"q": q,
+		"department": department,
+		"level": level,
+		"courses": courses,
+		"total": total,
+		"page": page_obj.number,
+		"num_pages": paginator.num_pages,
+		"department_facets": departments,
+		"level_facets": levels,
+	}
+	cache.set(cache_key, result, CACHE_SECONDS)
+	return result
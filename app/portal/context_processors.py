@@ -1,25 +1,33 @@
 from __future__ import annotations
 
 from .roles import (
+    ALL_ROLES,
     ROLE_ALUMNI,
     ROLE_FACULTY,
     ROLE_FINANCE,
     ROLE_IT_ADMIN,
     ROLE_REGISTRAR,
     ROLE_STUDENT,
-    user_in_any_group,
+    role_names,
 )
 
 
 def portal_nav(request):
     user = request.user
+    if not user.is_authenticated:
+        names = frozenset()
+    elif user.is_superuser:
+        names = frozenset(ALL_ROLES)
+    else:
+        # One cached lookup for the whole menu.
+        names = role_names(user)
     return {
         "nav": {
-            "is_student": user_in_any_group(user, [ROLE_STUDENT]),
-            "is_faculty": user_in_any_group(user, [ROLE_FACULTY]),
-            "is_registrar": user_in_any_group(user, [ROLE_REGISTRAR, ROLE_IT_ADMIN]),
-            "is_finance": user_in_any_group(user, [ROLE_FINANCE, ROLE_IT_ADMIN]),
-            "is_alumni": user_in_any_group(user, [ROLE_ALUMNI]),
-            "is_admin": user.is_authenticated and (user.is_superuser or user_in_any_group(user, [ROLE_IT_ADMIN])),
+            "is_student": ROLE_STUDENT in names,
+            "is_faculty": ROLE_FACULTY in names,
+            "is_registrar": not names.isdisjoint([ROLE_REGISTRAR, ROLE_IT_ADMIN]),
+            "is_finance": not names.isdisjoint([ROLE_FINANCE, ROLE_IT_ADMIN]),
+            "is_alumni": ROLE_ALUMNI in names,
+            "is_admin": user.is_authenticated and (user.is_superuser or ROLE_IT_ADMIN in names),
         }
     }
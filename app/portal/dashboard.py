@@ -0,0 +1,121 @@
+"""Dashboard panels, cached under version counters.
+
+Each panel's rows are cached under a key built from the version counters of
+the data it shows (bumped by `portal.signals`): enrollments, teaching and open
+tickets per user, announcements per audience (the viewer's set of roles) and
+the active term globally. Course, section and term edits bump `schedule`,
+which is part of every key whose rows show them. A warm dashboard therefore
+runs no queries of its own.
+
+Announcements are cached as the newest candidates for an audience and
+filtered with `is_active(now)` on every request, so publish and expiry times
+take effect without an invalidation.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from . import metrics
+from .caching import get_versions
+from .db_routing import use_primary
+from .models import Announcement, Enrollment, Section, SupportTicket, Term
+from .roles import role_names
+
+PANEL_SECONDS = 60 * 60
+ANNOUNCEMENT_CANDIDATES = 50
+
+_MISSING = object()
+
+
+def announcements_for(user):
+	"""Announcements targeted at `user` (all of them for superusers), pinned first, newest first."""
+	if user.is_superuser:
+		qs = Announcement.objects.all()
+	else:
+		qs = Announcement.objects.filter(Q(target_roles__isnull=True) | Q(target_roles__name__in=role_names(user))).distinct()
+	return qs.order_by("-is_pinned", "-publish_at")
+
+
+def panel_versions(user_id: int) -> dict[str, int]:
+	"""Every version counter the dashboard depends on, in one cache round-trip."""
+	versions = get_versions(
+		[
+			("schedule", ""),
+			("announcements", ""),
+			("enrollments", user_id),
+			("teaching", user_id),
+			("tickets", user_id),
+		]
+	)
+	return {scope: version for (scope, _), version in versions.items()}
+
+
+def _cached(key: str, build):
+	value = cache.get(key, _MISSING)
+	metrics.cache_lookup("dashboard", value is not _MISSING)
+	if value is _MISSING:
+		with use_primary():
+			value = build()
+		cache.set(key, value, PANEL_SECONDS)
+	return value
+
+
+def active_term(versions: dict[str, int]) -> Term | None:
+	return _cached(
+		f"portal:dash:term:{versions['schedule']}",
+		lambda: Term.objects.filter(is_active=True).order_by("-start_date").first(),
+	)
+
+
+def announcements(user, versions: dict[str, int], now) -> list[Announcement]:
+	audience = "*" if user.is_superuser else "\x1f".join(sorted(role_names(user)))
+	digest = hashlib.sha1(audience.encode("utf-8")).hexdigest()
+	candidates = _cached(
+		f"portal:dash:ann:{versions['announcements']}:{digest}",
+		lambda: list(announcements_for(user)[:ANNOUNCEMENT_CANDIDATES]),
+	)
+	return [a for a in candidates if a.is_active(now)]
+
+
+def enrolled_sections(user, versions: dict[str, int]) -> list[Section]:
+	def build():
+		enrollments = Enrollment.objects.select_related("section__course", "section__term").filter(
+			student=user, status=Enrollment.Status.ENROLLED
+		)
+		return [e.section for e in enrollments]
+
+	return _cached(f"portal:dash:sections:{user.pk}:{versions['enrollments']}:{versions['schedule']}", build)
+
+
+def teaching_sections(user, versions: dict[str, int]) -> list[Section]:
+	return _cached(
+		f"portal:dash:teaching:{user.pk}:{versions['teaching']}:{versions['schedule']}",
+		lambda: list(Section.objects.select_related("course", "term").filter(instructors__instructor=user)),
+	)
+
+
+def open_tickets(user, versions: dict[str, int]) -> list[SupportTicket]:
+	return _cached(
+		f"portal:dash:tickets:{user.pk}:{versions['tickets']}",
+		lambda: list(
+			SupportTicket.objects.filter(created_by=user).exclude(
+				status__in=[SupportTicket.Status.RESOLVED, SupportTicket.Status.CLOSED]
+			)
+		),
+	)
+
+
+def panels(user, now) -> dict:
+	"""Template context for the dashboard."""
+	versions = panel_versions(user.pk)
+	return {
+		"active_term": active_term(versions),
+		"announcements": announcements(user, versions, now),
+		"my_sections": enrolled_sections(user, versions),
+		"my_teaching": teaching_sections(user, versions),
+		"open_tickets": open_tickets(user, versions),
+	}
@@ -0,0 +1,116 @@
+"""psycopg connection pools: metrics and a capacity check.
+
+`settings_prod` gives each Postgres alias a pool (`OPTIONS["pool"]`), which
+Django creates per process on first use. Every process can hold up to the
+pool's `max_size` connections, so `PORTAL_DB_CLIENT_PROCESSES` x `max_size`
+must fit in the server's `max_connections` (less the superuser reserve), or
+workers fail to connect at peak instead of waiting for a free connection.
+
+`check_pool_capacity` is a database system check, so it runs with `migrate`
+(i.e. on every deploy via `entrypoint.sh`, before gunicorn starts) and with
+`check --database default`. The default process count and pool size therefore
+come from `university_portal/server_sizing.py`, which gunicorn.conf.py uses too.
+Pool sizes are exported on `/metrics` as `portal_db_pool_*` gauges.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from django.conf import settings
+from django.core import checks
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger("portal.db")
+
+# psycopg_pool's default when neither size is given.
+DEFAULT_POOL_SIZE = 4
+
+
+def pool_options(alias: str) -> dict | None:
+	"""The alias's pool options, or None when it isn't pooled."""
+	options = connections.settings[alias].get("OPTIONS", {}).get("pool")
+	if not options:
+		return None
+	return {} if options is True else dict(options)
+
+
+def pooled_aliases() -> list[str]:
+	return [alias for alias in connections.settings if pool_options(alias) is not None]
+
+
+def max_pool_size(options: dict) -> int:
+	return int(options.get("max_size") or options.get("min_size") or DEFAULT_POOL_SIZE)
+
+
+def _pool(alias: str):
+	# Only look at pools this process has already created; the `pool` property would create one.
+	return getattr(connections[alias], "_connection_pools", {}).get(alias)
+
+
+def pool_stats(alias: str) -> dict[str, int]:
+	pool = _pool(alias)
+	return pool.get_stats() if pool is not None else {}
+
+
+def _register_gauges() -> None:
+	for alias in pooled_aliases():
+		labels = {"alias": alias}
+
+		def in_use(alias=alias) -> float:
+			stats = pool_stats(alias)
+			return stats.get("pool_size", 0) - stats.get("pool_available", 0)
+
+		metrics.register_gauge(
+			"portal_db_pool_connections", lambda alias=alias: pool_stats(alias).get("pool_available", 0), {**labels, "state": "idle"}
+		)
+		metrics.register_gauge("portal_db_pool_connections", in_use, {**labels, "state": "in_use"})
+		metrics.register_gauge("portal_db_pool_waiting", lambda alias=alias: pool_stats(alias).get("requests_waiting", 0), labels)
+		metrics.register_gauge("portal_db_pool_max_size", lambda alias=alias: max_pool_size(pool_options(alias) or {}), labels)
+
+
+def server_connection_limit(alias: str) -> int | None:
+	"""Connections available to ordinary roles on the alias's server, or None if unknown."""
+	if settings.PORTAL_DB_MAX_CONNECTIONS:
+		return settings.PORTAL_DB_MAX_CONNECTIONS
+	conn = connections[alias]
+	if conn.vendor != "postgresql":
+		return None
+	try:
+		with conn.cursor() as cursor:
+			cursor.execute(
+				"SELECT current_setting('max_connections')::int - current_setting('superuser_reserved_connections')::int"
+			)
+			return int(cursor.fetchone()[0])
+	except Exception as exc:
+		logger.warning("could not read max_connections for %s (%s)", alias, exc)
+		return None
+
+
+def check_pool_capacity(app_configs=None, databases=None, **kwargs) -> list[checks.CheckMessage]:
+	errors = []
+	processes = settings.PORTAL_DB_CLIENT_PROCESSES
+	for alias in databases or []:
+		options = pool_options(alias)
+		if options is None:
+			continue
+		per_process = max_pool_size(options)
+		total = processes * per_process
+		limit = server_connection_limit(alias)
+		if limit is not None and total > limit:
+			errors.append(
+				checks.Warning(
+					f"Database '{alias}' may need {total} pooled connections "
+					f"({processes} processes x max_size {per_process}) but the server allows {limit}.",
+					hint="Lower DJANGO_DB_POOL_MAX_SIZE or WEB_CONCURRENCY, raise max_connections, "
+					"or put PgBouncer in front of the server.",
+					id="portal.W001",
+				)
+			)
+	return errors
+
+
+checks.register(check_pool_capacity, checks.Tags.database)
+_register_gauges()
@@ -0,0 +1,185 @@
+"""Read-replica routing.
+
+`DATABASE_REPLICA_URLS` (see settings) adds `replica1`, `replica2`, ... database
+aliases, listed in `PORTAL_DB_REPLICAS`. Writes always go to `default`. Reads
+go to a replica only inside `use_replica()`, which `@reads_from_replica`
+applies to read-only views and reports on GET/HEAD requests; everything else
+(middleware, sessions, add/drop) reads from the primary.
+
+- After a request with an unsafe method (e.g. an add/drop POST),
+  `PrimaryStickinessMiddleware` sets a short-lived cookie. While it is
+  present, that browser's reads stay on the primary so it sees its own
+  writes despite replication lag.
+- Each replica is probed (`SELECT 1`, plus replay lag on Postgres) at most
+  every `PORTAL_REPLICA_CHECK_SECONDS` per process. Unreachable or lagging
+  replicas are skipped until the next probe, and with no healthy replica,
+  reads fall back to the primary.
+- Caches keyed by version counters (dashboard panels, roles, catalog,
+  availability) are filled inside `use_primary()`. A lagging replica would
+  otherwise store pre-write rows under the post-write version.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger("portal.db")
+
+STICKY_COOKIE = "portal_primary"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+_read_alias: ContextVar[str | None] = ContextVar("portal_read_alias", default=None)
+_health_lock = threading.Lock()
+_health: dict[str, tuple[float, bool]] = {}
+
+
+def replicas() -> list[str]:
+	return list(getattr(settings, "PORTAL_DB_REPLICAS", []))
+
+
+def _probe(alias: str) -> bool:
+	try:
+		conn = connections[alias]
+		with conn.cursor() as cursor:
+			if conn.vendor == "postgresql":
+				# NULL on a primary or before anything has been replayed.
+				cursor.execute("SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())")
+				lag = cursor.fetchone()[0]
+				max_lag = getattr(settings, "PORTAL_REPLICA_MAX_LAG_SECONDS", 10.0)
+				if lag is not None and float(lag) > max_lag:
+					logger.warning("replica %s is %.1fs behind; using the primary", alias, float(lag))
+					return False
+			else:
+				cursor.execute("SELECT 1")
+		return True
+	except Exception as exc:
+		logger.warning("replica %s is unavailable (%s); using the primary", alias, exc)
+		if alias in connections:
+			connections[alias].close()
+		return False
+
+
+def healthy_replicas() -> list[str]:
+	"""Replicas that passed their latest probe; stale results are re-probed first."""
+	now = time.monotonic()
+	interval = getattr(settings, "PORTAL_REPLICA_CHECK_SECONDS", 5.0)
+	healthy = []
+	for alias in replicas():
+		with _health_lock:
+			checked_at, ok = _health.get(alias, (None, False))
+		if checked_at is None or now - checked_at >= interval:
+			ok = _probe(alias)
+			with _health_lock:
+				_health[alias] = (now, ok)
+		if ok:
+			healthy.append(alias)
+	return healthy
+
+
+def choose_read_alias() -> str:
+	healthy = healthy_replicas()
+	return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def _reading_from(alias: str):
+	token = _read_alias.set(alias)
+	try:
+		yield
+	finally:
+		_read_alias.reset(token)
+
+
+def use_replica(alias: str | None = None):
+	"""Send ORM reads inside the block to a healthy replica (or the primary if there is none)."""
+	return _reading_from(alias or choose_read_alias())
+
+
+def use_primary():
+	"""Read from the primary inside the block, e.g. to fill a cache keyed by version counters."""
+	return _reading_from(DEFAULT_DB_ALIAS)
+
+
+def prefers_primary(request) -> bool:
+	return request.method not in SAFE_METHODS or STICKY_COOKIE in request.COOKIES
+
+
+def reads_from_replica(view):
+	"""Serve a read-only view's queries from a replica unless the browser has written recently."""
+	if iscoroutinefunction(view):
+
+		@wraps(view)
+		async def async_wrapper(request, *args, **kwargs):
+			if not replicas() or prefers_primary(request):
+				return await view(request, *args, **kwargs)
+			with use_replica(await sync_to_async(choose_read_alias)()):
+				return await view(request, *args, **kwargs)
+
+		return async_wrapper
+
+	@wraps(view)
+	def wrapper(request, *args, **kwargs):
+		if not replicas() or prefers_primary(request):
+			return view(request, *args, **kwargs)
+		with use_replica():
+			return view(request, *args, **kwargs)
+
+	return wrapper
+
+
+class ReplicaRouter:
+	def db_for_read(self, model, **hints):
+		return _read_alias.get()
+
+	def db_for_write(self, model, **hints):
+		# Explicit, or instances loaded from a replica would be saved back to it.
+		return DEFAULT_DB_ALIAS
+
+	def allow_relation(self, obj1, obj2, **hints):
+		return True
+
+	def allow_migrate(self, db, app_label, model_name=None, **hints):
+		return False if db in replicas() else None
+
+
+class PrimaryStickinessMiddleware:
+	"""Mark browsers that just wrote so their next reads come from the primary."""
+
+	sync_capable = True
+	async_capable = True
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+		if iscoroutinefunction(get_response):
+			markcoroutinefunction(self)
+
+	def __call__(self, request):
+		if iscoroutinefunction(self):
+			return self.__acall__(request)
+		return self._mark(request, self.get_response(request))
+
+	async def __acall__(self, request):
+		return self._mark(request, await self.get_response(request))
+
+	@staticmethod
+	def _mark(request, response):
+		if replicas() and request.method not in SAFE_METHODS:
+			response.set_cookie(
+				STICKY_COOKIE,
+				"1",
+				max_age=getattr(settings, "PORTAL_REPLICA_STICKY_SECONDS", 10),
+				httponly=True,
+				samesite="Lax",
+				secure=settings.SESSION_COOKIE_SECURE,
+			)
+		return response
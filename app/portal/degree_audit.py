@@ -0,0 +1,287 @@
+"""Degree audit: which of a program's requirements a student has met and which remain.
+
+A student's record is their passed courses (released, non-failing grades; see
+`portal.requisites.is_passing`) and the courses they are enrolled in without a
+released grade yet (in progress). Each course counts towards one requirement
+only. Requirements naming specific courses claim them first (ALL, then CHOOSE),
+then CREDITS requirements take what is left, so an elective never uses up a
+course a named requirement needs. In-progress courses are shown against the
+requirement they would fill but don't satisfy it.
+
+Audits are memoized per student under the version counters of everything they
+read: the student's `grades`, `enrollments` and `student_programs`, plus the
+global `programs` (rules) and `catalog` counters, all bumped by `portal.signals`.
+`audit_students` audits many students with a fixed number of queries, reusing
+and filling that cache; `manage.py audit_degrees` runs it over a cohort in a
+process pool.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from . import metrics
+from .caching import get_versions
+from .db_routing import use_primary
+from .models import DegreeProgram, DegreeRequirement, Enrollment, Grade, StudentProgram
+from .requisites import is_passing
+
+AUDIT_SECONDS = 60 * 60 * 24
+# Requirements naming courses claim them before open-ended credit requirements.
+_CLAIM_ORDER = {DegreeRequirement.Kind.ALL: 0, DegreeRequirement.Kind.CHOOSE: 1, DegreeRequirement.Kind.CREDITS: 2}
+
+
+@dataclass(frozen=True)
+class CourseRecord:
+	code: str
+	department: str
+	level: int | None
+	credits: Decimal
+	grade: str = ""
+
+
+@dataclass(frozen=True)
+class Rule:
+	id: int
+	name: str
+	kind: str
+	position: int
+	courses: frozenset[str]
+	min_courses: int
+	min_credits: Decimal
+	department: str
+	min_level: int | None
+
+	def matches(self, course: CourseRecord) -> bool:
+		if self.courses:
+			return course.code in self.courses
+		if self.kind != DegreeRequirement.Kind.CREDITS:
+			return False
+		if self.department and course.department != self.department:
+			return False
+		return self.min_level is None or (course.level is not None and course.level >= self.min_level)
+
+
+@dataclass(frozen=True)
+class ProgramRules:
+	id: int
+	code: str
+	name: str
+	total_credits: Decimal
+	rules: tuple[Rule, ...]
+
+
+@dataclass
+class RequirementResult:
+	name: str
+	kind: str
+	satisfied: bool
+	applied: list[CourseRecord] = field(default_factory=list)
+	in_progress: list[CourseRecord] = field(default_factory=list)
+	# ALL: courses still to pass.
+	missing: list[str] = field(default_factory=list)
+	# CHOOSE: courses still to pass; CREDITS: credits still to earn.
+	remaining: Decimal = Decimal(0)
+
+	@property
+	def in_progress_only(self) -> bool:
+		"""Not met yet, but would be once the in-progress courses are passed."""
+		if self.satisfied or not self.in_progress:
+			return False
+		if self.kind == DegreeRequirement.Kind.ALL:
+			return set(self.missing) <= {c.code for c in self.in_progress}
+		if self.kind == DegreeRequirement.Kind.CHOOSE:
+			return len(self.in_progress) >= self.remaining
+		return sum(c.credits for c in self.in_progress) >= self.remaining
+
+
+@dataclass
+class DegreeAudit:
+	program_code: str
+	program_name: str
+	requirements: list[RequirementResult]
+	credits_earned: Decimal
+	credits_in_progress: Decimal
+	credits_required: Decimal
+
+	@property
+	def remaining(self) -> list[RequirementResult]:
+		return [r for r in self.requirements if not r.satisfied]
+
+	@property
+	def complete(self) -> bool:
+		return not self.remaining and self.credits_earned >= self.credits_required
+
+
+@dataclass
+class StudentRecord:
+	passed: dict[str, CourseRecord] = field(default_factory=dict)
+	in_progress: dict[str, CourseRecord] = field(default_factory=dict)
+
+
+def _level(value: str) -> int | None:
+	digits = "".join(ch for ch in value if ch.isdigit())
+	return int(digits) if digits else None
+
+
+def _audit_key(student_id: int, versions: dict) -> str:
+	parts = [versions[(scope, student_id)] for scope in ("grades", "enrollments", "student_programs")]
+	parts += [versions[("programs", "")], versions[("catalog", "")]]
+	return f"portal:audit:{student_id}:" + ":".join(map(str, parts))
+
+
+def _version_pairs(student_id: int) -> list[tuple[str, object]]:
+	return [("grades", student_id), ("enrollments", student_id), ("student_programs", student_id)]
+
+
+def program_rules(program_ids) -> dict[int, ProgramRules]:
+	"""Rules of the given programs (cached under the `programs` and `catalog` counters)."""
+	versions = get_versions([("programs", ""), ("catalog", "")])
+	stamp = f"{versions[('programs', '')]}:{versions[('catalog', '')]}"
+	keys = {program_id: f"portal:audit:rules:{program_id}:{stamp}" for program_id in program_ids}
+	found = cache.get_many(list(keys.values()))
+	result = {program_id: found[key] for program_id, key in keys.items() if key in found}
+	missing = [program_id for program_id in keys if program_id not in result]
+	metrics.cache_lookup("degree_rules", not missing)
+	if missing:
+		with use_primary():
+			programs = DegreeProgram.objects.filter(id__in=missing).prefetch_related(
+				Prefetch("requirements", queryset=DegreeRequirement.objects.prefetch_related("courses"))
+			)
+			for program in programs:
+				result[program.id] = ProgramRules(
+					id=program.id,
+					code=program.code,
+					name=program.name,
+					total_credits=program.total_credits,
+					rules=tuple(
+						Rule(
+							id=r.id,
+							name=r.name,
+							kind=r.kind,
+							position=r.position,
+							courses=frozenset(c.code for c in r.courses.all()),
+							min_courses=r.min_courses,
+							min_credits=r.min_credits,
+							department=r.department,
+							min_level=r.min_level,
+						)
+						for r in program.requirements.all()
+					),
+				)
+		cache.set_many({keys[program_id]: result[program_id] for program_id in missing if program_id in result}, AUDIT_SECONDS)
+	return result
+
+
+def load_records(student_ids) -> dict[int, StudentRecord]:
+	"""Passed and in-progress courses of several students, in two queries."""
+	records = {student_id: StudentRecord() for student_id in student_ids}
+	graded: set[tuple[int, int]] = set()
+	grades = Grade.objects.filter(student_id__in=student_ids, released=True).values_list(
+		"student_id",
+		"section_id",
+		"value",
+		"section__course__code",
+		"section__course__department",
+		"section__course__level",
+		"section__course__credits",
+	)
+	for student_id, section_id, value, code, department, level, credits in grades.order_by("section__term__start_date"):
+		graded.add((student_id, section_id))
+		if is_passing(value):
+			# A retake replaces the earlier grade.
+			records[student_id].passed[code] = CourseRecord(code, department, _level(level), credits, value.strip().upper())
+
+	enrolled = Enrollment.objects.filter(student_id__in=student_ids, status=Enrollment.Status.ENROLLED).values_list(
+		"student_id", "section_id", "section__course__code", "section__course__department", "section__course__level",
+		"section__course__credits",
+	)
+	for student_id, section_id, code, department, level, credits in enrolled:
+		record = records[student_id]
+		if (student_id, section_id) not in graded and code not in record.passed:
+			record.in_progress[code] = CourseRecord(code, department, _level(level), credits)
+	return records
+
+
+def evaluate(program: ProgramRules, record: StudentRecord) -> DegreeAudit:
+	"""Apply a student's record to a program's rules. Pure: no queries."""
+	used: set[str] = set()
+	results: dict[int, RequirementResult] = {}
+	for rule in sorted(program.rules, key=lambda r: (_CLAIM_ORDER.get(r.kind, 3), r.position, r.id)):
+		passed = [c for code, c in record.passed.items() if code not in used and rule.matches(c)]
+		pending = [c for code, c in record.in_progress.items() if code not in used and rule.matches(c)]
+		result = RequirementResult(name=rule.name, kind=rule.kind, satisfied=False)
+		if rule.kind == DegreeRequirement.Kind.ALL:
+			result.applied = passed
+			result.missing = sorted(rule.courses - {c.code for c in passed})
+			result.in_progress = [c for c in pending if c.code in result.missing]
+			result.satisfied = not result.missing
+		elif rule.kind == DegreeRequirement.Kind.CHOOSE:
+			result.applied = passed[: rule.min_courses]
+			result.remaining = Decimal(rule.min_courses - len(result.applied))
+			result.in_progress = pending[: int(result.remaining)]
+			result.satisfied = not result.remaining
+		else:
+			earned = Decimal(0)
+			for course in passed:
+				if earned >= rule.min_credits:
+					break
+				result.applied.append(course)
+				earned += course.credits
+			result.remaining = max(Decimal(0), rule.min_credits - earned)
+			if result.remaining:
+				for course in pending:
+					if sum(c.credits for c in result.in_progress) >= result.remaining:
+						break
+					result.in_progress.append(course)
+			result.satisfied = not result.remaining
+		used.update(c.code for c in result.applied)
+		used.update(c.code for c in result.in_progress)
+		results[rule.id] = result
+	return DegreeAudit(
+		program_code=program.code,
+		program_name=program.name,
+		requirements=[results[rule.id] for rule in program.rules],
+		credits_earned=sum((c.credits for c in record.passed.values()), Decimal(0)),
+		credits_in_progress=sum((c.credits for c in record.in_progress.values()), Decimal(0)),
+		credits_required=program.total_credits,
+	)
+
+
+def audit_students(student_ids) -> dict[int, list[DegreeAudit]]:
+	"""Audits of each student's declared programs; cached students cost no queries."""
+	student_ids = list(dict.fromkeys(student_ids))
+	pairs = [("programs", ""), ("catalog", "")]
+	for student_id in student_ids:
+		pairs += _version_pairs(student_id)
+	versions = get_versions(pairs)
+	keys = {student_id: _audit_key(student_id, versions) for student_id in student_ids}
+	found = cache.get_many(list(keys.values()))
+	audits = {student_id: found[key] for student_id, key in keys.items() if key in found}
+	missing = [student_id for student_id in student_ids if student_id not in audits]
+	metrics.cache_lookup("degree_audit", not missing)
+	if not missing:
+		return audits
+
+	with use_primary():
+		declared: dict[int, list[int]] = {student_id: [] for student_id in missing}
+		rows = StudentProgram.objects.filter(student_id__in=missing).order_by("declared_at", "id")
+		for student_id, program_id in rows.values_list("student_id", "program_id"):
+			declared[student_id].append(program_id)
+		rules = program_rules({program_id for ids in declared.values() for program_id in ids})
+		records = load_records([student_id for student_id, ids in declared.items() if ids])
+	fresh = {}
+	for student_id, program_ids in declared.items():
+		audits[student_id] = fresh[keys[student_id]] = [
+			evaluate(rules[program_id], records[student_id]) for program_id in program_ids
+		]
+	cache.set_many(fresh, AUDIT_SECONDS)
+	return audits
+
+
+def audit_student(student_id: int) -> list[DegreeAudit]:
+	return audit_students([student_id])[student_id]
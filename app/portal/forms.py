@@ -3,6 +3,7 @@ from __future__ import annotations
 from django import forms
 from django.contrib.auth import get_user_model
 
+from .models import Term
 from .roles import ALL_ROLES
 
 
@@ -38,3 +39,22 @@ class PortalUserCreateForm(forms.Form):
         if p1 and p2 and p1 != p2:
             self.add_error("password2", "Passwords do not match.")
         return cleaned
+
+
+class TermRolloverForm(forms.Form):
+    source = forms.ModelChoiceField(queryset=Term.objects.order_by("-start_date"), label="Copy sections from")
+    target_name = forms.CharField(max_length=64, label="Into term", help_text="An existing term, or a new one to create.")
+    start_date = forms.DateField(required=False, help_text="Needed only when the term is new.")
+    end_date = forms.DateField(required=False)
+    capacity_percent = forms.IntegerField(
+        initial=0,
+        min_value=-90,
+        max_value=500,
+        label="Capacity change (%)",
+        help_text="e.g. 10 adds 10% seats to every cloned section.",
+    )
+    with_instructors = forms.BooleanField(required=False, initial=True, label="Copy instructor assignments")
+    activate = forms.BooleanField(required=False, label="Make it the active term")
+
+    def clean_target_name(self):
+        return self.cleaned_data["target_name"].strip()
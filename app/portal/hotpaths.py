@@ -0,0 +1,173 @@
+"""The hot view queries, for checking their query plans.
+
+Each `HotQuery` rebuilds the queryset a hot view (or the cache fill behind it)
+runs, with a user, term or section picked from the current database.
+`manage.py explain_hotpaths` prints their plans and flags tables read in full
+without an index, so a filter or listing order without a supporting index (see
+the `indexes` in `portal.models`) shows up before it reaches production. Run it
+against `seed_scale` data; on a tiny database the planner may prefer scans that
+would not happen at scale.
+
+A query marked with `vendors` is only explained on those databases: the
+catalog's substring search has an index (pg_trgm) on Postgres only, so
+elsewhere it reads the course table in full by design.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, QuerySet
+
+from .catalog import search_queryset
+from .dashboard import ANNOUNCEMENT_CANDIDATES, announcements_for
+from .models import (
+	Course,
+	Enrollment,
+	FeeInvoice,
+	Grade,
+	Section,
+	SectionInstructor,
+	SupportTicket,
+	Term,
+	TranscriptRequest,
+)
+
+
+@dataclass
+class Sample:
+	"""Rows the hot queries are parameterised with."""
+
+	student: object
+	faculty: object
+	term: Term
+	section: Section
+	department: str
+	# A word from a course title, for the catalog search.
+	search: str
+
+
+@dataclass
+class HotQuery:
+	name: str
+	build: Callable[[Sample], QuerySet]
+	# Databases with an index for the query; None means all of them.
+	vendors: frozenset[str] | None = None
+
+
+def find_sample() -> Sample | None:
+	User = get_user_model()
+	term = Term.objects.filter(is_active=True).order_by("-start_date").first()
+	section = Section.objects.filter(term=term).order_by("id").first() if term else None
+	student = User.objects.filter(enrollments__isnull=False).order_by("id").first()
+	instructor = SectionInstructor.objects.select_related("instructor").order_by("id").first()
+	course = Course.objects.exclude(department="").order_by("id").first()
+	if not (term and section and student and instructor):
+		return None
+	return Sample(
+		student=student,
+		faculty=instructor.instructor,
+		term=term,
+		section=section,
+		department=course.department if course else "",
+		search=max(course.title.split(), key=len, default="") if course else "",
+	)
+
+
+HOT_QUERIES: list[HotQuery] = [
+	HotQuery(
+		"dashboard: enrolled sections",
+		lambda s: Enrollment.objects.select_related("section__course", "section__term").filter(
+			student=s.student, status=Enrollment.Status.ENROLLED
+		),
+	),
+	HotQuery(
+		"dashboard: teaching sections",
+		lambda s: Section.objects.select_related("course", "term").filter(instructors__instructor=s.faculty),
+	),
+	HotQuery(
+		"dashboard: open tickets",
+		lambda s: SupportTicket.objects.filter(created_by=s.student).exclude(
+			status__in=[SupportTicket.Status.RESOLVED, SupportTicket.Status.CLOSED]
+		),
+	),
+	HotQuery(
+		"dashboard: announcements",
+		lambda s: announcements_for(s.student)[:ANNOUNCEMENT_CANDIDATES],
+	),
+	HotQuery(
+		"registration: my enrollments",
+		lambda s: Enrollment.objects.select_related("section__course").filter(student=s.student, section__term=s.term),
+	),
+	HotQuery(
+		"registration: seats per section",
+		lambda s: Enrollment.objects.filter(section__term_id=s.term.id, status=Enrollment.Status.ENROLLED)
+		.values_list("section_id")
+		.annotate(n=Count("id"))
+		.order_by(),
+	),
+	HotQuery(
+		"registration add: seats taken",
+		lambda s: Enrollment.objects.filter(section=s.section, status=Enrollment.Status.ENROLLED),
+	),
+	HotQuery(
+		"faculty grades: roster",
+		lambda s: Enrollment.objects.select_related("student").filter(section=s.section, status=Enrollment.Status.ENROLLED),
+	),
+	HotQuery(
+		"grades",
+		lambda s: Grade.objects.select_related("section__course", "section__term")
+		.filter(student=s.student, released=True)
+		.order_by("-section__term__start_date", "section__course__code"),
+	),
+	HotQuery(
+		"transcript requests",
+		lambda s: TranscriptRequest.objects.filter(requester=s.student).order_by("-created_at"),
+	),
+	HotQuery(
+		"registrar queue",
+		lambda s: TranscriptRequest.objects.select_related("requester").order_by("status", "created_at"),
+	),
+	HotQuery(
+		"finance: student invoices",
+		lambda s: FeeInvoice.objects.select_related("term").filter(student=s.student).order_by("-due_date"),
+	),
+	HotQuery(
+		"finance: staff invoices",
+		lambda s: FeeInvoice.objects.select_related("term", "student").order_by("-due_date"),
+	),
+	HotQuery(
+		"support: my tickets",
+		lambda s: SupportTicket.objects.filter(created_by=s.student).order_by("-updated_at"),
+	),
+	HotQuery(
+		"catalog: department",
+		lambda s: Course.objects.filter(department=s.department).order_by("code"),
+	),
+	HotQuery(
+		"catalog: search",
+		lambda s: search_queryset(s.search).order_by("code"),
+		vendors=frozenset({"postgresql"}),
+	),
+]
+
+_SQLITE_SCAN = re.compile(r"\bSCAN (\S+)(.*)$")
+_POSTGRES_SCAN = re.compile(r"Seq Scan on (\S+)")
+
+
+def full_scans(plan: str, vendor: str) -> list[str]:
+	"""Tables the plan reads in full without an index."""
+	tables = []
+	for line in plan.splitlines():
+		if vendor == "sqlite":
+			match = _SQLITE_SCAN.search(line)
+			if match and "USING" not in match.group(2):
+				tables.append(match.group(1))
+		elif vendor == "postgresql":
+			match = _POSTGRES_SCAN.search(line)
+			if match:
+				tables.append(match.group(1))
+	return tables
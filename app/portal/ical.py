@@ -0,0 +1,90 @@
+"""Minimal iCalendar (RFC 5545) rendering for timetable feeds."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Iterable
+
+from django.utils import timezone
+
+from .models import Section, Term
+from .scheduling import parse_meeting_days
+
+_BYDAY = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+
+def _escape(text: str) -> str:
+	return (
+		(text or "")
+		.replace("\\", "\\\\")
+		.replace(";", "\\;")
+		.replace(",", "\\,")
+		.replace("\r\n", "\\n")
+		.replace("\n", "\\n")
+	)
+
+
+def _fold(line: str) -> str:
+	# Content lines longer than 75 octets must be folded with CRLF + space.
+	raw = line.encode("utf-8")
+	if len(raw) <= 75:
+		return line
+	parts: list[str] = []
+	while raw:
+		limit = 75 if not parts else 74
+		cut = min(limit, len(raw))
+		# Never split inside a multi-byte UTF-8 sequence.
+		while cut < len(raw) and (raw[cut] & 0xC0) == 0x80:
+			cut -= 1
+		parts.append(raw[:cut].decode("utf-8"))
+		raw = raw[cut:]
+	return "\r\n ".join(parts)
+
+
+def _first_meeting(start: date, weekdays: list[int]) -> date:
+	for offset in range(7):
+		day = start + timedelta(days=offset)
+		if day.weekday() in weekdays:
+			return day
+	return start
+
+
+def _local(value: datetime) -> str:
+	return value.strftime("%Y%m%dT%H%M%S")
+
+
+def build_timetable_calendar(term: Term | None, sections: Iterable[Section], *, name: str) -> str:
+	"""Render weekly recurring events for each section that has a meeting time."""
+	stamp = timezone.now().astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+	lines = [
+		"BEGIN:VCALENDAR",
+		"VERSION:2.0",
+		"PRODID:-//University Portal//Timetable//EN",
+		"CALSCALE:GREGORIAN",
+		"METHOD:PUBLISH",
+		f"X-WR-CALNAME:{_escape(name)}",
+	]
+	if term is not None:
+		for s in sections:
+			weekdays = parse_meeting_days(s.meeting_days)
+			if not weekdays or not s.start_time or not s.end_time:
+				continue
+			first = _first_meeting(term.start_date, weekdays)
+			starts = datetime.combine(first, s.start_time)
+			ends = datetime.combine(first, s.end_time)
+			until = datetime.combine(term.end_date, datetime.max.time())
+			byday = ",".join(_BYDAY[d] for d in weekdays)
+			lines += [
+				"BEGIN:VEVENT",
+				f"UID:section-{s.id}@university-portal",
+				f"DTSTAMP:{stamp}",
+				f"DTSTART:{_local(starts)}",
+				f"DTEND:{_local(ends)}",
+				f"RRULE:FREQ=WEEKLY;BYDAY={byday};UNTIL={_local(until)}",
+				f"SUMMARY:{_escape(f'{s.course.code} {s.course.title} ({s.section_code})')}",
+			]
+			if s.location:
+				lines.append(f"LOCATION:{_escape(s.location)}")
+			lines.append("END:VEVENT")
+	lines.append("END:VCALENDAR")
+	return "\r\n".join(_fold(line) for line in lines) + "\r\n"
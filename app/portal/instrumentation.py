@@ -0,0 +1,310 @@
+"""Per-request performance instrumentation.
+
+`PerformanceMiddleware` samples a configurable fraction of requests
+(`PORTAL_PERF_SAMPLE_RATE`). For each sampled request it measures SQL query
+count and time, template render time and total time, then:
+
+- adds a `Server-Timing` header (when `PORTAL_PERF_SERVER_TIMING` is on),
+- writes one JSON log line to the `portal.perf` logger,
+- feeds in-memory per-view histograms (see `snapshot()`).
+
+Top-level template renders in sampled requests are also timed per template,
+and any SQL that runs while a template renders (a lazy relation or a counting
+property reached from the template, e.g. `{% for g in user.groups.all %}`) is
+attributed to the template line and tag that triggered it: it is counted in
+`portal_template_queries_total`, logged once per line as a `portal.perf`
+warning and kept for `template_snapshot()` (see `manage.py profile_templates`).
+
+Every request, sampled or not, is also counted in the process metrics
+registry (`portal.metrics`) with its latency, and request boundaries are used
+to flush buffered audit rows and the shared metrics snapshot.
+
+Under ASGI the middleware runs natively async, so async views
+(`portal.async_views`) are not pushed back into a thread, and it only counts
+and times requests.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.template.base import Node, Template, TokenType
+
+from . import audit, metrics
+
+logger = logging.getLogger("portal.perf")
+
+TIME_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+	def __init__(self, bounds: tuple[float, ...]):
+		self.bounds = bounds
+		self.counts = [0] * (len(bounds) + 1)
+		self.count = 0
+		self.sum = 0.0
+
+	def observe(self, value: float) -> None:
+		self.counts[bisect_left(self.bounds, value)] += 1
+		self.count += 1
+		self.sum += value
+
+	def as_dict(self) -> dict:
+		return {"bounds": list(self.bounds), "counts": list(self.counts), "count": self.count, "sum": self.sum}
+
+
+class RequestStats:
+	__slots__ = ("queries", "db_time", "template_time", "template_depth", "render_queries")
+
+	def __init__(self):
+		self.queries = 0
+		self.db_time = 0.0
+		self.template_time = 0.0
+		self.template_depth = 0
+		# (template, line, tag, sql) of each query run while a template renders.
+		self.render_queries: list[tuple[str, int, str, str]] = []
+
+	def __call__(self, execute, sql, params, many, context):
+		# Installed as a `connection.execute_wrapper`.
+		if self.template_depth:
+			self.render_queries.append((*_render_site(), sql))
+		start = time.perf_counter()
+		try:
+			return execute(sql, params, many, context)
+		finally:
+			self.db_time += time.perf_counter() - start
+			self.queries += 1
+
+
+_RENDER_ANNOTATED = Node.render_annotated.__code__
+
+
+def _render_site() -> tuple[str, int, str]:
+	"""Template, line and tag of the innermost template node being rendered."""
+	frame = sys._getframe(2)
+	while frame is not None:
+		if frame.f_code is _RENDER_ANNOTATED:
+			node = frame.f_locals["self"]
+			token = getattr(node, "token", None)
+			origin = getattr(node, "origin", None)
+			name = getattr(origin, "template_name", None) or "<string>"
+			if token is None:
+				return name, 0, type(node).__name__
+			tag = f"{{{{ {token.contents} }}}}" if token.token_type == TokenType.VAR else f"{{% {token.contents} %}}"
+			return name, token.lineno, tag
+		frame = frame.f_back
+	return "<unknown>", 0, ""
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("portal_perf_stats", default=None)
+
+_lock = threading.Lock()
+_views: dict[str, dict[str, Histogram]] = {}
+_templates: dict[str, dict] = {}
+_flagged_sites: set[tuple[str, int]] = set()
+
+
+def _record(view_name: str, total_ms: float, db_ms: float, template_ms: float, queries: int) -> None:
+	with _lock:
+		hists = _views.get(view_name)
+		if hists is None:
+			hists = _views[view_name] = {
+				"total_ms": Histogram(TIME_BUCKETS_MS),
+				"db_ms": Histogram(TIME_BUCKETS_MS),
+				"template_ms": Histogram(TIME_BUCKETS_MS),
+				"queries": Histogram(QUERY_BUCKETS),
+			}
+		hists["total_ms"].observe(total_ms)
+		hists["db_ms"].observe(db_ms)
+		hists["template_ms"].observe(template_ms)
+		hists["queries"].observe(queries)
+
+
+def snapshot() -> dict[str, dict[str, dict]]:
+	"""Copy of the per-view histograms collected by this process."""
+	with _lock:
+		return {view: {name: h.as_dict() for name, h in hists.items()} for view, hists in _views.items()}
+
+
+def _record_template(name: str, render_ms: float, render_queries: list[tuple[str, int, str, str]]) -> None:
+	with _lock:
+		entry = _templates.get(name)
+		if entry is None:
+			entry = _templates[name] = {"render_ms": Histogram(TIME_BUCKETS_MS), "queries": 0, "sites": {}}
+		entry["render_ms"].observe(render_ms)
+		entry["queries"] += len(render_queries)
+		for template, line, tag, sql in render_queries:
+			site = entry["sites"].setdefault(f"{template}:{line} {tag}", {"queries": 0, "sql": sql})
+			site["queries"] += 1
+		new_sites = {(template, line) for template, line, _, _ in render_queries} - _flagged_sites
+		_flagged_sites.update(new_sites)
+	metrics.observe("portal_template_render_seconds", render_ms / 1000, {"template": name})
+	if render_queries:
+		metrics.inc("portal_template_queries_total", {"template": name}, len(render_queries))
+	for template, line, tag, sql in render_queries:
+		if (template, line) in new_sites:
+			new_sites.discard((template, line))
+			logger.warning(
+				json.dumps(
+					{"event": "template_query", "template": name, "site": f"{template}:{line}", "tag": tag, "sql": sql},
+					sort_keys=True,
+				)
+			)
+
+
+def template_snapshot() -> dict[str, dict]:
+	"""Per top-level template: render time histogram, queries run while rendering and where."""
+	with _lock:
+		return {
+			name: {
+				"render_ms": entry["render_ms"].as_dict(),
+				"queries": entry["queries"],
+				"sites": {site: dict(info) for site, info in entry["sites"].items()},
+			}
+			for name, entry in _templates.items()
+		}
+
+
+def reset() -> None:
+	with _lock:
+		_views.clear()
+		_templates.clear()
+		_flagged_sites.clear()
+
+
+_template_timer_installed = False
+
+
+def _install_template_timer() -> None:
+	"""Wrap `Template._render` so top-level template renders are timed.
+
+	Only renders that happen while a sampled request is active are measured;
+	`{% include %}`/`{% extends %}` renders are nested and counted once, under
+	the template the view rendered.
+	"""
+	global _template_timer_installed
+	if _template_timer_installed:
+		return
+	original = Template._render
+
+	def _timed_render(self, context):
+		stats = _current.get()
+		if stats is None or stats.template_depth:
+			return original(self, context)
+		stats.template_depth += 1
+		queries_before = len(stats.render_queries)
+		start = time.perf_counter()
+		try:
+			return original(self, context)
+		finally:
+			elapsed = time.perf_counter() - start
+			stats.template_depth -= 1
+			stats.template_time += elapsed
+			name = getattr(self.origin, "template_name", None) or self.name or "<string>"
+			_record_template(name, elapsed * 1000, stats.render_queries[queries_before:])
+
+	Template._render = _timed_render
+	_template_timer_installed = True
+
+
+class PerformanceMiddleware:
+	sync_capable = True
+	async_capable = True
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+		_install_template_timer()
+		if iscoroutinefunction(get_response):
+			markcoroutinefunction(self)
+
+	def __call__(self, request):
+		if iscoroutinefunction(self):
+			return self.__acall__(request)
+		rate = getattr(settings, "PORTAL_PERF_SAMPLE_RATE", 0.0)
+		if rate <= 0 or (rate < 1 and random.random() >= rate):
+			start = time.perf_counter()
+			response = self.get_response(request)
+			self._count(request, response, time.perf_counter() - start)
+			return response
+
+		stats = RequestStats()
+		token = _current.set(stats)
+		start = time.perf_counter()
+		try:
+			with ExitStack() as stack:
+				for conn in connections.all():
+					stack.enter_context(conn.execute_wrapper(stats))
+				response = self.get_response(request)
+		finally:
+			_current.reset(token)
+		total = time.perf_counter() - start
+
+		match = getattr(request, "resolver_match", None)
+		view_name = match.view_name if match else "<unresolved>"
+		total_ms, db_ms, template_ms = total * 1000, stats.db_time * 1000, stats.template_time * 1000
+		_record(view_name, total_ms, db_ms, template_ms, stats.queries)
+		view_label = {"view": view_name}
+		metrics.observe("portal_request_db_queries", stats.queries, view_label, buckets=QUERY_BUCKETS)
+		metrics.observe("portal_request_db_seconds", stats.db_time, view_label)
+		metrics.observe("portal_request_template_seconds", stats.template_time, view_label)
+		self._count(request, response, total)
+
+		if getattr(settings, "PORTAL_PERF_SERVER_TIMING", False):
+			response["Server-Timing"] = (
+				f'db;dur={db_ms:.1f};desc="{stats.queries} queries", '
+				f"tpl;dur={template_ms:.1f}, "
+				f"total;dur={total_ms:.1f}"
+			)
+		if logger.isEnabledFor(logging.INFO):
+			logger.info(
+				json.dumps(
+					{
+						"event": "request",
+						"view": view_name,
+						"method": request.method,
+						"status": response.status_code,
+						"queries": stats.queries,
+						"db_ms": round(db_ms, 2),
+						"template_ms": round(template_ms, 2),
+						"total_ms": round(total_ms, 2),
+					},
+					sort_keys=True,
+				)
+			)
+		return response
+
+	async def __acall__(self, request):
+		# Under ASGI, view DB work runs in worker threads whose connections this
+		# middleware can't wrap, so requests are counted and timed but not sampled.
+		start = time.perf_counter()
+		response = await self.get_response(request)
+		self._count(request, response, time.perf_counter() - start, flush_audit=False)
+		if audit.queue_depth():
+			# Only borrow a thread when there is something to write.
+			await sync_to_async(audit.flush_if_due)()
+		return response
+
+	@staticmethod
+	def _count(request, response, seconds: float, flush_audit: bool = True) -> None:
+		match = getattr(request, "resolver_match", None)
+		view_name = match.view_name if match else "<unresolved>"
+		status = f"{response.status_code // 100}xx"
+		metrics.inc("portal_requests_total", {"view": view_name, "method": request.method, "status": status})
+		metrics.observe("portal_request_duration_seconds", seconds, {"view": view_name})
+		# Request boundary housekeeping: outside the view's transaction and cheap
+		# when nothing is due.
+		if flush_audit:
+			audit.flush_if_due()
+		metrics.flush()
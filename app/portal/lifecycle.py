@@ -0,0 +1,55 @@
+"""Write what a worker process buffers in memory before it exits.
+
+The audit queue (`portal.audit`, with `PORTAL_AUDIT_BUFFER_SIZE > 0`) and this
+process's metrics snapshot (`portal.metrics`) would otherwise be lost when a
+worker is recycled or stopped. Gunicorn's sync and gthread workers call
+`flush_buffers` from the `worker_exit` hook in `gunicorn.conf.py`. Uvicorn
+workers exit without running that hook, so the ASGI app is wrapped with
+`with_lifespan`, which flushes on the server's lifespan shutdown event.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+
+from . import audit, metrics
+
+logger = logging.getLogger("portal.lifecycle")
+
+
+def flush_buffers() -> int:
+	"""Write the buffered audit rows and the metrics snapshot; return the audit rows written."""
+	written = 0
+	try:
+		written = audit.flush()
+	except Exception:
+		logger.exception("could not write %d buffered audit rows", audit.queue_depth())
+	try:
+		metrics.flush(force=True)
+	except OSError:
+		logger.exception("could not write the metrics snapshot")
+	connections.close_all()
+	if written:
+		logger.info("wrote %d buffered audit rows on exit", written)
+	return written
+
+
+def with_lifespan(app):
+	"""Wrap an ASGI app so the lifespan protocol is answered and shutdown flushes the buffers."""
+
+	async def application(scope, receive, send):
+		if scope["type"] != "lifespan":
+			return await app(scope, receive, send)
+		while True:
+			message = await receive()
+			if message["type"] == "lifespan.startup":
+				await send({"type": "lifespan.startup.complete"})
+			elif message["type"] == "lifespan.shutdown":
+				await sync_to_async(flush_buffers, thread_sensitive=True)()
+				await send({"type": "lifespan.shutdown.complete"})
+				return
+
+	return application
@@ -0,0 +1,140 @@
+"""HTTP client for simulated students, used by `manage.py load_registration`.
+
+Only the standard library is used and no Django state is touched, so a worker
+can run in a thread or in a separate process against any running portal
+(runserver, gunicorn, uvicorn, ...). Each simulated student logs in, browses
+the catalog and the registration page, adds the planned sections and
+optionally drops some of them again. `browse_pages` is the read-only
+counterpart used by `manage.py bench_asgi`.
+"""
+
+from __future__ import annotations
+
+import time
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+OUTCOME_MARKERS = (
+	("enrolled", "Enrolled successfully"),
+	("waitlisted", "you are waitlisted"),
+	("already", "Already enrolled"),
+	("dropped", "Dropped successfully"),
+	("not_enrolled", "Not enrolled."),
+	("closed", "Registration window is closed"),
+)
+
+
+class _NoRedirect(HTTPRedirectHandler):
+	# Time each hop separately; the caller decides whether to follow.
+	def redirect_request(self, req, fp, code, msg, headers, newurl):
+		return None
+
+
+class PortalSession:
+	def __init__(self, base_url: str, timeout: float = 30.0):
+		self.base_url = base_url.rstrip("/")
+		self.timeout = timeout
+		self.jar = CookieJar()
+		self.opener = build_opener(HTTPCookieProcessor(self.jar), _NoRedirect())
+		self.timings: list[tuple[str, int, float]] = []
+
+	def _csrf_token(self) -> str:
+		for cookie in self.jar:
+			if cookie.name == "csrftoken":
+				return cookie.value
+		return ""
+
+	def request(self, step: str, path: str, data: dict | None = None) -> tuple[int, str]:
+		"""Send one request and record `(step, status, seconds)`; status 0 means a transport error."""
+		headers = {"Referer": self.base_url + path}
+		body = None
+		if data is not None:
+			body = urlencode({**data, "csrfmiddlewaretoken": self._csrf_token()}).encode()
+			headers["Content-Type"] = "application/x-www-form-urlencoded"
+		req = Request(self.base_url + path, data=body, headers=headers, method="POST" if data is not None else "GET")
+		started = time.perf_counter()
+		try:
+			with self.opener.open(req, timeout=self.timeout) as response:
+				status, text = response.status, response.read().decode("utf-8", "replace")
+		except HTTPError as exc:
+			status, text = exc.code, exc.read().decode("utf-8", "replace")
+		except (URLError, OSError) as exc:
+			status, text = 0, str(exc)
+		self.timings.append((step, status, time.perf_counter() - started))
+		return status, text
+
+
+def _outcome(page: str) -> str:
+	for name, marker in OUTCOME_MARKERS:
+		if marker in page:
+			return name
+	return "other"
+
+
+def _login(session: PortalSession, username: str, password: str) -> int:
+	session.request("login_form", "/login/")
+	status, _ = session.request("login", "/login/", {"username": username, "password": password})
+	return status
+
+
+def simulate_student(
+	base_url: str,
+	username: str,
+	password: str,
+	add_section_ids: list[int],
+	drop_section_ids: list[int],
+	timeout: float = 30.0,
+) -> dict:
+	"""Run one student's session; returns timings, add/drop outcomes and errors (picklable)."""
+	session = PortalSession(base_url, timeout)
+	outcomes: dict[str, int] = {}
+	errors: list[str] = []
+
+	def done():
+		return {"timings": session.timings, "outcomes": outcomes, "errors": errors}
+
+	status = _login(session, username, password)
+	if status != 302:
+		errors.append(f"{username}: login failed (HTTP {status})")
+		return done()
+	for step, path in (("catalog", "/courses/"), ("registration", "/registration/")):
+		status, _ = session.request(step, path)
+		if status != 200:
+			errors.append(f"{username}: {step} returned HTTP {status}")
+
+	plan = [("add", sid) for sid in add_section_ids] + [("drop", sid) for sid in drop_section_ids]
+	for action, section_id in plan:
+		status, _ = session.request(action, "/registration/", {"action": action, "section_id": section_id})
+		if status != 302:
+			errors.append(f"{username}: {action} {section_id} returned HTTP {status}")
+			continue
+		# Follow the redirect like a browser would; the flash message tells us the outcome.
+		status, page = session.request("registration", "/registration/")
+		outcome = _outcome(page) if status == 200 else "other"
+		outcomes[outcome] = outcomes.get(outcome, 0) + 1
+	return done()
+
+
+def browse_pages(
+	base_url: str,
+	username: str,
+	password: str,
+	pages: list[tuple[str, str]],
+	rounds: int,
+	timeout: float = 30.0,
+) -> dict:
+	"""Log in, then GET each `(step, path)` in `pages` `rounds` times; returns timings and errors (picklable)."""
+	session = PortalSession(base_url, timeout)
+	errors: list[str] = []
+	status = _login(session, username, password)
+	if status != 302:
+		errors.append(f"{username}: login failed (HTTP {status})")
+		return {"timings": session.timings, "errors": errors}
+	for _ in range(rounds):
+		for step, path in pages:
+			status, _ = session.request(step, path)
+			if status != 200:
+				errors.append(f"{username}: {step} returned HTTP {status}")
+	return {"timings": session.timings, "errors": errors}
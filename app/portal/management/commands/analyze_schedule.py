@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portal.models import Term
+from portal.scheduling import analyze_term
+
+
+def _hhmm(value: str) -> int:
+    try:
+        hours, mins = value.split(":", 1)
+        return int(hours) * 60 + int(mins)
+    except ValueError as exc:
+        raise CommandError(f"Invalid time '{value}', expected HH:MM.") from exc
+
+
+class Command(BaseCommand):
+    help = "Report room and instructor double-bookings and room utilization for a term."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--term", default="", help="Term name (default: the active term).")
+        parser.add_argument("--day-start", default="08:00", help="Start of the bookable day (HH:MM).")
+        parser.add_argument("--day-end", default="18:00", help="End of the bookable day (HH:MM).")
+        parser.add_argument("--days", type=int, default=5, help="Bookable days per week.")
+        parser.add_argument("--limit", type=int, default=50, help="Max rows to print per section (0 = all).")
+
+    def handle(self, *args, **options):
+        term_name: str = options["term"]
+        if term_name:
+            term = Term.objects.filter(name=term_name).first()
+            if term is None:
+                raise CommandError(f"Term '{term_name}' does not exist.")
+        else:
+            term = Term.objects.filter(is_active=True).order_by("-start_date").first()
+            if term is None:
+                raise CommandError("No active term; pass --term.")
+
+        started = time.perf_counter()
+        report = analyze_term(
+            term,
+            window_start=_hhmm(options["day_start"]),
+            window_end=_hhmm(options["day_end"]),
+            days_per_week=options["days"],
+        )
+        elapsed = time.perf_counter() - started
+        limit = options["limit"] or None
+
+        self.stdout.write(f"Term: {term.name} ({report['section_count']} sections, analyzed in {elapsed:.3f}s)")
+        for title, key in (("Room conflicts", "room_conflicts"), ("Instructor conflicts", "instructor_conflicts")):
+            conflicts = report[key]
+            style = self.style.WARNING if conflicts else self.style.SUCCESS
+            self.stdout.write(style(f"{title}: {len(conflicts)}"))
+            for c in conflicts[:limit]:
+                self.stdout.write(f"  {c.resource}: {c.labels[0]} x {c.labels[1]} on {c.days_display}")
+
+        self.stdout.write("Room utilization:")
+        for u in report["room_usage"][:limit]:
+            self.stdout.write(f"  {u.room}: {u.percent:.1f}% ({u.busy_minutes}/{u.available_minutes} min, {u.meetings} meetings)")
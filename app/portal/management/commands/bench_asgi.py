@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from portal.benchmarks import percentile
+from portal.loadtest import browse_pages
+from portal.models import Section, Term
+
+STEPS = ("dashboard", "courses", "course_detail", "announcements", "grades", "timetable")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the read-heavy pages served over WSGI (sync views) and ASGI (async views) "
+        "by driving concurrent logged-in students against both running servers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wsgi-url", default="http://127.0.0.1:8000", help="Base URL of the WSGI server ('' to skip).")
+        parser.add_argument("--asgi-url", default="http://127.0.0.1:8001", help="Base URL of the ASGI server ('' to skip).")
+        parser.add_argument("--prefix", default="scale", help="seed_scale prefix of the student accounts.")
+        parser.add_argument("--password", default="password123", help="Password shared by the student accounts.")
+        parser.add_argument("--concurrency", type=int, default=32, help="Students browsing at once.")
+        parser.add_argument("--rounds", type=int, default=5, help="Times each student loads every page.")
+        parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds.")
+
+    def handle(self, *args, **options):
+        targets = [(name, options[f"{name}_url"]) for name in ("wsgi", "asgi") if options[f"{name}_url"]]
+        if not targets:
+            raise CommandError("Give at least one of --wsgi-url / --asgi-url.")
+        term = Term.objects.filter(is_active=True).order_by("-start_date").first()
+        section = (
+            Section.objects.select_related("course").filter(term=term).order_by("id").first() if term else None
+        )
+        if section is None:
+            raise CommandError("No active term with sections; run seed_scale first.")
+        usernames = list(
+            User.objects.filter(username__startswith=f"{options['prefix']}_s", is_active=True)
+            .order_by("username")
+            .values_list("username", flat=True)[: options["concurrency"]]
+        )
+        if not usernames:
+            raise CommandError(f"No '{options['prefix']}_s*' students found; run seed_scale first.")
+
+        pages = [
+            ("dashboard", "/"),
+            ("courses", "/courses/"),
+            ("course_detail", f"/courses/{section.course.code}/"),
+            ("announcements", "/announcements/"),
+            ("grades", "/grades/"),
+            ("timetable", "/timetable/"),
+        ]
+        self.stdout.write(
+            f"{len(usernames)} students x {options['rounds']} rounds x {len(pages)} pages per server"
+        )
+
+        results = {}
+        errors: list[str] = []
+        for name, base_url in targets:
+            timings: list[tuple[str, int, float]] = []
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=len(usernames)) as pool:
+                futures = [
+                    pool.submit(browse_pages, base_url, username, options["password"], pages, options["rounds"], options["timeout"])
+                    for username in usernames
+                ]
+                for future in as_completed(futures):
+                    result = future.result()
+                    timings.extend(t for t in result["timings"] if t[0] in STEPS)
+                    errors.extend(f"{name}: {error}" for error in result["errors"])
+            elapsed = time.perf_counter() - started
+            results[name] = timings
+            failed = sum(1 for _, status, _ in timings if status != 200)
+            self.stdout.write(
+                f"{name} {base_url}: {len(timings)} page loads in {elapsed:.2f}s, "
+                f"{len(timings) / elapsed:.1f} req/s, {failed} errors"
+            )
+
+        header = f"{'page':<16}" + "".join(f"{name + ' p50':>12}{name + ' p99':>12}" for name in results)
+        self.stdout.write(header)
+        for step in STEPS:
+            row = f"{step:<16}"
+            for timings in results.values():
+                samples = [t for s, status, t in timings if s == step and status == 200]
+                if samples:
+                    row += f"{percentile(samples, 50) * 1000:>12.1f}{percentile(samples, 99) * 1000:>12.1f}"
+                else:
+                    row += f"{'-':>12}{'-':>12}"
+            self.stdout.write(row)
+
+        for error in errors[:20]:
+            self.stderr.write(self.style.WARNING(error))
+        if errors:
+            raise CommandError(f"{len(errors)} request errors.")
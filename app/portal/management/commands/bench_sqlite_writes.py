@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from portal.benchmarks import percentile
+from portal.sqlite import apply_pragmas
+
+SCHEMA = """
+CREATE TABLE section (id INTEGER PRIMARY KEY, code TEXT NOT NULL, capacity INTEGER NOT NULL);
+CREATE TABLE enrollment (
+    id INTEGER PRIMARY KEY,
+    section_id INTEGER NOT NULL REFERENCES section (id),
+    student_id INTEGER NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX enrollment_section_status ON enrollment (section_id, status);
+"""
+
+
+def _connect(path: str, tuned: bool) -> sqlite3.Connection:
+    # Autocommit with explicit BEGIN, like Django's SQLite backend.
+    conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA foreign_keys = ON")
+    if tuned:
+        apply_pragmas(conn.cursor(), settings.PORTAL_SQLITE_PRAGMAS)
+    return conn
+
+
+def _run_worker(path: str, tuned: bool, transactions: int, reads: int, sections: int, seed: int) -> dict:
+    """One registration-like client: catalog reads, then an add in its own transaction."""
+    rng = random.Random(seed)
+    conn = _connect(path, tuned)
+    begin = "BEGIN IMMEDIATE" if tuned else "BEGIN"
+    latencies: list[float] = []
+    errors = 0
+    for _ in range(transactions):
+        for _ in range(reads):
+            conn.execute(
+                "SELECT s.id, s.capacity, COUNT(e.id) FROM section s "
+                "LEFT JOIN enrollment e ON e.section_id = s.id AND e.status = 'ENROLLED' GROUP BY s.id"
+            ).fetchall()
+        section_id = rng.randint(1, sections)
+        started = time.perf_counter()
+        try:
+            conn.execute(begin)
+            capacity = conn.execute("SELECT capacity FROM section WHERE id = ?", (section_id,)).fetchone()[0]
+            taken = conn.execute(
+                "SELECT COUNT(*) FROM enrollment WHERE section_id = ? AND status = 'ENROLLED'", (section_id,)
+            ).fetchone()[0]
+            status = "ENROLLED" if taken < capacity else "WAITLISTED"
+            conn.execute(
+                "INSERT INTO enrollment (section_id, student_id, status) VALUES (?, ?, ?)",
+                (section_id, rng.randint(1, 10**9), status),
+            )
+            conn.execute("COMMIT")
+            latencies.append(time.perf_counter() - started)
+        except sqlite3.OperationalError:
+            errors += 1
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+    conn.close()
+    return {"latencies": latencies, "errors": errors}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare SQLite write throughput with the default settings and with the tuned profile "
+        "(WAL, busy timeout, synchronous=NORMAL, BEGIN IMMEDIATE) under concurrent registration-like writers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8, help="Concurrent writer processes.")
+        parser.add_argument("--transactions", type=int, default=200, help="Add transactions per worker.")
+        parser.add_argument("--reads", type=int, default=2, help="Catalog reads before each add.")
+        parser.add_argument("--sections", type=int, default=50, help="Sections the adds are spread over.")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--dir", default="", help="Directory for the scratch databases (default: a temp dir).")
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1 or options["transactions"] < 1:
+            raise CommandError("--workers and --transactions must be positive.")
+        workdir = Path(options["dir"] or tempfile.mkdtemp(prefix="portal-sqlite-bench-"))
+        workdir.mkdir(parents=True, exist_ok=True)
+        self.stdout.write(
+            f"{options['workers']} workers x {options['transactions']} adds "
+            f"({options['reads']} reads each) over {options['sections']} sections"
+        )
+        self.stdout.write(f"{'profile':<10}{'commits/s':>12}{'errors':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        try:
+            for profile, tuned in (("default", False), ("tuned", True)):
+                path = str(workdir / f"bench-{profile}.sqlite3")
+                for suffix in ("", "-wal", "-shm", "-journal"):
+                    Path(path + suffix).unlink(missing_ok=True)
+                conn = _connect(path, tuned)
+                conn.executescript(SCHEMA)
+                conn.executemany(
+                    "INSERT INTO section (id, code, capacity) VALUES (?, ?, ?)",
+                    [(n, f"S{n:03d}", 30) for n in range(1, options["sections"] + 1)],
+                )
+                conn.close()
+
+                started = time.perf_counter()
+                with ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+                    futures = [
+                        pool.submit(
+                            _run_worker,
+                            path,
+                            tuned,
+                            options["transactions"],
+                            options["reads"],
+                            options["sections"],
+                            options["seed"] + n,
+                        )
+                        for n in range(options["workers"])
+                    ]
+                    results = [future.result() for future in futures]
+                elapsed = time.perf_counter() - started
+
+                latencies = [t for result in results for t in result["latencies"]]
+                errors = sum(result["errors"] for result in results)
+                self.stdout.write(
+                    f"{profile:<10}{len(latencies) / elapsed:>12.1f}{errors:>10}"
+                    f"{percentile(latencies, 50) * 1000:>10.2f}{percentile(latencies, 99) * 1000:>10.2f}"
+                )
+        finally:
+            if not options["dir"]:
+                shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+import platform
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from portal import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark key portal views in-process: latency percentiles and SQL query counts. "
+        "Fails when a view exceeds its query budget or regresses against a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Timed requests per view.")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed requests per view before measuring.")
+        parser.add_argument("--view", action="append", default=[], help="Only run this scenario (repeatable).")
+        parser.add_argument("--baseline", default="", help="Baseline JSON to compare against.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.25, help="Allowed p50 slowdown vs. the baseline (0.25 = 25%%)."
+        )
+        parser.add_argument("--write-baseline", default="", help="Write these results as a new baseline JSON.")
+        parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+
+    def handle(self, *args, **options):
+        known = {s.name for s in benchmarks.SCENARIOS}
+        unknown = set(options["view"]) - known
+        if unknown:
+            raise CommandError(f"Unknown view(s): {', '.join(sorted(unknown))}. Choose from: {', '.join(sorted(known))}.")
+
+        baseline = None
+        if options["baseline"]:
+            path = Path(options["baseline"])
+            if not path.exists():
+                raise CommandError(f"Baseline '{path}' does not exist.")
+            baseline = json.loads(path.read_text(encoding="utf-8"))
+
+        # The test client needs 'testserver' to be an allowed host.
+        if "*" not in settings.ALLOWED_HOSTS and "testserver" not in settings.ALLOWED_HOSTS:
+            settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+        results = benchmarks.run(
+            iterations=options["iterations"], warmup=options["warmup"], names=options["view"] or None
+        )
+        failures = benchmarks.check(results, baseline, options["threshold"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2, sort_keys=True))
+        else:
+            base_views = (baseline or {}).get("views", {})
+            self.stdout.write(f"{'view':<28}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'queries':>10}{'budget':>8}{'base p50':>10}")
+            for name, stats in results.items():
+                if "skipped" in stats:
+                    self.stdout.write(self.style.WARNING(f"{name:<28}skipped: {stats['skipped']}"))
+                    continue
+                base = base_views.get(name, {}).get("p50_ms")
+                self.stdout.write(
+                    f"{name:<28}{stats['p50_ms']:>10.1f}{stats['p90_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+                    f"{stats['queries']:>10}{stats['max_queries']:>8}{(f'{base:.1f}' if base else '-'):>10}"
+                )
+
+        if options["write_baseline"]:
+            payload = {
+                "created_at": timezone.now().isoformat(),
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "iterations": options["iterations"],
+                "views": {name: stats for name, stats in results.items() if "skipped" not in stats},
+            }
+            Path(options["write_baseline"]).write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+            self.stdout.write(f"Baseline written to {options['write_baseline']}.")
+
+        if failures:
+            for failure in failures:
+                self.stderr.write(self.style.ERROR(failure))
+            raise CommandError(f"{len(failures)} benchmark check(s) failed.")
+        self.stdout.write(self.style.SUCCESS("All views within budget."))
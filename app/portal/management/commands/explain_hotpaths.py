@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from portal.hotpaths import HOT_QUERIES, find_sample, full_scans
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the query plan of each hot view query and flag full table scans "
+        "(missing indexes). Run against seed_scale data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("names", nargs="*", help="Only explain queries whose name contains one of these.")
+        parser.add_argument("--sql", action="store_true", help="Print each query's SQL as well.")
+        parser.add_argument(
+            "--strict", action="store_true", help="Exit non-zero if any query scans a table without an index."
+        )
+
+    def handle(self, *args, **options):
+        sample = find_sample()
+        if sample is None:
+            raise CommandError("Need an active term with sections, enrollments and instructors; run seed_scale first.")
+        selected = [
+            hot for hot in HOT_QUERIES if not options["names"] or any(n.lower() in hot.name.lower() for n in options["names"])
+        ]
+        if not selected:
+            raise CommandError("No hot query matches those names.")
+
+        flagged: list[str] = []
+        skipped = [hot for hot in selected if hot.vendors is not None and connection.vendor not in hot.vendors]
+        selected = [hot for hot in selected if hot not in skipped]
+        for hot in skipped:
+            self.stdout.write(f"Skipping {hot.name}: only indexed on {', '.join(sorted(hot.vendors))}.")
+        for hot in selected:
+            qs = hot.build(sample)
+            self.stdout.write(self.style.MIGRATE_HEADING(hot.name))
+            if options["sql"]:
+                self.stdout.write(f"  {qs.query}")
+            plan = qs.explain()
+            for line in plan.splitlines():
+                self.stdout.write(f"  {line}")
+            scans = full_scans(plan, connection.vendor)
+            if scans:
+                flagged.append(hot.name)
+                self.stdout.write(self.style.WARNING(f"  full scan: {', '.join(scans)}"))
+
+        if connection.vendor not in {"sqlite", "postgresql"}:
+            self.stdout.write(f"Scan detection isn't implemented for {connection.vendor}; read the plans above.")
+        elif flagged:
+            message = f"{len(flagged)} of {len(selected)} hot queries scan a table: {', '.join(flagged)}"
+            if options["strict"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(selected)} hot queries, no full scans."))
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from portal.roles import ALL_ROLES, ROLE_KEY_GROUPS, ensure_groups_exist
+
+COLUMNS = ("username", "email", "first_name", "last_name", "password", "roles", "is_staff")
+TRUE_VALUES = {"1", "true", "yes", "y", "on"}
+
+
+def _init_worker(settings_module: str) -> None:
+    # Spawned (not forked) workers start without Django configured.
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+
+    django.setup()
+
+
+def _hash(password: str) -> str:
+    return make_password(password)
+
+
+def _insert_new_users(User, users: list) -> dict[str, int]:
+    """Insert the users whose username is still free; {username: id} of the rows this insert created.
+
+    The ids come back from the INSERT itself (ON CONFLICT DO NOTHING RETURNING; Postgres and SQLite 3.35+), so a
+    username another import commits while this batch is hashed is neither counted nor given this file's roles.
+    """
+    connection = connections[User.objects.db]
+    qn = connection.ops.quote_name
+    fields = [f for f in User._meta.concrete_fields if not f.primary_key]
+    username = qn(User._meta.get_field(User.USERNAME_FIELD).column)
+    sql = (
+        f"INSERT INTO {qn(User._meta.db_table)} ({', '.join(qn(f.column) for f in fields)}) VALUES {{rows}} "
+        f"ON CONFLICT ({username}) DO NOTHING RETURNING {username}, {qn(User._meta.pk.column)}"
+    )
+    row = f"({', '.join(['%s'] * len(fields))})"
+    batch_size = min(1000, connection.ops.bulk_batch_size(fields, users) or 1000)
+    ids: dict[str, int] = {}
+    with connection.cursor() as cursor:
+        for start in range(0, len(users), batch_size):
+            chunk = users[start : start + batch_size]
+            params = [f.get_db_prep_save(f.pre_save(user, True), connection) for user in chunk for f in fields]
+            cursor.execute(sql.format(rows=", ".join([row] * len(chunk))), params)
+            ids.update(cursor.fetchall())
+    return ids
+
+
+def _group_names(raw: str) -> list[str]:
+    names: list[str] = []
+    for role in (r.strip() for r in raw.replace(";", ",").split(",")):
+        if role:
+            names.extend(ROLE_KEY_GROUPS.get(role.upper(), [role]))
+    return names
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users from a CSV file (columns: username, email, first_name, last_name, password, roles, is_staff). "
+        "Rows are read in batches; passwords are hashed in a process pool and users and group memberships are "
+        "bulk inserted. Usernames that already exist are skipped, so the import can be re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path", help="CSV file with a header row, or '-' for stdin.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows hashed and inserted per transaction.")
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1, help="Password hashing processes (default: CPU count)."
+        )
+        parser.add_argument(
+            "--default-roles",
+            default="",
+            help="Role keys or group names for rows with an empty roles column (e.g. STUDENT).",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["workers"] < 1:
+            raise CommandError("--batch-size and --workers must be positive.")
+        ensure_groups_exist()
+        self.group_ids = dict(Group.objects.filter(name__in=ALL_ROLES).values_list("name", "id"))
+        self.default_groups = _group_names(options["default_roles"])
+        unknown = set(self.default_groups) - set(self.group_ids)
+        if unknown:
+            raise CommandError(f"Unknown group(s) in --default-roles: {', '.join(sorted(unknown))}.")
+        self.totals = {"rows": 0, "created": 0, "existing": 0, "repeated": 0, "invalid": 0, "memberships": 0}
+
+        source = sys.stdin if options["csv_path"] == "-" else None
+        try:
+            handle = source or open(options["csv_path"], newline="", encoding="utf-8-sig")
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['csv_path']}: {exc}") from exc
+
+        started = time.perf_counter()
+        # Forked workers would inherit (and share) any open database connection.
+        connections.close_all()
+        with handle, ProcessPoolExecutor(
+            max_workers=options["workers"], initializer=_init_worker, initargs=(settings.SETTINGS_MODULE,)
+        ) as pool:
+            # Start the workers now, before the first batch's queries reopen a connection.
+            pool.submit(os.getpid).result()
+            reader = csv.DictReader(handle)
+            if not reader.fieldnames or "username" not in reader.fieldnames:
+                raise CommandError(f"The CSV needs a header row with a 'username' column (known: {', '.join(COLUMNS)}).")
+            # Line numbers for error messages: the header is line 1.
+            rows = enumerate(reader, start=2)
+            batch_no = 0
+            while batch := list(islice(rows, options["batch_size"])):
+                batch_no += 1
+                self._import_batch(batch_no, batch, pool, options["workers"])
+
+        elapsed = time.perf_counter() - started
+        totals = self.totals
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{totals['rows']:,} rows in {elapsed:.1f}s: {totals['created']:,} users created "
+                f"({totals['created'] / elapsed if elapsed else 0:,.0f}/s), {totals['existing']:,} already existed, "
+                f"{totals['repeated']:,} repeated in the file, "
+                f"{totals['memberships']:,} group memberships added."
+            )
+        )
+        if totals["invalid"]:
+            raise CommandError(f"{totals['invalid']:,} invalid row(s) were skipped; fix them and re-run.")
+
+    def _import_batch(self, batch_no: int, batch: list[tuple[int, dict]], pool, workers: int) -> None:
+        User = get_user_model()
+        started = time.perf_counter()
+        self.totals["rows"] += len(batch)
+
+        parsed: dict[str, tuple[dict, list[str]]] = {}
+        for line, row in batch:
+            username = User.normalize_username((row.get("username") or "").strip())
+            try:
+                if not username:
+                    raise ValidationError("username is empty")
+                User.username_validator(username)
+                groups = _group_names(row.get("roles") or "") or self.default_groups
+                unknown = [g for g in groups if g not in self.group_ids]
+                if unknown:
+                    raise ValidationError(f"unknown role(s) {', '.join(unknown)}")
+            except ValidationError as exc:
+                self.totals["invalid"] += 1
+                self.stderr.write(f"line {line}: {username or '(no username)'}: {'; '.join(exc.messages)}")
+                continue
+            if username in parsed:
+                self.totals["repeated"] += 1
+                continue
+            parsed[username] = (row, groups)
+
+        existing = set(User.objects.filter(username__in=list(parsed)).values_list("username", flat=True))
+        self.totals["existing"] += len(existing)
+        new = [(username, row, groups) for username, (row, groups) in parsed.items() if username not in existing]
+
+        # Rows without a password get an unusable one (set it later with a reset); only real ones are hashed.
+        passwords = [(row.get("password") or "") for _, row, _ in new]
+        to_hash = [p for p in passwords if p]
+        hashed = iter(list(pool.map(_hash, to_hash, chunksize=max(1, len(to_hash) // (workers * 4)))))
+        hashing = time.perf_counter() - started
+
+        users = [
+            User(
+                username=username,
+                email=User.objects.normalize_email((row.get("email") or "").strip()),
+                first_name=(row.get("first_name") or "").strip(),
+                last_name=(row.get("last_name") or "").strip(),
+                is_staff=(row.get("is_staff") or "").strip().lower() in TRUE_VALUES,
+                password=next(hashed) if password else make_password(None),
+            )
+            for (username, row, _), password in zip(new, passwords)
+        ]
+        Membership = User.groups.through
+        with transaction.atomic():
+            # Usernames another import created since the check above are skipped by the insert itself.
+            ids = _insert_new_users(User, users)
+            memberships = [
+                Membership(user_id=ids[username], group_id=self.group_ids[group])
+                for username, _, groups in new
+                if username in ids
+                for group in dict.fromkeys(groups)
+            ]
+            # New users have no cached roles yet, so skipping the m2m_changed signal is safe.
+            Membership.objects.bulk_create(memberships, batch_size=1000, ignore_conflicts=True)
+        self.totals["existing"] += len(users) - len(ids)
+        self.totals["created"] += len(ids)
+        self.totals["memberships"] += len(memberships)
+        self.stdout.write(
+            f"  batch {batch_no}: {len(batch)} rows, {len(ids)} created, hashing {hashing:.1f}s, "
+            f"insert {time.perf_counter() - started - hashing:.1f}s"
+        )
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.utils import timezone
+
+from portal.benchmarks import percentile
+from portal.loadtest import simulate_student
+from portal.models import Section, Term, with_seats_taken
+
+LOCK_METRIC = "portal_registration_lock_wait_seconds"
+
+
+def _lock_wait_totals(base_url: str, token: str) -> tuple[float, float] | None:
+    """(sum seconds, count) of the lock-wait histogram from /metrics, or None if unavailable."""
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    try:
+        with urlopen(Request(base_url.rstrip("/") + "/metrics", headers=headers), timeout=10) as response:
+            text = response.read().decode()
+    except (URLError, OSError):
+        return None
+    total = count = 0.0
+    for line in text.splitlines():
+        name, _, value = line.rpartition(" ")
+        if name.startswith(f"{LOCK_METRIC}_sum"):
+            total += float(value)
+        elif name.startswith(f"{LOCK_METRIC}_count"):
+            count += float(value)
+    return total, count
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive concurrent simulated students through login, catalog and add/drop against a running portal, "
+        "then report throughput, latency, lock wait and overbooked sections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the running portal.")
+        parser.add_argument("--prefix", default="scale", help="seed_scale prefix of the student accounts.")
+        parser.add_argument("--password", default="password123", help="Password shared by the student accounts.")
+        parser.add_argument("--students", type=int, default=200, help="Simulated students.")
+        parser.add_argument("--concurrency", type=int, default=32, help="Students in flight at once.")
+        parser.add_argument("--mode", choices=["thread", "process"], default="thread", help="Worker pool type.")
+        parser.add_argument("--hot-sections", type=int, default=5, help="Contended sections (smallest capacity first).")
+        parser.add_argument("--adds", type=int, default=2, help="Hot sections each student tries to add.")
+        parser.add_argument("--drop-rate", type=float, default=0.1, help="Chance a student drops an added section.")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds.")
+        parser.add_argument("--metrics-token", default="", help="Bearer token for /metrics, if one is configured.")
+
+    def handle(self, *args, **options):
+        term = Term.objects.filter(is_active=True).order_by("-start_date").first()
+        if term is None:
+            raise CommandError("No active term.")
+        now = timezone.now()
+        if (term.registration_start and now < term.registration_start) or (
+            term.registration_end and now > term.registration_end
+        ):
+            raise CommandError(f"Registration window for {term.name} is closed.")
+
+        usernames = list(
+            User.objects.filter(username__startswith=f"{options['prefix']}_s", is_active=True)
+            .order_by("username")
+            .values_list("username", flat=True)[: options["students"]]
+        )
+        if not usernames:
+            raise CommandError(f"No '{options['prefix']}_s*' students found; run seed_scale first.")
+        hot = list(
+            Section.objects.filter(term=term).order_by("capacity", "id").values_list("id", flat=True)[: options["hot_sections"]]
+        )
+        if not hot:
+            raise CommandError(f"{term.name} has no sections.")
+
+        rng = random.Random(options["seed"])
+        plans = []
+        for username in usernames:
+            adds = rng.sample(hot, min(options["adds"], len(hot)))
+            drops = [sid for sid in adds if rng.random() < options["drop_rate"]]
+            plans.append((username, adds, drops))
+
+        base_url = options["url"]
+        lock_before = _lock_wait_totals(base_url, options["metrics_token"])
+        pool_cls = ThreadPoolExecutor if options["mode"] == "thread" else ProcessPoolExecutor
+        self.stdout.write(
+            f"{len(plans)} students, {options['concurrency']} {options['mode']}s, "
+            f"{len(hot)} hot sections in {term.name} -> {base_url}"
+        )
+
+        timings: list[tuple[str, int, float]] = []
+        outcomes: dict[str, int] = {}
+        errors: list[str] = []
+        started = time.perf_counter()
+        with pool_cls(max_workers=max(1, options["concurrency"])) as pool:
+            futures = [
+                pool.submit(simulate_student, base_url, username, options["password"], adds, drops, options["timeout"])
+                for username, adds, drops in plans
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                timings.extend(result["timings"])
+                errors.extend(result["errors"])
+                for name, n in result["outcomes"].items():
+                    outcomes[name] = outcomes.get(name, 0) + n
+        elapsed = time.perf_counter() - started
+        lock_after = _lock_wait_totals(base_url, options["metrics_token"])
+
+        self.stdout.write(f"Elapsed: {elapsed:.2f}s, {len(timings)} requests, {len(timings) / elapsed:.1f} req/s")
+        self.stdout.write(f"{'step':<16}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}")
+        for step in ("login_form", "login", "catalog", "registration", "add", "drop"):
+            samples = [t for s, status, t in timings if s == step]
+            if not samples:
+                continue
+            failed = sum(1 for s, status, _ in timings if s == step and (status == 0 or status >= 500))
+            self.stdout.write(
+                f"{step:<16}{len(samples):>8}{failed:>8}"
+                f"{percentile(samples, 50) * 1000:>10.1f}{percentile(samples, 99) * 1000:>10.1f}"
+            )
+        self.stdout.write("Outcomes: " + (", ".join(f"{k}={v}" for k, v in sorted(outcomes.items())) or "none"))
+
+        if lock_before is not None and lock_after is not None and lock_after[1] > lock_before[1]:
+            waited, locks = lock_after[0] - lock_before[0], lock_after[1] - lock_before[1]
+            self.stdout.write(f"Lock wait: {locks:.0f} locks, {waited * 1000:.1f}ms total, {waited / locks * 1000:.2f}ms avg")
+        else:
+            self.stdout.write("Lock wait: unavailable (/metrics not reachable or no adds recorded)")
+
+        for error in errors[:20]:
+            self.stderr.write(self.style.WARNING(error))
+        if len(errors) > 20:
+            self.stderr.write(self.style.WARNING(f"... and {len(errors) - 20} more errors"))
+
+        overbooked = list(
+            with_seats_taken(Section.objects.select_related("course").filter(term=term, id__in=hot))
+            .filter(seats_taken__gt=F("capacity"))
+        )
+        for section in overbooked:
+            self.stderr.write(
+                self.style.ERROR(f"Overbooked: {section.course.code}-{section.section_code} {section.seats_taken}/{section.capacity}")
+            )
+        if overbooked:
+            raise CommandError(f"{len(overbooked)} section(s) overbooked.")
+        self.stdout.write(self.style.SUCCESS(f"Overbooked sections: 0 ({len(errors)} request errors)."))
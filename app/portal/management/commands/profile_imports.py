@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_MODULES = ["university_portal.wsgi", "university_portal.urls"]
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportRecord]:
+    """Parse `python -X importtime` output (stderr) into one record per module."""
+    records = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(ImportRecord(module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return records
+
+
+class Command(BaseCommand):
+    help = (
+        "Import the app in a fresh interpreter with `python -X importtime` and report the slowest modules "
+        "and the import cost per top-level package."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "modules",
+            nargs="*",
+            default=DEFAULT_MODULES,
+            help="Modules to import, in order (default: the WSGI app and the URLconf, i.e. a worker's startup).",
+        )
+        parser.add_argument("--top", type=int, default=20, help="Modules to list by cumulative and by own time.")
+
+    def handle(self, *args, **options):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE") or settings.SETTINGS_MODULE}
+        modules = options["modules"]
+        code = "; ".join(f"import {module}" for module in modules)
+        if not modules[0].endswith((".wsgi", ".asgi")):
+            # Other app modules can only be imported once the app registry is loaded.
+            code = f"import django; django.setup(); {code}"
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        elapsed = time.perf_counter() - started
+        records = parse_importtime(proc.stderr)
+        if proc.returncode != 0:
+            errors = "\n".join(line for line in proc.stderr.splitlines() if not _LINE.match(line))
+            raise CommandError(f"Importing {', '.join(modules)} failed:\n{errors}")
+
+        top = options["top"]
+        total_us = sum(r.self_us for r in records)
+        self.stdout.write(
+            f"{len(records)} modules, {total_us / 1000:.1f} ms of imports "
+            f"({elapsed * 1000:.0f} ms including interpreter start-up) for: {', '.join(modules)}"
+        )
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Slowest {top} by cumulative time"))
+        self.stdout.write(f"{'cumul ms':>10}{'self ms':>10}  module")
+        for r in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+            self.stdout.write(f"{r.cumulative_us / 1000:>10.1f}{r.self_us / 1000:>10.1f}  {'  ' * r.depth}{r.module}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Slowest {top} by own time"))
+        for r in sorted(records, key=lambda r: r.self_us, reverse=True)[:top]:
+            self.stdout.write(f"{r.self_us / 1000:>10.1f}  {r.module}")
+
+        packages: dict[str, list[int]] = {}
+        for r in records:
+            entry = packages.setdefault(r.module.split(".")[0], [0, 0])
+            entry[0] += r.self_us
+            entry[1] += 1
+        self.stdout.write(self.style.MIGRATE_HEADING("By top-level package"))
+        self.stdout.write(f"{'ms':>10}{'modules':>9}  package")
+        for package, (self_us, count) in sorted(packages.items(), key=lambda item: item[1][0], reverse=True)[:top]:
+            self.stdout.write(f"{self_us / 1000:>10.1f}{count:>9}  {package}")
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from portal import instrumentation
+from portal.benchmarks import TEMPLATE_PAGES
+
+
+class Command(BaseCommand):
+    help = (
+        "Render each portal page in-process and report render time per template, flagging templates "
+        "that run SQL while rendering (lazy relations or counting properties reached from the template)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("pages", nargs="*", help="Only render these pages (default: all).")
+        parser.add_argument("--iterations", type=int, default=5, help="Renders per page; the first also compiles.")
+        parser.add_argument(
+            "--strict", action="store_true", help="Exit non-zero if any template runs a query while rendering."
+        )
+
+    def handle(self, *args, **options):
+        known = {name for name, _ in TEMPLATE_PAGES}
+        unknown = set(options["pages"]) - known
+        if unknown:
+            raise CommandError(f"Unknown page(s): {', '.join(sorted(unknown))}. Choose from: {', '.join(sorted(known))}.")
+
+        # The test client needs 'testserver' to be an allowed host, and every request must be sampled.
+        if "*" not in settings.ALLOWED_HOSTS and "testserver" not in settings.ALLOWED_HOSTS:
+            settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+        settings.PORTAL_PERF_SAMPLE_RATE = 1.0
+
+        instrumentation.reset()
+        for name, resolve in TEMPLATE_PAGES:
+            if options["pages"] and name not in options["pages"]:
+                continue
+            resolved = resolve()
+            if resolved is None:
+                self.stdout.write(self.style.WARNING(f"{name}: skipped, no suitable data (run seed_scale)"))
+                continue
+            user, url = resolved
+            client = Client()
+            client.force_login(user)
+            for _ in range(max(1, options["iterations"])):
+                response = client.get(url)
+                if response.status_code != 200:
+                    self.stdout.write(self.style.WARNING(f"{name}: HTTP {response.status_code} for {url}"))
+                    break
+
+        templates = instrumentation.template_snapshot()
+        if not templates:
+            raise CommandError("No template was rendered.")
+        self.stdout.write(f"{'template':<40}{'renders':>8}{'mean ms':>10}{'queries':>9}")
+        flagged = []
+        for name, stats in sorted(templates.items(), key=lambda item: item[1]["render_ms"]["sum"], reverse=True):
+            renders = stats["render_ms"]["count"]
+            self.stdout.write(
+                f"{name:<40}{renders:>8}{stats['render_ms']['sum'] / renders:>10.2f}{stats['queries'] / renders:>9.1f}"
+            )
+            if stats["queries"]:
+                flagged.append(name)
+                for site, info in stats["sites"].items():
+                    self.stdout.write(self.style.WARNING(f"  {info['queries'] / renders:.1f}/render  {site}"))
+                    self.stdout.write(f"      {info['sql'][:160]}")
+
+        if flagged:
+            message = f"{len(flagged)} template(s) run queries while rendering: {', '.join(flagged)}"
+            if options["strict"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(templates)} templates, no queries while rendering."))
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portal.models import Term
+from portal.rollover import apply_rollover, plan_rollover
+
+
+def _date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD.") from exc
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy a term's sections (optionally resized) and their instructor assignments into another term, "
+        "creating it if needed. Sections already in the target (same course and section code) are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Name of the term to copy from.")
+        parser.add_argument("--to", required=True, dest="target", help="Name of the term to copy into.")
+        parser.add_argument("--start", default="", help="Start date (YYYY-MM-DD) when the target term is new.")
+        parser.add_argument("--end", default="", help="End date (YYYY-MM-DD) when the target term is new.")
+        parser.add_argument(
+            "--capacity-percent", type=int, default=0, help="Change every section's capacity by this percentage."
+        )
+        parser.add_argument("--no-instructors", action="store_true", help="Don't copy instructor assignments.")
+        parser.add_argument("--activate", action="store_true", help="Make the target the only active term.")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing.")
+
+    def handle(self, *args, **options):
+        source = Term.objects.filter(name=options["source"]).first()
+        if source is None:
+            raise CommandError(f"Term '{options['source']}' does not exist.")
+        if options["capacity_percent"] <= -100:
+            raise CommandError("--capacity-percent must be above -100.")
+
+        started = time.perf_counter()
+        try:
+            plan = plan_rollover(
+                source,
+                options["target"],
+                start_date=_date(options["start"]) if options["start"] else None,
+                end_date=_date(options["end"]) if options["end"] else None,
+                capacity_percent=options["capacity_percent"],
+                with_instructors=not options["no_instructors"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        before, after = plan.seats
+        self.stdout.write(f"{source.name} -> {plan.target_name}{'' if plan.target else ' (new term)'}")
+        self.stdout.write(f"  + {len(plan.new_sections)} sections, {plan.instructor_links} instructor assignments")
+        self.stdout.write(f"  = {len(plan.skipped)} already in {plan.target_name} (skipped)")
+        self.stdout.write(f"  ~ {len(plan.only_in_target)} only in {plan.target_name} (kept)")
+        if plan.capacity_percent:
+            self.stdout.write(f"  capacity {plan.capacity_percent:+d}%: {plan.capacity_changes} sections, seats {before} -> {after}")
+        if options["verbosity"] > 1:
+            for s in plan.new_sections:
+                change = f"{s.source_capacity} -> {s.capacity}" if s.capacity != s.source_capacity else str(s.capacity)
+                self.stdout.write(f"  + {s.course.code}-{s.section_code} cap {change}")
+            for s in plan.skipped:
+                self.stdout.write(f"  = {s.course.code}-{s.section_code}")
+            for s in plan.only_in_target:
+                self.stdout.write(f"  ~ {s.course.code}-{s.section_code}")
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("Dry run: nothing written."))
+            return
+        result = apply_rollover(plan, activate=options["activate"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {result.sections} sections and {result.instructor_links} instructor assignments in "
+                f"{result.term.name} in {time.perf_counter() - started:.2f}s"
+                f"{' (now the active term)' if options['activate'] else ''}."
+            )
+        )
@@ -7,6 +7,7 @@ from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
+from portal.caching import bump_version
 from portal.models import (
     Announcement,
     Course,
@@ -70,6 +71,7 @@ class Command(BaseCommand):
             },
         )
         Term.objects.exclude(id=term.id).update(is_active=False)
+        bump_version("schedule")  # update() skips the signals that invalidate cached views
 
         cs101, _ = Course.objects.get_or_create(code="CS101", defaults={"title": "Intro to Computing", "credits": 3})
         cs201, _ = Course.objects.get_or_create(code="CS201", defaults={"title": "Data Structures", "credits": 3})
@@ -0,0 +1,405 @@
+from __future__ import annotations
+
+import random
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from portal.caching import bump_version
+from portal.models import (
+    AuditLog,
+    Course,
+    Enrollment,
+    FeeInvoice,
+    Grade,
+    Section,
+    SectionInstructor,
+    SupportTicket,
+    Term,
+    TranscriptRequest,
+    TranscriptRequestEvent,
+)
+from portal.roles import ROLE_FACULTY, ROLE_FINANCE, ROLE_REGISTRAR, ROLE_STUDENT, ensure_groups_exist
+
+MEETING_PATTERNS = ["Mon,Wed", "Tue,Thu", "Mon,Wed,Fri", "Fri", "Sat"]
+START_SLOTS = [dtime(h, m) for h in range(8, 18) for m in (0, 30)]
+USER_KINDS = {"s": "Student", "f": "Prof", "r": "Registrar", "b": "Bursar"}
+AUDIT_ACTIONS = ["auth.login", "auth.logout", "registration.add", "registration.drop", "support.ticket.create"]
+
+
+def _weights(raw: str) -> tuple[list[str], list[float]]:
+    values: list[str] = []
+    weights: list[float] = []
+    for item in raw.split(","):
+        if not item.strip():
+            continue
+        value, _, weight = item.partition(":")
+        try:
+            weights.append(float(weight or 1))
+        except ValueError as exc:
+            raise CommandError(f"Invalid weight in '{item}'.") from exc
+        values.append(value.strip())
+    if not values:
+        raise CommandError(f"Empty distribution '{raw}'.")
+    return values, weights
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large synthetic dataset (terms, courses, sections, users, enrollments, grades, "
+        "invoices, transcript requests, tickets and audit rows) for benchmarking. Uses bulk_create in chunks; "
+        "the same --seed always produces the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="scale", help="Prefix for generated usernames, term names and references.")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed (same seed => same dataset).")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per bulk_create batch.")
+        parser.add_argument("--password", default="password123", help="Password for every generated user.")
+
+        parser.add_argument("--terms", type=int, default=3, help="Number of terms; the last one is active.")
+        parser.add_argument("--courses", type=int, default=2000)
+        parser.add_argument("--sections-per-course", type=int, default=2, help="Sections per course per term.")
+        parser.add_argument("--capacity", default="25-60", help="Section capacity range MIN-MAX.")
+        parser.add_argument("--rooms", type=int, default=300)
+        parser.add_argument(
+            "--departments",
+            default="CS:4,MATH:3,PHYS:2,CHEM:2,BIO:2,ECON:3,HIST:1,ENG:2",
+            help="Department distribution as NAME:WEIGHT,...",
+        )
+        parser.add_argument("--levels", default="100:4,200:3,300:2,400:1", help="Course level distribution.")
+
+        parser.add_argument("--students", type=int, default=50000)
+        parser.add_argument("--faculty", type=int, default=800)
+        parser.add_argument("--enrollments-per-student", type=int, default=5, help="Sections per student per term.")
+        parser.add_argument("--drop-rate", type=float, default=0.05, help="Fraction of enrollments that are dropped.")
+        parser.add_argument(
+            "--grades",
+            default="A:18,A-:12,B+:14,B:16,B-:10,C+:8,C:8,C-:4,D:4,F:4,W:2",
+            help="Grade distribution for past terms as VALUE:WEIGHT,...",
+        )
+        parser.add_argument("--grade-release-rate", type=float, default=0.95, help="Fraction of past-term grades released.")
+        parser.add_argument("--invoice-overdue-rate", type=float, default=0.1)
+        parser.add_argument("--transcript-rate", type=float, default=0.1, help="Transcript requests per student.")
+        parser.add_argument("--ticket-rate", type=float, default=0.05, help="Support tickets per user.")
+        parser.add_argument("--audit-per-user", type=float, default=2.0, help="Average audit rows per user.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.chunk = max(100, options["chunk_size"])
+        self.prefix = options["prefix"].strip()
+        if not self.prefix:
+            raise CommandError("--prefix must not be empty.")
+        if User.objects.filter(username__startswith=f"{self.prefix}_").exists() or Term.objects.filter(
+            name__startswith=f"{self.prefix} "
+        ).exists():
+            raise CommandError(f"Data with prefix '{self.prefix}' already exists; choose another --prefix.")
+        try:
+            cap_min, cap_max = (int(x) for x in options["capacity"].split("-", 1))
+        except ValueError as exc:
+            raise CommandError("--capacity must look like MIN-MAX.") from exc
+        self.options = options
+        ensure_groups_exist()
+
+        started = time.perf_counter()
+        self.total_rows = 0
+        with transaction.atomic():
+            terms = self._stage("terms", self._terms)
+            courses = self._stage("courses", self._courses)
+            faculty = self._stage("faculty", lambda: self._users("f", options["faculty"], ROLE_FACULTY))
+            students = self._stage("students", lambda: self._users("s", options["students"], ROLE_STUDENT))
+            # One registrar and one finance account so staff views can be benchmarked.
+            self._stage("staff", lambda: (self._users("r", 1, ROLE_REGISTRAR), self._users("b", 1, ROLE_FINANCE)))
+            sections = self._stage("sections", lambda: self._sections(terms, courses, faculty, cap_min, cap_max))
+            self._stage("enrollments + grades", lambda: self._enrollments(terms, sections, students))
+            self._stage("invoices", lambda: self._invoices(terms, students))
+            self._stage("transcript requests", lambda: self._transcripts(students))
+            self._stage("support tickets", lambda: self._tickets(students + faculty))
+            self._stage("audit rows", lambda: self._audit(students + faculty))
+        # bulk_create and update() skip model signals, so invalidate cached views here.
+        for scope in ("catalog", "schedule", "groups"):
+            bump_version(scope)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Created {self.total_rows:,} rows in {elapsed:.1f}s (seed={options['seed']})."))
+        self.stdout.write(
+            f"Users: {self.prefix}_s000000.. / {self.prefix}_f0000.. / {self.prefix}_r0000 / {self.prefix}_b0000 "
+            f"(password: {options['password']})"
+        )
+
+    # --- helpers ---------------------------------------------------------
+
+    def _stage(self, label, func):
+        started = time.perf_counter()
+        result = func()
+        self.stdout.write(f"  {label}: {time.perf_counter() - started:.1f}s")
+        return result
+
+    def _bulk(self, model, rows, **kwargs):
+        created = model.objects.bulk_create(rows, batch_size=self.chunk, **kwargs)
+        self.total_rows += len(rows)
+        return created
+
+    def _bulk_stream(self, model, rows_iter):
+        """bulk_create from a generator without holding every row in memory."""
+        batch = []
+        for row in rows_iter:
+            batch.append(row)
+            if len(batch) >= self.chunk:
+                self._bulk(model, batch)
+                batch = []
+        if batch:
+            self._bulk(model, batch)
+
+    def _aware(self, day: date, hour: int = 9) -> datetime:
+        return timezone.make_aware(datetime.combine(day, dtime(hour, 0)))
+
+    # --- stages ----------------------------------------------------------
+
+    def _terms(self) -> list[Term]:
+        count = max(1, self.options["terms"])
+        first = date(timezone.now().year, 1, 15) - timedelta(days=182 * (count - 1))
+        rows = []
+        for idx in range(count):
+            start = first + timedelta(days=182 * idx)
+            active = idx == count - 1
+            rows.append(
+                Term(
+                    name=f"{self.prefix} Term {idx + 1}",
+                    start_date=start,
+                    end_date=start + timedelta(days=120),
+                    is_active=False,
+                    registration_start=self._aware(start - timedelta(days=21)) if not active else timezone.now() - timedelta(days=7),
+                    registration_end=self._aware(start + timedelta(days=7)) if not active else timezone.now() + timedelta(days=7),
+                )
+            )
+        self._bulk(Term, rows)
+        terms = list(Term.objects.filter(name__startswith=f"{self.prefix} Term ").order_by("start_date"))
+        Term.objects.filter(is_active=True).update(is_active=False)
+        Term.objects.filter(id=terms[-1].id).update(is_active=True)
+        return terms
+
+    def _courses(self) -> list[int]:
+        depts, dept_w = _weights(self.options["departments"])
+        levels, level_w = _weights(self.options["levels"])
+        counters: dict[tuple[str, str], int] = {}
+        rows = []
+        for _ in range(self.options["courses"]):
+            dept = self.rng.choices(depts, dept_w)[0]
+            level = self.rng.choices(levels, level_w)[0]
+            n = counters[(dept, level)] = counters.get((dept, level), 0) + 1
+            code = f"{dept}{level}{n:03d}"[:16]
+            rows.append(
+                Course(
+                    code=code,
+                    title=f"{dept} {level} Topics {n}",
+                    department=dept,
+                    level=level,
+                    credits=Decimal(self.rng.choice(["3.0", "3.0", "3.0", "4.0", "1.0"])),
+                )
+            )
+        codes = [c.code for c in rows]
+        # Courses are shared between runs; existing codes are reused.
+        self._bulk(Course, rows, ignore_conflicts=True)
+        ids: list[int] = []
+        for i in range(0, len(codes), self.chunk):
+            ids.extend(Course.objects.filter(code__in=codes[i : i + self.chunk]).values_list("id", flat=True))
+        return sorted(ids)
+
+    def _users(self, kind: str, count: int, role: str) -> list[int]:
+        password = make_password(self.options["password"])  # hash once, reuse for every row
+        width = 6 if kind == "s" else 4
+        rows = (
+            User(
+                username=f"{self.prefix}_{kind}{i:0{width}d}",
+                email=f"{self.prefix}_{kind}{i:0{width}d}@example.edu",
+                first_name=USER_KINDS[kind],
+                last_name=f"{i:0{width}d}",
+                password=password,
+            )
+            for i in range(count)
+        )
+        self._bulk_stream(User, rows)
+        ids = list(
+            User.objects.filter(username__startswith=f"{self.prefix}_{kind}").order_by("id").values_list("id", flat=True)
+        )
+        group_id = Group.objects.get(name=role).id
+        Membership = User.groups.through
+        self._bulk_stream(Membership, (Membership(user_id=uid, group_id=group_id) for uid in ids))
+        return ids
+
+    def _sections(self, terms, course_ids, faculty_ids, cap_min, cap_max) -> dict[int, list[tuple[int, int]]]:
+        rooms = [f"B{(r // 50) + 1}-{r % 50 + 100}" for r in range(max(1, self.options["rooms"]))]
+        rows = []
+        for term in terms:
+            for course_id in course_ids:
+                for s in range(self.options["sections_per_course"]):
+                    start = self.rng.choice(START_SLOTS)
+                    length = self.rng.choice([50, 75, 75, 110])
+                    end = (datetime.combine(date.today(), start) + timedelta(minutes=length)).time()
+                    rows.append(
+                        Section(
+                            term=term,
+                            course_id=course_id,
+                            section_code=chr(ord("A") + s % 26),
+                            capacity=self.rng.randint(cap_min, cap_max),
+                            meeting_days=self.rng.choice(MEETING_PATTERNS),
+                            start_time=start,
+                            end_time=end,
+                            location=self.rng.choice(rooms),
+                        )
+                    )
+        self._bulk_stream(Section, iter(rows))
+        by_term: dict[int, list[tuple[int, int]]] = {t.id: [] for t in terms}
+        for sid, term_id, capacity in (
+            Section.objects.filter(term__in=terms).order_by("id").values_list("id", "term_id", "capacity").iterator(chunk_size=self.chunk)
+        ):
+            by_term[term_id].append((sid, capacity))
+        if faculty_ids:
+            self._bulk_stream(
+                SectionInstructor,
+                (
+                    SectionInstructor(section_id=sid, instructor_id=self.rng.choice(faculty_ids))
+                    for items in by_term.values()
+                    for sid, _ in items
+                ),
+            )
+        return by_term
+
+    def _enrollments(self, terms, sections, student_ids) -> None:
+        grades, grade_w = _weights(self.options["grades"])
+        per_student = self.options["enrollments_per_student"]
+        drop_rate = self.options["drop_rate"]
+        release_rate = self.options["grade_release_rate"]
+        active_id = terms[-1].id
+        enrollments: list[Enrollment] = []
+        grade_rows: list[Grade] = []
+        for term in terms:
+            term_sections = sections[term.id]
+            if not term_sections:
+                continue
+            seats = {sid: cap for sid, cap in term_sections}
+            enrolled_at = self._aware(term.start_date - timedelta(days=10))
+            k = min(per_student, len(term_sections))
+            for student_id in student_ids:
+                for sid, _ in self.rng.sample(term_sections, k):
+                    if self.rng.random() < drop_rate:
+                        status = Enrollment.Status.DROPPED
+                    elif seats[sid] > 0:
+                        seats[sid] -= 1
+                        status = Enrollment.Status.ENROLLED
+                    else:
+                        status = Enrollment.Status.WAITLISTED
+                    enrollments.append(Enrollment(section_id=sid, student_id=student_id, status=status, created_at=enrolled_at))
+                    if term.id != active_id and status == Enrollment.Status.ENROLLED:
+                        grade_rows.append(
+                            Grade(
+                                section_id=sid,
+                                student_id=student_id,
+                                value=self.rng.choices(grades, grade_w)[0],
+                                released=self.rng.random() < release_rate,
+                            )
+                        )
+                if len(enrollments) >= self.chunk:
+                    self._bulk(Enrollment, enrollments)
+                    enrollments = []
+                if len(grade_rows) >= self.chunk:
+                    self._bulk(Grade, grade_rows)
+                    grade_rows = []
+        self._bulk(Enrollment, enrollments)
+        self._bulk(Grade, grade_rows)
+
+    def _invoices(self, terms, student_ids) -> None:
+        overdue = self.options["invoice_overdue_rate"]
+        active_id = terms[-1].id
+
+        def rows():
+            for idx, term in enumerate(terms):
+                due = term.start_date + timedelta(days=30)
+                for student_id in student_ids:
+                    if term.id != active_id:
+                        status = FeeInvoice.Status.OVERDUE if self.rng.random() < overdue / 4 else FeeInvoice.Status.PAID
+                    else:
+                        status = FeeInvoice.Status.OVERDUE if self.rng.random() < overdue else FeeInvoice.Status.DUE
+                    yield FeeInvoice(
+                        student_id=student_id,
+                        term=term,
+                        reference_no=f"{self.prefix}-INV-{idx + 1}-{student_id}",
+                        amount=Decimal(self.rng.randrange(50000, 250000, 500)),
+                        due_date=due,
+                        status=status,
+                    )
+
+        self._bulk_stream(FeeInvoice, rows())
+
+    def _transcripts(self, student_ids) -> None:
+        rate = self.options["transcript_rate"]
+        statuses = list(TranscriptRequest.Status.values)
+        methods = list(TranscriptRequest.DeliveryMethod.values)
+        now = timezone.now()
+        chosen = [sid for sid in student_ids if self.rng.random() < rate]
+        rows = [
+            TranscriptRequest(
+                requester_id=sid,
+                purpose=self.rng.choice(["Job application", "Graduate school", "Scholarship", "Visa"]),
+                delivery_method=self.rng.choice(methods),
+                recipient_details="records@example.org",
+                status=self.rng.choice(statuses),
+                created_at=now - timedelta(days=self.rng.randint(0, 365)),
+            )
+            for sid in chosen
+        ]
+        self._bulk_stream(TranscriptRequest, iter(rows))
+        self._bulk_stream(TranscriptRequestEvent, self._events_chunked(chosen))
+
+    def _events_chunked(self, requester_ids):
+        for i in range(0, len(requester_ids), self.chunk):
+            qs = TranscriptRequest.objects.filter(requester_id__in=requester_ids[i : i + self.chunk])
+            for rid, actor_id, status in qs.values_list("id", "requester_id", "status"):
+                yield TranscriptRequestEvent(request_id=rid, actor_id=actor_id, from_status="", to_status=status, note="Seeded")
+
+    def _tickets(self, user_ids) -> None:
+        rate = self.options["ticket_rate"]
+        statuses = list(SupportTicket.Status.values)
+        now = timezone.now()
+        self._bulk_stream(
+            SupportTicket,
+            (
+                SupportTicket(
+                    created_by_id=uid,
+                    category=self.rng.choice(["IT", "Finance", "Registrar", "Facilities"]),
+                    subject="Synthetic ticket",
+                    description="Generated by seed_scale.",
+                    status=self.rng.choice(statuses),
+                    created_at=now - timedelta(days=self.rng.randint(0, 180)),
+                )
+                for uid in user_ids
+                if self.rng.random() < rate
+            ),
+        )
+
+    def _audit(self, user_ids) -> None:
+        per_user = self.options["audit_per_user"]
+        now = timezone.now()
+
+        def rows():
+            for uid in user_ids:
+                n = int(per_user) + (1 if self.rng.random() < per_user % 1 else 0)
+                for _ in range(n):
+                    yield AuditLog(
+                        actor_id=uid,
+                        action=self.rng.choice(AUDIT_ACTIONS),
+                        entity_type="user",
+                        entity_id=str(uid),
+                        ip=f"10.{self.rng.randint(0, 255)}.{self.rng.randint(0, 255)}.{self.rng.randint(1, 254)}",
+                        user_agent="seed_scale",
+                        created_at=now - timedelta(minutes=self.rng.randint(0, 525600)),
+                    )
+
+        self._bulk_stream(AuditLog, rows())
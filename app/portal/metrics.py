@@ -0,0 +1,287 @@
+"""Process-local metrics with Prometheus text exposition.
+
+Each process keeps counters, histograms and gauges in memory. When
+`PORTAL_METRICS_DIR` is set, every process periodically writes a snapshot to
+`<dir>/metrics-<pid>.json`; the `/metrics` view merges all snapshots so a scrape
+of any gunicorn worker reports totals for the whole server. Counters and
+histograms from exited workers keep counting (they are monotonic): a scrape
+that finds the snapshot of a dead pid adds its counters and histograms to
+`metrics-exited.json` and deletes it, so recycled workers don't leave a file
+each behind. Gauges are only reported for processes that are still alive.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+
+from django.conf import settings
+
+try:
+	import fcntl
+except ImportError:  # Windows: no other worker processes to race with.
+	fcntl = None
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS: dict[str, tuple[str, str]] = {
+	"portal_requests_total": ("counter", "Requests handled, by view, method and status class."),
+	"portal_request_duration_seconds": ("histogram", "Request latency by view."),
+	"portal_request_db_queries": ("histogram", "SQL queries per request by view (sampled requests)."),
+	"portal_request_db_seconds": ("histogram", "SQL time per request by view (sampled requests)."),
+	"portal_request_template_seconds": ("histogram", "Template render time per request by view (sampled requests)."),
+	"portal_template_render_seconds": ("histogram", "Render time by top-level template (sampled requests)."),
+	"portal_template_queries_total": ("counter", "SQL queries run while rendering, by top-level template (sampled requests)."),
+	"portal_cache_requests_total": ("counter", "Portal cache lookups by cache and result (hit/miss)."),
+	"portal_registration_lock_wait_seconds": ("histogram", "Time spent acquiring the section row lock when adding a course."),
+	"portal_pdf_render_seconds": ("histogram", "PDF render time by document type."),
+	"portal_seat_stream_connections": ("gauge", "Open live seat-count streams."),
+	"portal_audit_queue_depth": ("gauge", "Audit log rows buffered in memory and not yet written."),
+	"portal_db_pool_connections": ("gauge", "Pooled database connections by alias and state (idle/in_use)."),
+	"portal_db_pool_waiting": ("gauge", "Requests waiting for a pooled database connection, by alias."),
+	"portal_db_pool_max_size": ("gauge", "Connection pool size limit by alias."),
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+_lock = threading.Lock()
+_counters: dict[tuple[str, Labels], float] = {}
+_histograms: dict[tuple[str, Labels], list] = {}
+_gauges: dict[tuple[str, Labels], Callable[[], float]] = {}
+_last_flush = 0.0
+# Counters and histograms of exited processes, folded in by `_retire`.
+_EXITED = "metrics-exited.json"
+
+
+def _labels(labels: dict[str, str] | None) -> Labels:
+	return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def inc(name: str, labels: dict[str, str] | None = None, value: float = 1) -> None:
+	key = (name, _labels(labels))
+	with _lock:
+		_counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, value: float, labels: dict[str, str] | None = None, buckets: tuple = SECONDS_BUCKETS) -> None:
+	key = (name, _labels(labels))
+	with _lock:
+		hist = _histograms.get(key)
+		if hist is None:
+			# [bounds, per-bucket counts (last is +Inf), sum]
+			hist = _histograms[key] = [list(buckets), [0] * (len(buckets) + 1), 0.0]
+		hist[1][bisect_left(hist[0], value)] += 1
+		hist[2] += value
+
+
+def register_gauge(name: str, func: Callable[[], float], labels: dict[str, str] | None = None) -> None:
+	"""Register a callable sampled whenever metrics are flushed or scraped."""
+	_gauges[(name, _labels(labels))] = func
+
+
+def cache_lookup(cache_name: str, hit: bool) -> None:
+	inc("portal_cache_requests_total", {"cache": cache_name, "result": "hit" if hit else "miss"})
+
+
+def _local_state() -> dict:
+	gauges = []
+	for (name, lbls), func in list(_gauges.items()):
+		try:
+			gauges.append([name, list(map(list, lbls)), float(func())])
+		except Exception:
+			continue
+	with _lock:
+		return {
+			"pid": os.getpid(),
+			"counters": [[name, list(map(list, lbls)), v] for (name, lbls), v in _counters.items()],
+			"histograms": [[name, list(map(list, lbls)), h[0], list(h[1]), h[2]] for (name, lbls), h in _histograms.items()],
+			"gauges": gauges,
+		}
+
+
+def _metrics_dir() -> Path | None:
+	path = getattr(settings, "PORTAL_METRICS_DIR", None)
+	return Path(path) if path else None
+
+
+def _write_json(target: Path, data: dict) -> None:
+	tmp = target.with_suffix(".tmp")
+	tmp.write_text(json.dumps(data), encoding="utf-8")
+	os.replace(tmp, target)
+
+
+def _read_json(path: Path) -> dict | None:
+	try:
+		return json.loads(path.read_text(encoding="utf-8"))
+	except (OSError, ValueError):
+		return None
+
+
+def flush(force: bool = False) -> None:
+	"""Write this process's snapshot to the shared metrics directory (rate limited)."""
+	global _last_flush
+	directory = _metrics_dir()
+	if directory is None:
+		return
+	now = time.monotonic()
+	if not force and now - _last_flush < getattr(settings, "PORTAL_METRICS_FLUSH_SECONDS", 5):
+		return
+	_last_flush = now
+	directory.mkdir(parents=True, exist_ok=True)
+	_write_json(directory / f"metrics-{os.getpid()}.json", _local_state())
+
+
+def _pid_alive(pid: int) -> bool:
+	try:
+		os.kill(pid, 0)
+	except ProcessLookupError:
+		return False
+	except PermissionError:
+		return True
+	return True
+
+
+def _snapshot_pid(path: Path) -> int | None:
+	try:
+		return int(path.stem.removeprefix("metrics-"))
+	except ValueError:
+		return None
+
+
+@contextmanager
+def _directory_lock(directory: Path):
+	"""Serialise scrapes, so two workers don't fold the same exited snapshot twice."""
+	if fcntl is None:
+		yield
+		return
+	with open(directory / "metrics.lock", "a") as handle:
+		fcntl.flock(handle, fcntl.LOCK_EX)
+		try:
+			yield
+		finally:
+			fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _retire(directory: Path, paths: list[Path]) -> None:
+	"""Add the counters and histograms of exited processes to `_EXITED` and delete their snapshots."""
+	aggregate = directory / _EXITED
+	states = [_read_json(aggregate) or {}]
+	for path in paths:
+		state = _read_json(path)
+		if state is not None:
+			state["gauges"] = []
+			states.append(state)
+	counters, histograms, _ = _merge(states)
+	_write_json(
+		aggregate,
+		{
+			"pid": None,
+			"counters": [[name, list(map(list, lbls)), v] for (name, lbls), v in counters.items()],
+			"histograms": [[name, list(map(list, lbls)), *h] for (name, lbls), h in histograms.items()],
+			"gauges": [],
+		},
+	)
+	for path in paths:
+		path.unlink(missing_ok=True)
+
+
+def _collect() -> list[dict]:
+	states = [_local_state()]
+	directory = _metrics_dir()
+	if directory is None or not directory.exists():
+		return states
+	own = os.getpid()
+	with _directory_lock(directory):
+		snapshots = {path: _snapshot_pid(path) for path in directory.glob("metrics-*.json")}
+		dead = [path for path, pid in snapshots.items() if pid is not None and pid != own and not _pid_alive(pid)]
+		if dead:
+			_retire(directory, dead)
+		for path, pid in snapshots.items():
+			if pid is None or pid == own or path in dead:
+				continue
+			state = _read_json(path)
+			if state is not None:
+				states.append(state)
+		states.append(_read_json(directory / _EXITED) or {})
+	return states
+
+
+def _merge(states: list[dict]) -> tuple[dict, dict, dict]:
+	"""Sum counters, histograms (with the same buckets) and gauges across snapshots."""
+	counters: dict[tuple, float] = {}
+	histograms: dict[tuple, list] = {}
+	gauges: dict[tuple, float] = {}
+	for state in states:
+		for name, labels, value in state.get("counters", []):
+			key = (name, tuple(map(tuple, labels)))
+			counters[key] = counters.get(key, 0) + value
+		for name, labels, bounds, counts, total in state.get("histograms", []):
+			key = (name, tuple(map(tuple, labels)))
+			hist = histograms.get(key)
+			if hist is None:
+				histograms[key] = [bounds, list(counts), total]
+			elif hist[0] == bounds:
+				hist[1] = [a + b for a, b in zip(hist[1], counts)]
+				hist[2] += total
+		for name, labels, value in state.get("gauges", []):
+			key = (name, tuple(map(tuple, labels)))
+			gauges[key] = gauges.get(key, 0) + value
+	return counters, histograms, gauges
+
+
+def _escape(value: str) -> str:
+	return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels, extra: tuple[str, str] | None = None) -> str:
+	items = [tuple(item) for item in labels]
+	if extra:
+		items.append(extra)
+	if not items:
+		return ""
+	return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _fmt_bound(bound: float) -> str:
+	return repr(float(bound))
+
+
+def render_prometheus(extra_lines: list[str] | None = None) -> str:
+	"""Merge every process snapshot and render Prometheus text format 0.0.4."""
+	counters, histograms, gauges = _merge(_collect())
+
+	by_name: dict[str, list[str]] = {}
+	for (name, labels), value in sorted(counters.items()):
+		by_name.setdefault(name, []).append(f"{name}{_fmt_labels(labels)} {value:g}")
+	for (name, labels), value in sorted(gauges.items()):
+		by_name.setdefault(name, []).append(f"{name}{_fmt_labels(labels)} {value:g}")
+	for (name, labels), (bounds, counts, total) in sorted(histograms.items()):
+		lines = by_name.setdefault(name, [])
+		cumulative = 0
+		for bound, count in zip(list(bounds) + ["+Inf"], counts):
+			cumulative += count
+			le = bound if bound == "+Inf" else _fmt_bound(bound)
+			lines.append(f"{name}_bucket{_fmt_labels(labels, ('le', le))} {cumulative}")
+		lines.append(f"{name}_sum{_fmt_labels(labels)} {total:g}")
+		lines.append(f"{name}_count{_fmt_labels(labels)} {cumulative}")
+
+	out: list[str] = []
+	for name in sorted(by_name):
+		kind, help_text = METRICS.get(name, ("untyped", name))
+		out.append(f"# HELP {name} {help_text}")
+		out.append(f"# TYPE {name} {kind}")
+		out.extend(by_name[name])
+	out.extend(extra_lines or [])
+	return "\n".join(out) + "\n"
+
+
+def reset() -> None:
+	with _lock:
+		_counters.clear()
+		_histograms.clear()
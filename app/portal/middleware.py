@@ -0,0 +1,37 @@
+"""Middleware adapters for running the portal under ASGI."""
+
+from __future__ import annotations
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+	"""WhiteNoise that also runs natively async.
+
+	A sync-only middleware forces Django to run everything below it, async views
+	included, in a thread per request, which would undo `portal.async_views`.
+	Static files are still served from a thread.
+	"""
+
+	sync_capable = True
+	async_capable = True
+
+	def __init__(self, get_response=None, *args, **kwargs):
+		super().__init__(get_response, *args, **kwargs)
+		if iscoroutinefunction(get_response):
+			markcoroutinefunction(self)
+
+	def __call__(self, request):
+		if iscoroutinefunction(self):
+			return self.__acall__(request)
+		return super().__call__(request)
+
+	async def __acall__(self, request):
+		if self.autorefresh:
+			static_file = await sync_to_async(self.find_file)(request.path_info)
+		else:
+			static_file = self.files.get(request.path_info)
+		if static_file is not None:
+			return await sync_to_async(self.serve)(static_file, request)
+		return await self.get_response(request)
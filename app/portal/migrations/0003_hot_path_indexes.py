@@ -0,0 +1,52 @@
+# Generated by Django 5.2.11 on 2026-10-19 02:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('portal', '0002_course_catalog_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['-is_pinned', '-publish_at'], name='announcement_listing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['student', 'status'], name='enrollment_student_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(condition=models.Q(('status', 'enrolled')), fields=['section'], name='enrollment_enrolled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feeinvoice',
+            index=models.Index(fields=['student', '-due_date'], name='invoice_student_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feeinvoice',
+            index=models.Index(fields=['-due_date'], name='invoice_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(condition=models.Q(('released', True)), fields=['student'], name='grade_released_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supportticket',
+            index=models.Index(fields=['created_by', '-updated_at'], name='ticket_owner_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transcriptrequest',
+            index=models.Index(fields=['requester', '-created_at'], name='transcript_requester_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transcriptrequest',
+            index=models.Index(fields=['status', 'created_at'], name='transcript_queue_idx'),
+        ),
+    ]
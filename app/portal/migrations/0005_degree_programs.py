@@ -0,0 +1,59 @@
+# Generated by Django 5.2.11 on 2026-10-19 03:36
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0004_course_requisites'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DegreeProgram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=32, unique=True)),
+                ('name', models.CharField(max_length=200)),
+                ('total_credits', models.DecimalField(decimal_places=1, default=120, max_digits=5)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DegreeRequirement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120)),
+                ('kind', models.CharField(choices=[('all', 'All of the listed courses'), ('choose', 'A number of the listed courses'), ('credits', 'Credits from matching courses')], default='all', max_length=8)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('min_courses', models.PositiveSmallIntegerField(default=0)),
+                ('min_credits', models.DecimalField(decimal_places=1, default=0, max_digits=5)),
+                ('department', models.CharField(blank=True, max_length=50)),
+                ('min_level', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('courses', models.ManyToManyField(blank=True, related_name='degree_requirements', to='portal.course')),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='requirements', to='portal.degreeprogram')),
+            ],
+            options={
+                'ordering': ['position', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentProgram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cohort', models.CharField(blank=True, max_length=16)),
+                ('declared_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('advisor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='advisees', to=settings.AUTH_USER_MODEL)),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='students', to='portal.degreeprogram')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='programs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['program', 'cohort'], name='student_program_cohort_idx')],
+                'unique_together': {('student', 'program')},
+            },
+        ),
+    ]
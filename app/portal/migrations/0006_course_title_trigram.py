@@ -0,0 +1,36 @@
+# Catalog title search is a substring match (icontains), which the btree
+# index on title never served. On Postgres it is served by a pg_trgm GIN index
+# on UPPER(title), the expression Django's icontains compares. Other databases
+# have no index for it, so the index is created here rather than in the model.
+
+from django.db import migrations
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS course_title_trgm_idx ON portal_course USING gin (UPPER(title) gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS course_title_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0005_degree_programs'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='course',
+            name='course_title_idx',
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
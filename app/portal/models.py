@@ -28,10 +28,62 @@ class Course(models.Model):
 	credits = models.DecimalField(max_digits=4, decimal_places=1, default=3.0)
 	description = models.TextField(blank=True)
 
+	class Meta:
+		# Title search (`portal.catalog`) uses a trigram index on Postgres, added
+		# by migration 0006 outside the model state.
+		indexes = [
+			models.Index(fields=["department", "level"], name="course_dept_level_idx"),
+			models.Index(fields=["level"], name="course_level_idx"),
+		]
+
 	def __str__(self) -> str:
 		return f"{self.code} — {self.title}"
 
 
+class CourseRequisite(models.Model):
+	"""`course` needs `required_course` passed first (prerequisite) or passed/taken alongside (co-requisite)."""
+
+	class Kind(models.TextChoices):
+		PREREQUISITE = "pre", "Prerequisite"
+		COREQUISITE = "co", "Co-requisite"
+
+	course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="requisites")
+	required_course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="required_for")
+	kind = models.CharField(max_length=8, choices=Kind.choices, default=Kind.PREREQUISITE)
+
+	class Meta:
+		unique_together = [("course", "required_course")]
+
+	def clean(self) -> None:
+		from django.core.exceptions import ValidationError
+
+		if self.course_id and self.course_id == self.required_course_id:
+			raise ValidationError("A course cannot require itself.")
+		if (
+			self.kind == self.Kind.PREREQUISITE
+			and PrerequisiteClosure.objects.filter(course_id=self.required_course_id, prerequisite_id=self.course_id).exists()
+		):
+			raise ValidationError("That would make a prerequisite cycle.")
+
+	def __str__(self) -> str:
+		return f"{self.course.code} {self.get_kind_display().lower()}: {self.required_course.code}"
+
+
+class PrerequisiteClosure(models.Model):
+	"""Every direct or indirect prerequisite of a course; rebuilt by `portal.requisites.rebuild_closure`."""
+
+	course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="+")
+	prerequisite = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="+")
+	# 1 for a direct prerequisite, 2 for a prerequisite's prerequisite, ...
+	depth = models.PositiveSmallIntegerField()
+
+	class Meta:
+		unique_together = [("course", "prerequisite")]
+
+	def __str__(self) -> str:
+		return f"{self.course_id} <- {self.prerequisite_id} ({self.depth})"
+
+
 class Section(models.Model):
 	term = models.ForeignKey(Term, on_delete=models.PROTECT)
 	course = models.ForeignKey(Course, on_delete=models.PROTECT)
@@ -49,6 +101,10 @@ class Section(models.Model):
 
 	@property
 	def enrolled_count(self) -> int:
+		# List views annotate `seats_taken` (see `with_seats_taken`) to avoid a COUNT per row.
+		annotated = getattr(self, "seats_taken", None)
+		if annotated is not None:
+			return annotated
 		return self.enrollments.filter(status=Enrollment.Status.ENROLLED).count()
 
 	def has_seats(self) -> bool:
@@ -79,11 +135,26 @@ class Enrollment(models.Model):
 
 	class Meta:
 		unique_together = [("section", "student")]
+		indexes = [
+			# Dashboard and registration: a student's enrollments by status.
+			models.Index(fields=["student", "status"], name="enrollment_student_status_idx"),
+			# Seat counts only ever count enrolled rows; dropped/waitlisted rows stay out of the index.
+			models.Index(
+				fields=["section"], condition=models.Q(status="enrolled"), name="enrollment_enrolled_idx"
+			),
+		]
 
 	def __str__(self) -> str:
 		return f"{self.student} — {self.section} ({self.status})"
 
 
+def with_seats_taken(sections: models.QuerySet) -> models.QuerySet:
+	"""Annotate each section with its enrolled count in the same query."""
+	return sections.annotate(
+		seats_taken=models.Count("enrollments", filter=models.Q(enrollments__status=Enrollment.Status.ENROLLED))
+	)
+
+
 class Grade(models.Model):
 	section = models.ForeignKey(Section, on_delete=models.CASCADE, related_name="grades")
 	student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT)
@@ -93,11 +164,70 @@ class Grade(models.Model):
 
 	class Meta:
 		unique_together = [("section", "student")]
+		indexes = [
+			# Grades page and transcripts read released grades only.
+			models.Index(fields=["student"], condition=models.Q(released=True), name="grade_released_student_idx"),
+		]
 
 	def __str__(self) -> str:
 		return f"{self.student} — {self.section}: {self.value}"
 
 
+class DegreeProgram(models.Model):
+	code = models.CharField(max_length=32, unique=True)
+	name = models.CharField(max_length=200)
+	total_credits = models.DecimalField(max_digits=5, decimal_places=1, default=120)
+
+	def __str__(self) -> str:
+		return f"{self.code} — {self.name}"
+
+
+class DegreeRequirement(models.Model):
+	"""One rule of a program; see `portal.degree_audit` for how courses are applied to it."""
+
+	class Kind(models.TextChoices):
+		ALL = "all", "All of the listed courses"
+		CHOOSE = "choose", "A number of the listed courses"
+		CREDITS = "credits", "Credits from matching courses"
+
+	program = models.ForeignKey(DegreeProgram, on_delete=models.CASCADE, related_name="requirements")
+	name = models.CharField(max_length=120)
+	kind = models.CharField(max_length=8, choices=Kind.choices, default=Kind.ALL)
+	position = models.PositiveSmallIntegerField(default=0)
+	courses = models.ManyToManyField(Course, blank=True, related_name="degree_requirements")
+	# CHOOSE: how many of `courses`.
+	min_courses = models.PositiveSmallIntegerField(default=0)
+	# CREDITS: how many credits from `courses`, or (with no courses listed) from any course
+	# matching `department` and at or above `min_level`.
+	min_credits = models.DecimalField(max_digits=5, decimal_places=1, default=0)
+	department = models.CharField(max_length=50, blank=True)
+	min_level = models.PositiveSmallIntegerField(null=True, blank=True)
+
+	class Meta:
+		ordering = ["position", "id"]
+
+	def __str__(self) -> str:
+		return f"{self.program.code}: {self.name}"
+
+
+class StudentProgram(models.Model):
+	student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="programs")
+	program = models.ForeignKey(DegreeProgram, on_delete=models.PROTECT, related_name="students")
+	# Usually the entry year; batch audits select on it.
+	cohort = models.CharField(max_length=16, blank=True)
+	advisor = models.ForeignKey(
+		settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="advisees"
+	)
+	declared_at = models.DateTimeField(default=timezone.now)
+
+	class Meta:
+		unique_together = [("student", "program")]
+		indexes = [models.Index(fields=["program", "cohort"], name="student_program_cohort_idx")]
+
+	def __str__(self) -> str:
+		return f"{self.student} — {self.program.code}"
+
+
 class Announcement(models.Model):
 	title = models.CharField(max_length=200)
 	body = models.TextField()
@@ -108,6 +238,12 @@ class Announcement(models.Model):
 	is_pinned = models.BooleanField(default=False)
 	created_at = models.DateTimeField(default=timezone.now)
 
+	class Meta:
+		indexes = [
+			# Matches the listing order (pinned first, newest first).
+			models.Index(fields=["-is_pinned", "-publish_at"], name="announcement_listing_idx"),
+		]
+
 	def __str__(self) -> str:
 		return self.title
 
@@ -133,6 +269,13 @@ class FeeInvoice(models.Model):
 	due_date = models.DateField()
 	status = models.CharField(max_length=16, choices=Status.choices, default=Status.DUE)
 
+	class Meta:
+		indexes = [
+			models.Index(fields=["student", "-due_date"], name="invoice_student_due_idx"),
+			# Finance staff list every invoice, newest due date first.
+			models.Index(fields=["-due_date"], name="invoice_due_idx"),
+		]
+
 	def __str__(self) -> str:
 		return f"{self.reference_no} ({self.student})"
 
@@ -166,6 +309,13 @@ class TranscriptRequest(models.Model):
 	created_at = models.DateTimeField(default=timezone.now)
 	updated_at = models.DateTimeField(auto_now=True)
 
+	class Meta:
+		indexes = [
+			models.Index(fields=["requester", "-created_at"], name="transcript_requester_idx"),
+			# Registrar queue order.
+			models.Index(fields=["status", "created_at"], name="transcript_queue_idx"),
+		]
+
 	def __str__(self) -> str:
 		return f"TR-{self.id} ({self.requester})"
 
@@ -206,6 +356,12 @@ class SupportTicket(models.Model):
 	created_at = models.DateTimeField(default=timezone.now)
 	updated_at = models.DateTimeField(auto_now=True)
 
+	class Meta:
+		indexes = [
+			# A user's tickets, most recently updated first (also serves the dashboard's open tickets).
+			models.Index(fields=["created_by", "-updated_at"], name="ticket_owner_updated_idx"),
+		]
+
 	def __str__(self) -> str:
 		return f"TKT-{self.id}: {self.subject}"
 
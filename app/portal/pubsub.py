@@ -0,0 +1,107 @@
+"""In-process publish/subscribe for live seat counts.
+
+Enrollment commits publish `(section_id, enrolled)` to the topics
+`section:<id>` and `term:<id>`; each open seat stream (`views.seat_stream`)
+holds one `Subscription`. Publishers are ordinary sync code running in any
+thread; delivery is handed to each subscriber's event loop with one
+`call_soon_threadsafe` per loop, not per subscriber.
+
+Updates are coalesced per section while a subscriber is not reading, so an
+idle connection costs one small object regardless of how busy registration
+is. Only subscribers in the publishing process are notified; `portal.streams`
+polls the shared availability cache for commits made in other processes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from . import metrics
+
+
+def section_topic(section_id: int) -> str:
+	return f"section:{section_id}"
+
+
+def term_topic(term_id: int) -> str:
+	return f"term:{term_id}"
+
+
+class Subscription:
+	__slots__ = ("loop", "topics", "pending", "event")
+
+	def __init__(self, loop: asyncio.AbstractEventLoop, topics: frozenset[str]):
+		self.loop = loop
+		self.topics = topics
+		self.pending: dict[int, int] = {}
+		self.event = asyncio.Event()
+
+	def _deliver(self, section_id: int, enrolled: int) -> None:
+		# Runs on self.loop.
+		self.pending[section_id] = enrolled
+		self.event.set()
+
+	async def get(self, timeout: float) -> dict[int, int]:
+		"""Wait for changes; returns `{section_id: enrolled}` or `{}` after `timeout` seconds."""
+		if not self.pending:
+			try:
+				await asyncio.wait_for(self.event.wait(), timeout)
+			except asyncio.TimeoutError:
+				return {}
+		self.event.clear()
+		changes, self.pending = self.pending, {}
+		return changes
+
+
+def _deliver_all(subscriptions: list[Subscription], section_id: int, enrolled: int) -> None:
+	for sub in subscriptions:
+		sub._deliver(section_id, enrolled)
+
+
+class Broker:
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._topics: dict[str, set[Subscription]] = {}
+		self._count = 0
+
+	def subscribe(self, topics) -> Subscription:
+		"""Register interest in `topics`; must be called from the subscriber's running event loop."""
+		sub = Subscription(asyncio.get_running_loop(), frozenset(topics))
+		with self._lock:
+			for topic in sub.topics:
+				self._topics.setdefault(topic, set()).add(sub)
+			self._count += 1
+		return sub
+
+	def unsubscribe(self, sub: Subscription) -> None:
+		with self._lock:
+			for topic in sub.topics:
+				subs = self._topics.get(topic)
+				if subs is not None:
+					subs.discard(sub)
+					if not subs:
+						del self._topics[topic]
+			self._count -= 1
+
+	def publish(self, topics, section_id: int, enrolled: int) -> None:
+		with self._lock:
+			subs: set[Subscription] = set()
+			for topic in topics:
+				subs.update(self._topics.get(topic, ()))
+		by_loop: dict[asyncio.AbstractEventLoop, list[Subscription]] = {}
+		for sub in subs:
+			by_loop.setdefault(sub.loop, []).append(sub)
+		for loop, loop_subs in by_loop.items():
+			try:
+				loop.call_soon_threadsafe(_deliver_all, loop_subs, section_id, enrolled)
+			except RuntimeError:
+				# The loop has been closed; its subscribers are gone.
+				continue
+
+	def subscriber_count(self) -> int:
+		return self._count
+
+
+broker = Broker()
+metrics.register_gauge("portal_seat_stream_connections", broker.subscriber_count)
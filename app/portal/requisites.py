@@ -0,0 +1,182 @@
+"""Course prerequisites and co-requisites, and eligibility checks against them.
+
+`CourseRequisite` rows are the direct rules. Prerequisites are transitive, so
+their closure is kept in `PrerequisiteClosure`; `rebuild_closure` recomputes it
+whenever a rule changes (wired in `portal.signals`) and also refuses rules that
+would make a cycle (`CourseRequisite.clean`).
+
+Eligibility checks are set lookups on course codes:
+
+- the requisite map (course code -> required codes) is cached under the
+  `requisites` and `catalog` version counters;
+- a student's passed courses (released grades that aren't failing) are cached
+  under the student's `grades` counter.
+
+A prerequisite must be passed; a co-requisite must be passed or taken in the
+same term. `check_sections` flags a whole registration listing in one pass.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.db import transaction
+
+from . import metrics
+from .caching import bump_version, get_versions
+from .db_routing import use_primary
+from .models import Course, CourseRequisite, Grade, PrerequisiteClosure
+
+CACHE_SECONDS = 60 * 60
+# Released grade values that don't pass a course (blank values never do).
+FAILING_GRADES = frozenset({"F", "W", "WF", "I", "IP", "NP", "U"})
+
+
+@dataclass(frozen=True)
+class Requirements:
+	# Sorted course codes.
+	prerequisites: tuple[str, ...]
+	corequisites: tuple[str, ...]
+	# Every direct and indirect prerequisite, deepest first (the order to take them in).
+	chain: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class Ineligibility:
+	course: str
+	missing_prerequisites: tuple[str, ...]
+	missing_corequisites: tuple[str, ...]
+	# Indirect prerequisites not passed either, deepest first.
+	missing_chain: tuple[str, ...]
+
+	@property
+	def message(self) -> str:
+		parts = []
+		if self.missing_prerequisites:
+			parts.append(f"needs {', '.join(self.missing_prerequisites)} first")
+		if self.missing_corequisites:
+			parts.append(f"take {', '.join(self.missing_corequisites)} in the same term")
+		return f"{self.course}: {'; '.join(parts)}."
+
+
+def is_passing(value: str) -> bool:
+	value = value.strip().upper()
+	return bool(value) and value not in FAILING_GRADES
+
+
+def rebuild_closure() -> int:
+	"""Recompute `PrerequisiteClosure` from the prerequisite rules; return the number of rows."""
+	graph: dict[int, list[int]] = {}
+	rules = CourseRequisite.objects.filter(kind=CourseRequisite.Kind.PREREQUISITE)
+	for course_id, required_id in rules.values_list("course_id", "required_course_id"):
+		graph.setdefault(course_id, []).append(required_id)
+
+	rows = []
+	for course_id in graph:
+		# Breadth-first, so each prerequisite gets its shortest depth; `seen` also stops at cycles.
+		seen = {course_id}
+		queue = deque((required_id, 1) for required_id in graph[course_id])
+		while queue:
+			required_id, depth = queue.popleft()
+			if required_id in seen:
+				continue
+			seen.add(required_id)
+			rows.append(PrerequisiteClosure(course_id=course_id, prerequisite_id=required_id, depth=depth))
+			queue.extend((next_id, depth + 1) for next_id in graph.get(required_id, ()))
+
+	with transaction.atomic():
+		PrerequisiteClosure.objects.all().delete()
+		PrerequisiteClosure.objects.bulk_create(rows, batch_size=1000)
+		transaction.on_commit(lambda: bump_version("requisites"))
+	return len(rows)
+
+
+def _cached(key: str, build):
+	value = cache.get(key)
+	metrics.cache_lookup("requisites", value is not None)
+	if value is None:
+		with use_primary():
+			value = build()
+		cache.set(key, value, CACHE_SECONDS)
+	return value
+
+
+def _build_requirements() -> dict[str, Requirements]:
+	course_ids = set()
+	rules = list(CourseRequisite.objects.values_list("course_id", "required_course_id", "kind"))
+	closure = list(PrerequisiteClosure.objects.order_by("-depth", "prerequisite_id").values_list("course_id", "prerequisite_id"))
+	for course_id, required_id, _ in rules:
+		course_ids.update((course_id, required_id))
+	for _, required_id in closure:
+		course_ids.add(required_id)
+	codes = dict(Course.objects.filter(id__in=course_ids).values_list("id", "code"))
+
+	pre: dict[str, set[str]] = {}
+	co: dict[str, set[str]] = {}
+	chain: dict[str, list[str]] = {}
+	for course_id, required_id, kind in rules:
+		target = pre if kind == CourseRequisite.Kind.PREREQUISITE else co
+		target.setdefault(codes[course_id], set()).add(codes[required_id])
+	for course_id, required_id in closure:
+		chain.setdefault(codes[course_id], []).append(codes[required_id])
+	return {
+		code: Requirements(tuple(sorted(pre.get(code, ()))), tuple(sorted(co.get(code, ()))), tuple(chain.get(code, ())))
+		for code in pre.keys() | co.keys()
+	}
+
+
+def requirements_map() -> dict[str, Requirements]:
+	"""Requirements of every course that has any, keyed by course code."""
+	versions = get_versions([("requisites", ""), ("catalog", "")])
+	key = f"portal:req:map:{versions[('requisites', '')]}:{versions[('catalog', '')]}"
+	return _cached(key, _build_requirements)
+
+
+def passed_courses(student_id: int) -> frozenset[str]:
+	"""Codes of the courses a student has passed (released, non-failing grades)."""
+	versions = get_versions([("grades", student_id), ("catalog", "")])
+	key = f"portal:req:passed:{student_id}:{versions[('grades', student_id)]}:{versions[('catalog', '')]}"
+
+	def build():
+		grades = Grade.objects.filter(student_id=student_id, released=True).values_list("section__course__code", "value")
+		return frozenset(code for code, value in grades if is_passing(value))
+
+	return _cached(key, build)
+
+
+def check(
+	course_code: str,
+	passed: frozenset[str],
+	taking: frozenset[str] = frozenset(),
+	requirements: dict[str, Requirements] | None = None,
+) -> Ineligibility | None:
+	"""Why a student with `passed` courses (and `taking` this term) can't add `course_code`, or None."""
+	rules = (requirements if requirements is not None else requirements_map()).get(course_code)
+	if rules is None:
+		return None
+	missing_pre = tuple(code for code in rules.prerequisites if code not in passed)
+	missing_co = tuple(code for code in rules.corequisites if code not in passed and code not in taking)
+	if not missing_pre and not missing_co:
+		return None
+	return Ineligibility(
+		course=course_code,
+		missing_prerequisites=missing_pre,
+		missing_corequisites=missing_co,
+		missing_chain=tuple(code for code in rules.chain if code not in passed and code not in missing_pre),
+	)
+
+
+def check_sections(student_id: int, sections, taking: frozenset[str] = frozenset()) -> dict[int, Ineligibility]:
+	"""Ineligible sections among `sections` (anything with `.id` and `.course.code`), by section id."""
+	requirements = requirements_map()
+	if not requirements:
+		return {}
+	passed = passed_courses(student_id)
+	result = {}
+	for section in sections:
+		problem = check(section.course.code, passed, taking, requirements)
+		if problem is not None:
+			result[section.id] = problem
+	return result
@@ -3,6 +3,10 @@ from __future__ import annotations
 from typing import Iterable
 
 from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+
+from .caching import get_versions
+from .db_routing import use_primary
 
 
 ROLE_STUDENT = "Student"
@@ -24,6 +28,8 @@ ALL_ROLES: list[str] = [
 ]
 
 
+ROLE_CACHE_SECONDS = 60 * 60
+
 ROLE_KEY_GROUPS: dict[str, list[str]] = {
     "STUDENT": [ROLE_STUDENT],
     "FACULTY": [ROLE_FACULTY],
@@ -45,12 +51,24 @@ def ensure_role_groups() -> None:
     ensure_groups_exist()
 
 
+def role_names(user: User) -> frozenset[str]:
+    """Names of the user's groups, cached until their roles or any group change (see portal.signals)."""
+    versions = get_versions([("roles", user.pk), ("groups", "")])
+    key = "portal:roles:{}:{}".format(user.pk, "-".join(str(v) for v in versions.values()))
+    names = cache.get(key)
+    if names is None:
+        with use_primary():
+            names = frozenset(user.groups.values_list("name", flat=True))
+        cache.set(key, names, ROLE_CACHE_SECONDS)
+    return names
+
+
 def user_in_any_group(user: User, group_names: Iterable[str]) -> bool:
     if not user.is_authenticated:
         return False
     if user.is_superuser:
         return True
-    return user.groups.filter(name__in=list(group_names)).exists()
+    return not role_names(user).isdisjoint(group_names)
 
 
 def is_in_role(user: User, role_key_or_group_name: str) -> bool:
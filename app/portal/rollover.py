@@ -0,0 +1,184 @@
+"""Term rollover: clone a term's sections and instructor links into another term.
+
+`plan_rollover` compares the source term's sections with the target term's,
+matched on (course, section code), and returns what a rollover would create,
+skip and leave alone; `apply_rollover` writes the plan with `bulk_create` in one
+transaction. Sections already in the target are skipped, so a rollover can be
+re-run after adding sections to the source. Used by `manage.py rollover_term`
+and the registrar's rollover page.
+
+`apply_rollover` locks the target term and drops sections that appeared in it
+since the plan was made, so two rollovers into the same term (two registrars,
+or the page and the command) don't both copy every section.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.db import transaction
+
+from .caching import bump_version
+from .models import Section, SectionInstructor, Term
+
+BATCH_SIZE = 1000
+
+
+@dataclass
+class RolloverPlan:
+	source: Term
+	# The target term, or None when `apply_rollover` should create it from `target_fields`.
+	target: Term | None
+	target_fields: dict
+	capacity_percent: int = 0
+	with_instructors: bool = True
+	new_sections: list[Section] = field(default_factory=list)
+	# Source section id -> instructor ids to link to its clone.
+	instructor_ids: dict[int, list[int]] = field(default_factory=dict)
+	skipped: list[Section] = field(default_factory=list)
+	only_in_target: list[Section] = field(default_factory=list)
+
+	@property
+	def target_name(self) -> str:
+		return self.target.name if self.target else self.target_fields["name"]
+
+	@property
+	def instructor_links(self) -> int:
+		return sum(len(self.instructor_ids.get(s.source_id, ())) for s in self.new_sections)
+
+	@property
+	def capacity_changes(self) -> int:
+		return sum(1 for s in self.new_sections if s.capacity != s.source_capacity)
+
+	@property
+	def seats(self) -> tuple[int, int]:
+		"""Total capacity of the new sections before and after the adjustment."""
+		return sum(s.source_capacity for s in self.new_sections), sum(s.capacity for s in self.new_sections)
+
+
+@dataclass
+class RolloverResult:
+	term: Term
+	sections: int
+	instructor_links: int
+
+
+def _key(section: Section) -> tuple[int, str]:
+	return section.course_id, section.section_code
+
+
+def adjusted_capacity(capacity: int, percent: int) -> int:
+	return max(1, round(capacity * (100 + percent) / 100))
+
+
+def plan_rollover(
+	source: Term,
+	target_name: str,
+	*,
+	start_date: date | None = None,
+	end_date: date | None = None,
+	capacity_percent: int = 0,
+	with_instructors: bool = True,
+) -> RolloverPlan:
+	"""Work out a rollover from `source` into the term named `target_name` without writing anything.
+
+	A missing target term is created on apply, with `start_date` and `end_date`
+	(required then) and the source's registration window moved by the same offset.
+	"""
+	target = Term.objects.filter(name=target_name).first()
+	target_fields: dict = {}
+	if target is None:
+		if start_date is None or end_date is None:
+			raise ValueError(f"Term '{target_name}' doesn't exist; give its start and end dates to create it.")
+		if end_date < start_date:
+			raise ValueError("The end date is before the start date.")
+		shift = start_date - source.start_date
+		target_fields = {
+			"name": target_name,
+			"start_date": start_date,
+			"end_date": end_date,
+			"registration_start": source.registration_start + shift if source.registration_start else None,
+			"registration_end": source.registration_end + shift if source.registration_end else None,
+		}
+	elif target.id == source.id:
+		raise ValueError("The source and target terms are the same.")
+
+	plan = RolloverPlan(
+		source=source,
+		target=target,
+		target_fields=target_fields,
+		capacity_percent=capacity_percent,
+		with_instructors=with_instructors,
+	)
+	existing = {}
+	if target is not None:
+		existing = {_key(s): s for s in Section.objects.select_related("course").filter(term=target)}
+
+	source_sections = list(Section.objects.select_related("course").filter(term=source).order_by("course__code", "section_code"))
+	source_keys = set()
+	for section in source_sections:
+		key = _key(section)
+		source_keys.add(key)
+		if key in existing:
+			plan.skipped.append(section)
+			continue
+		clone = Section(
+			course_id=section.course_id,
+			section_code=section.section_code,
+			capacity=adjusted_capacity(section.capacity, capacity_percent),
+			meeting_days=section.meeting_days,
+			start_time=section.start_time,
+			end_time=section.end_time,
+			location=section.location,
+		)
+		# Not model fields: used to copy instructor links and for the report.
+		clone.source_id = section.id
+		clone.source_capacity = section.capacity
+		clone.course = section.course
+		plan.new_sections.append(clone)
+	plan.only_in_target = sorted(
+		(s for key, s in existing.items() if key not in source_keys), key=lambda s: (s.course.code, s.section_code)
+	)
+
+	if with_instructors and plan.new_sections:
+		links = SectionInstructor.objects.filter(section__term=source).values_list("section_id", "instructor_id")
+		for section_id, instructor_id in links.order_by("id"):
+			plan.instructor_ids.setdefault(section_id, []).append(instructor_id)
+	return plan
+
+
+def apply_rollover(plan: RolloverPlan, *, activate: bool = False) -> RolloverResult:
+	"""Create the plan's target term (if new), sections and instructor links in one transaction."""
+	with transaction.atomic():
+		target = plan.target
+		if target is None:
+			# Another rollover may have created it since the plan was made.
+			target, _ = Term.objects.get_or_create(name=plan.target_fields["name"], defaults=plan.target_fields)
+		# A concurrent rollover into the same term waits here, then sees what this one created.
+		target = Term.objects.select_for_update().get(id=target.id)
+		existing = set(Section.objects.filter(term=target).values_list("course_id", "section_code"))
+		new_sections = [section for section in plan.new_sections if _key(section) not in existing]
+		for section in new_sections:
+			section.term = target
+		# PostgreSQL and SQLite (3.35+) return the new primary keys from bulk_create.
+		Section.objects.bulk_create(new_sections, batch_size=BATCH_SIZE)
+		links = [
+			SectionInstructor(section_id=section.id, instructor_id=instructor_id)
+			for section in new_sections
+			for instructor_id in plan.instructor_ids.get(section.source_id, ())
+		]
+		SectionInstructor.objects.bulk_create(links, batch_size=BATCH_SIZE, ignore_conflicts=True)
+		if activate:
+			Term.objects.exclude(id=target.id).update(is_active=False)
+			Term.objects.filter(id=target.id).update(is_active=True)
+			target.is_active = True
+
+		# bulk_create and update() skip the signals that invalidate cached views.
+		def invalidate():
+			bump_version("schedule")
+			for instructor_id in {link.instructor_id for link in links}:
+				bump_version("teaching", instructor_id)
+
+		transaction.on_commit(invalidate)
+	return RolloverResult(term=target, sections=len(new_sections), instructor_links=len(links))
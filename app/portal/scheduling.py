@@ -0,0 +1,173 @@
+"""Helpers for interpreting section meeting patterns and detecting clashes."""
+
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+_DAY_ALIASES = {name.lower(): idx for idx, name in enumerate(WEEKDAYS)}
+
+
+def parse_meeting_days(value: str) -> list[int]:
+	"""Parse a `Section.meeting_days` string such as "Mon,Wed" into weekday numbers.
+
+	Weekdays follow `date.weekday()` (Monday is 0). Unknown tokens are ignored.
+	"""
+	days: set[int] = set()
+	for token in (value or "").replace("/", ",").replace(" ", ",").split(","):
+		idx = _DAY_ALIASES.get(token.strip()[:3].lower())
+		if idx is not None:
+			days.add(idx)
+	return sorted(days)
+
+
+def minutes(value) -> int:
+	return value.hour * 60 + value.minute
+
+
+@dataclass(frozen=True)
+class Meeting:
+	section_id: int
+	weekday: int
+	start: int
+	end: int
+
+
+@dataclass
+class Conflict:
+	kind: str
+	resource: str
+	section_ids: tuple[int, int]
+	weekdays: list[int] = field(default_factory=list)
+	labels: tuple[str, str] = ("", "")
+
+	@property
+	def days_display(self) -> str:
+		return ",".join(WEEKDAYS[d] for d in self.weekdays)
+
+
+@dataclass
+class RoomUsage:
+	room: str
+	meetings: int
+	busy_minutes: int
+	available_minutes: int
+
+	@property
+	def percent(self) -> float:
+		if not self.available_minutes:
+			return 0.0
+		return round(100.0 * self.busy_minutes / self.available_minutes, 1)
+
+
+def section_meetings(section_id: int, meeting_days: str, start_time, end_time) -> list[Meeting]:
+	if not start_time or not end_time:
+		return []
+	start, end = minutes(start_time), minutes(end_time)
+	if end <= start:
+		return []
+	return [Meeting(section_id, day, start, end) for day in parse_meeting_days(meeting_days)]
+
+
+def sweep_conflicts(kind: str, resource: str, meetings: list[Meeting]) -> list[Conflict]:
+	"""Report overlapping meetings on one resource's timeline.
+
+	Meetings are sorted once and swept with a min-heap of end times, so the cost
+	is O(n log n) plus the number of overlaps reported.
+	"""
+	found: dict[tuple[int, int], set[int]] = {}
+	active: list[tuple[int, int]] = []
+	day = None
+	for m in sorted(meetings, key=lambda m: (m.weekday, m.start, m.end)):
+		if m.weekday != day:
+			day = m.weekday
+			active = []
+		while active and active[0][0] <= m.start:
+			heapq.heappop(active)
+		for _, other_id in active:
+			if other_id != m.section_id:
+				pair = (min(other_id, m.section_id), max(other_id, m.section_id))
+				found.setdefault(pair, set()).add(m.weekday)
+		heapq.heappush(active, (m.end, m.section_id))
+	return [Conflict(kind, resource, pair, sorted(days)) for pair, days in sorted(found.items())]
+
+
+def busy_minutes(meetings: list[Meeting], window_start: int, window_end: int) -> int:
+	"""Total minutes covered by the union of meetings, clipped to the daily window."""
+	total = 0
+	day = None
+	block_start = block_end = 0
+	for m in sorted(meetings, key=lambda m: (m.weekday, m.start)):
+		start, end = max(m.start, window_start), min(m.end, window_end)
+		if end <= start:
+			continue
+		if m.weekday != day or start > block_end:
+			total += block_end - block_start
+			day, block_start, block_end = m.weekday, start, end
+		else:
+			block_end = max(block_end, end)
+	return total + (block_end - block_start)
+
+
+def analyze_meetings(
+	room_meetings: dict[str, list[Meeting]],
+	instructor_meetings: dict[str, list[Meeting]],
+	*,
+	window_start: int = 8 * 60,
+	window_end: int = 18 * 60,
+	days_per_week: int = 5,
+) -> dict:
+	available = max(window_end - window_start, 0) * days_per_week
+	room_conflicts: list[Conflict] = []
+	usage: list[RoomUsage] = []
+	for room, items in room_meetings.items():
+		room_conflicts += sweep_conflicts("room", room, items)
+		usage.append(RoomUsage(room, len(items), busy_minutes(items, window_start, window_end), available))
+	instructor_conflicts: list[Conflict] = []
+	for instructor, items in instructor_meetings.items():
+		instructor_conflicts += sweep_conflicts("instructor", instructor, items)
+	usage.sort(key=lambda u: (-u.busy_minutes, u.room))
+	return {
+		"room_conflicts": room_conflicts,
+		"instructor_conflicts": instructor_conflicts,
+		"room_usage": usage,
+	}
+
+
+def analyze_term(term, **window) -> dict:
+	"""Detect room/instructor double-booking and room utilization for one term.
+
+	Runs two queries (sections and instructor links) regardless of term size.
+	"""
+	from .models import Section, SectionInstructor
+
+	rows = Section.objects.filter(term=term).values_list(
+		"id", "course__code", "section_code", "meeting_days", "start_time", "end_time", "location"
+	)
+	by_section: dict[int, list[Meeting]] = {}
+	labels: dict[int, str] = {}
+	room_meetings: dict[str, list[Meeting]] = {}
+	room_names: dict[str, str] = {}
+	for section_id, code, section_code, days, start, end, location in rows.iterator(chunk_size=2000):
+		labels[section_id] = f"{code}-{section_code}"
+		meetings = section_meetings(section_id, days, start, end)
+		by_section[section_id] = meetings
+		room = " ".join((location or "").split())
+		if room and meetings:
+			key = room.casefold()
+			room_names.setdefault(key, room)
+			room_meetings.setdefault(room_names[key], []).extend(meetings)
+
+	instructor_meetings: dict[str, list[Meeting]] = {}
+	links = SectionInstructor.objects.filter(section__term=term).values_list("section_id", "instructor__username")
+	for section_id, username in links.iterator(chunk_size=2000):
+		instructor_meetings.setdefault(username, []).extend(by_section.get(section_id, []))
+
+	report = analyze_meetings(room_meetings, instructor_meetings, **window)
+	for conflict in report["room_conflicts"] + report["instructor_conflicts"]:
+		a, b = conflict.section_ids
+		conflict.labels = (labels[a], labels[b])
+	report["section_count"] = len(labels)
+	return report
@@ -0,0 +1,39 @@
+"""Cache-first sessions (`SESSION_ENGINE = "portal.sessions"`).
+
+Django's `cached_db` store: a session is read from the cache and only falls
+back to its `django_session` row on a miss, so a warm authenticated request
+doesn't touch the session table. Every save writes both the row and the cache.
+
+With `SESSION_SAVE_EVERY_REQUEST` (a sliding expiry) that would be one database
+write per request, so a save that only extends the expiry refreshes the cache
+entry and writes the row back once it is `PORTAL_SESSION_WRITE_BACK_SECONDS`
+old. Saves that change the session (log in, log out, messages) always write
+through. If the cache loses an entry, the row it falls back to has the data of
+the last write and an expiry at most that many seconds short.
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+
+# Session key holding when the row was last written (seconds since the epoch).
+WRITTEN_AT_KEY = "_portal_written_at"
+
+
+class SessionStore(cached_db.SessionStore):
+	def save(self, must_create=False):
+		interval = getattr(settings, "PORTAL_SESSION_WRITE_BACK_SECONDS", 0)
+		if must_create or self.modified or self.session_key is None or interval <= 0:
+			return self._write_through(must_create)
+		data = self._get_session()
+		if time.time() - data.get(WRITTEN_AT_KEY, 0) >= interval:
+			return self._write_through(must_create)
+		self._cache.set(self.cache_key, data, self.get_expiry_age())
+
+	def _write_through(self, must_create):
+		# Set on the dict itself: assigning through the session would mark it modified.
+		self._get_session(no_load=must_create)[WRITTEN_AT_KEY] = int(time.time())
+		super().save(must_create)
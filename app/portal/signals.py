@@ -0,0 +1,151 @@
+"""Model signal handlers that keep cached portal data fresh."""
+
+from __future__ import annotations
+
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from . import availability
+from .caching import bump_version
+from .models import (
+	Announcement,
+	Course,
+	CourseRequisite,
+	DegreeProgram,
+	DegreeRequirement,
+	Enrollment,
+	Grade,
+	Section,
+	SectionInstructor,
+	StudentProgram,
+	SupportTicket,
+	Term,
+)
+from .requisites import rebuild_closure
+from .roles import ensure_groups_exist
+
+
+def _bump(scope: str, key: object = "") -> None:
+	# After commit: a read between the bump and the commit would cache pre-commit rows under the new version.
+	transaction.on_commit(partial(bump_version, scope, key))
+
+
+@receiver(post_migrate)
+def create_role_groups(sender, app_config=None, **kwargs) -> None:
+	# Once per migrate instead of on every login and dashboard load.
+	if app_config is not None and app_config.label == "portal":
+		ensure_groups_exist()
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def enrollment_changed(sender, instance: Enrollment, **kwargs) -> None:
+	_bump("enrollments", instance.student_id)
+	transaction.on_commit(partial(availability.push_section, instance.section_id))
+
+
+@receiver([post_save, post_delete], sender=Grade)
+def grade_changed(sender, instance: Grade, **kwargs) -> None:
+	_bump("grades", instance.student_id)
+
+
+@receiver([post_save, post_delete], sender=CourseRequisite)
+def requisite_changed(sender, instance: CourseRequisite, **kwargs) -> None:
+	# Once the rule is committed; rebuild_closure bumps the `requisites` counter. A rebuild reads every rule, so
+	# one per transaction covers all the rules it saves.
+	connection = transaction.get_connection()
+	queued = getattr(connection, "_portal_closure_rebuild", None)
+	# The mark only counts while its callback is still queued: a rollback drops both.
+	if queued is not None and any(func is queued for _, func, *_ in connection.run_on_commit):
+		return
+
+	def rebuild() -> None:
+		connection._portal_closure_rebuild = None
+		rebuild_closure()
+
+	connection._portal_closure_rebuild = rebuild
+	transaction.on_commit(rebuild)
+
+
+@receiver([post_save, post_delete], sender=DegreeProgram)
+@receiver([post_save, post_delete], sender=DegreeRequirement)
+def program_rules_changed(sender, instance, **kwargs) -> None:
+	_bump("programs")
+
+
+@receiver(m2m_changed, sender=DegreeRequirement.courses.through)
+def program_courses_changed(sender, action: str, **kwargs) -> None:
+	if action in {"post_add", "post_remove", "post_clear"}:
+		_bump("programs")
+
+
+@receiver([post_save, post_delete], sender=StudentProgram)
+def student_program_changed(sender, instance: StudentProgram, **kwargs) -> None:
+	_bump("student_programs", instance.student_id)
+
+
+@receiver([post_save, post_delete], sender=SectionInstructor)
+def teaching_changed(sender, instance: SectionInstructor, **kwargs) -> None:
+	_bump("teaching", instance.instructor_id)
+
+
+@receiver([post_save, post_delete], sender=Term)
+@receiver([post_save, post_delete], sender=Course)
+@receiver([post_save, post_delete], sender=Section)
+def schedule_changed(sender, instance, **kwargs) -> None:
+	_bump("schedule")
+
+
+@receiver([post_save, post_delete], sender=Course)
+def catalog_changed(sender, instance: Course, **kwargs) -> None:
+	_bump("catalog")
+
+
+@receiver([post_save, post_delete], sender=SupportTicket)
+def ticket_changed(sender, instance: SupportTicket, **kwargs) -> None:
+	_bump("tickets", instance.created_by_id)
+
+
+@receiver([post_save, post_delete], sender=Announcement)
+def announcement_changed(sender, instance: Announcement, **kwargs) -> None:
+	_bump("announcements")
+
+
+@receiver(m2m_changed, sender=Announcement.target_roles.through)
+def announcement_audience_changed(sender, action: str, **kwargs) -> None:
+	if action in {"post_add", "post_remove", "post_clear"}:
+		_bump("announcements")
+
+
+@receiver(post_save, sender=get_user_model())
+def user_changed(sender, instance, update_fields=None, **kwargs) -> None:
+	# Logins only touch last_login; don't invalidate per-user caches for those.
+	if update_fields is not None and set(update_fields) <= {"last_login"}:
+		return
+	_bump("roles", instance.pk)
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def roles_changed(sender, instance, action: str, reverse: bool, pk_set, **kwargs) -> None:
+	if reverse and action == "pre_clear":
+		# `group.user_set.clear()` sends post_clear without a pk_set: note the members first.
+		instance._portal_cleared_user_ids = list(instance.user_set.values_list("pk", flat=True))
+		return
+	if action not in {"post_add", "post_remove", "post_clear"}:
+		return
+	if not reverse:
+		_bump("roles", instance.pk)
+		return
+	if action == "post_clear":
+		pk_set = instance.__dict__.pop("_portal_cleared_user_ids", ())
+	for user_id in pk_set or []:
+		_bump("roles", user_id)
+
+
+@receiver([post_save, post_delete], sender=Group)
+def group_changed(sender, instance: Group, **kwargs) -> None:
+	_bump("groups")
@@ -0,0 +1,37 @@
+"""Tuned SQLite profile for single-node deployments.
+
+With `PORTAL_SQLITE_TUNED` on, every new SQLite connection gets
+`PORTAL_SQLITE_PRAGMAS` (see settings.py):
+
+- `journal_mode=WAL` lets readers keep reading while one writer commits.
+- `busy_timeout` makes a writer wait for the write lock rather than fail.
+- `synchronous=NORMAL` is durable against application crashes in WAL mode. A
+  power loss can lose the last commits but cannot corrupt the file.
+- `mmap_size`, `cache_size` and `temp_store` keep hot pages and sorts in memory.
+
+The busy timeout does not help a transaction that started with a plain
+(deferred) `BEGIN`, read, and then tried to write after another connection
+committed. SQLite fails that upgrade straight away. The profile therefore sets
+Django's `transaction_mode` to `IMMEDIATE`, so every `transaction.atomic()`
+block takes the write lock up front; the views only open those blocks around
+writes. `manage.py bench_sqlite_writes` compares the profile with the defaults.
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def apply_pragmas(cursor, pragmas: dict) -> None:
+	for name, value in pragmas.items():
+		cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(connection_created, dispatch_uid="portal_sqlite_pragmas")
+def tune_sqlite_connection(sender, connection, **kwargs):
+	if connection.vendor != "sqlite" or not getattr(settings, "PORTAL_SQLITE_TUNED", False):
+		return
+	with connection.cursor() as cursor:
+		apply_pragmas(cursor, settings.PORTAL_SQLITE_PRAGMAS)
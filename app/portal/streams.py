@@ -0,0 +1,260 @@
+"""Live seat counts over server-sent events.
+
+`seat_stream_app` is a small ASGI app mounted in front of Django by
+`university_portal.asgi` for the `portal:seat_stream` URL. It bypasses
+Django's request handling on purpose: Django keeps a thread (and the DB
+connection it opened) for every in-flight ASGI request, which would mean one
+thread per idle subscriber. Here an idle stream is a coroutine and a
+`pubsub.Subscription`; DB work happens in short-lived pool-thread calls that
+close their connections afterwards.
+
+An enrollment committed in this process reaches its streams at once through
+`pubsub`. Commits in other processes (gunicorn workers, other uvicorn workers)
+are picked up by one poller per term and process (`_TermPoller`), which
+re-reads `availability.seats_taken` from the shared cache every
+`PORTAL_SEAT_STREAM_POLL_SECONDS` and publishes the sections that changed, so
+the cost doesn't grow with the number of streams. That needs a cache shared by
+the processes; `check_shared_cache` (portal.W002) warns when several uvicorn
+workers would each keep their own.
+
+Clients authenticate with a signed, expiring token (`stream_url`) because the
+session isn't loaded on this path. Under WSGI the same URL is served by
+`views.seat_stream`, which returns one snapshot and lets the browser reconnect
+after `RETRY_MS`, i.e. it degrades to slow polling.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import checks, signing
+from django.db import connections
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from university_portal.server_sizing import UVICORN_WORKER, server_plan
+
+from . import availability, pubsub
+from .models import Term
+
+# Caches that each process keeps to itself.
+_PROCESS_LOCAL_CACHES = ("django.core.cache.backends.locmem.LocMemCache", "django.core.cache.backends.dummy.DummyCache")
+
+HEARTBEAT_SECONDS = 15
+RETRY_MS = 5000
+MAX_SECTIONS = 200
+TOKEN_SALT = "portal.seat_stream"
+TOKEN_MAX_AGE = 60 * 60 * 12
+
+
+class StreamRequestError(Exception):
+	def __init__(self, status: int, message: str):
+		super().__init__(message)
+		self.status = status
+
+
+def stream_url(user, section_ids=None) -> str:
+	params = {"token": signing.dumps(user.pk, salt=TOKEN_SALT)}
+	if section_ids:
+		params["sections"] = ",".join(str(sid) for sid in list(section_ids)[:MAX_SECTIONS])
+	return f"{reverse('portal:seat_stream')}?{urlencode(params)}"
+
+
+def parse_request(token: str, sections: str) -> list[int]:
+	"""Validate the token and return the requested section ids (empty = whole active term)."""
+	try:
+		signing.loads(token, salt=TOKEN_SALT, max_age=TOKEN_MAX_AGE)
+	except signing.BadSignature as exc:
+		raise StreamRequestError(403, "Invalid or expired stream token.") from exc
+	try:
+		section_ids = sorted({int(x) for x in sections.split(",") if x.strip()})
+	except ValueError as exc:
+		raise StreamRequestError(400, "sections must be a comma-separated list of ids.") from exc
+	if len(section_ids) > MAX_SECTIONS:
+		raise StreamRequestError(400, f"At most {MAX_SECTIONS} sections per stream.")
+	return section_ids
+
+
+def sse(event: str, data: dict) -> str:
+	return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def _release_db_connections() -> None:
+	for conn in connections.all(initialized_only=True):
+		if not conn.in_atomic_block:
+			conn.close()
+
+
+def active_term_id() -> int | None:
+	try:
+		return Term.objects.filter(is_active=True).order_by("-start_date").values_list("id", flat=True).first()
+	finally:
+		_release_db_connections()
+
+
+def snapshot(term_id: int, section_ids: list[int]) -> dict[str, int]:
+	"""Current enrolled counts as `{section_id: enrolled}` (JSON-ready keys)."""
+	try:
+		if section_ids:
+			seats = availability.seats_taken(term_id)
+			return {str(sid): seats.get(sid, 0) for sid in section_ids}
+		return {str(row.id): row.enrolled_count for row in availability.term_sections(Term(id=term_id))}
+	finally:
+		_release_db_connections()
+
+
+def first_event(term_id: int, section_ids: list[int]) -> str:
+	return f"retry: {RETRY_MS}\n\n" + sse("seats", {"seats": snapshot(term_id, section_ids)})
+
+
+def _seats(term_id: int) -> dict[int, int]:
+	try:
+		return availability.seats_taken(term_id)
+	finally:
+		_release_db_connections()
+
+
+class _TermPoller:
+	"""Publishes seat counts other processes committed for one term, while this process has streams on it."""
+
+	def __init__(self, term_id: int):
+		self.term_id = term_id
+		self.streams = 0
+		self.task = asyncio.ensure_future(self._run())
+
+	async def _run(self) -> None:
+		last = await sync_to_async(_seats, thread_sensitive=False)(self.term_id)
+		while True:
+			await asyncio.sleep(getattr(settings, "PORTAL_SEAT_STREAM_POLL_SECONDS", 1.0))
+			try:
+				seats = await sync_to_async(_seats, thread_sensitive=False)(self.term_id)
+			except Exception:
+				# Keep the streams open; the next round retries.
+				continue
+			for section_id in seats.keys() | last.keys():
+				count = seats.get(section_id, 0)
+				if count != last.get(section_id, 0):
+					topics = (pubsub.section_topic(section_id), pubsub.term_topic(self.term_id))
+					pubsub.broker.publish(topics, section_id, count)
+			last = seats
+
+
+# (event loop, term id) -> poller; a process normally runs one loop.
+_pollers: dict[tuple[asyncio.AbstractEventLoop, int], _TermPoller] = {}
+
+
+def _watch_term(term_id: int) -> tuple:
+	key = (asyncio.get_running_loop(), term_id)
+	poller = _pollers.get(key)
+	if poller is None:
+		poller = _pollers[key] = _TermPoller(term_id)
+	poller.streams += 1
+	return key
+
+
+def _unwatch_term(key: tuple) -> None:
+	poller = _pollers[key]
+	poller.streams -= 1
+	if not poller.streams:
+		poller.task.cancel()
+		del _pollers[key]
+
+
+async def _plain(send, status: int, text: str) -> None:
+	await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"text/plain; charset=utf-8")]})
+	await send({"type": "http.response.body", "body": text.encode()})
+
+
+async def _disconnected(receive) -> None:
+	while (await receive())["type"] != "http.disconnect":
+		pass
+
+
+async def seat_stream_app(scope, receive, send) -> None:
+	query = parse_qs(scope.get("query_string", b"").decode())
+	try:
+		section_ids = parse_request(query.get("token", [""])[0], query.get("sections", [""])[0])
+	except StreamRequestError as exc:
+		await _plain(send, exc.status, str(exc))
+		return
+	term_id = await sync_to_async(active_term_id, thread_sensitive=False)()
+	if term_id is None:
+		await _plain(send, 404, "No active term.")
+		return
+
+	if section_ids:
+		topics = [pubsub.section_topic(sid) for sid in section_ids]
+	else:
+		topics = [pubsub.term_topic(term_id)]
+	disconnected = asyncio.ensure_future(_disconnected(receive))
+	# Subscribe before taking the snapshot so no commit falls in between.
+	sub = pubsub.broker.subscribe(topics)
+	watch = _watch_term(term_id)
+	try:
+		await send(
+			{
+				"type": "http.response.start",
+				"status": 200,
+				"headers": [
+					(b"content-type", b"text/event-stream"),
+					(b"cache-control", b"no-cache"),
+					(b"x-accel-buffering", b"no"),  # don't let nginx buffer the stream
+				],
+			}
+		)
+		body = await sync_to_async(first_event, thread_sensitive=False)(term_id, section_ids)
+		await send({"type": "http.response.body", "body": body.encode(), "more_body": True})
+		while not disconnected.done():
+			update = asyncio.ensure_future(sub.get(HEARTBEAT_SECONDS))
+			await asyncio.wait({update, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+			if not update.done():
+				update.cancel()
+				break
+			changes = update.result()
+			if changes:
+				chunk = sse("seats", {"seats": {str(k): v for k, v in changes.items()}})
+			else:
+				chunk = ": ping\n\n"
+			await send({"type": "http.response.body", "body": chunk.encode(), "more_body": True})
+	finally:
+		_unwatch_term(watch)
+		pubsub.broker.unsubscribe(sub)
+		disconnected.cancel()
+
+
+def with_seat_stream(django_app):
+	"""Wrap the Django ASGI app so the seat stream URL is served by `seat_stream_app`."""
+	stream_path = None
+
+	async def application(scope, receive, send):
+		nonlocal stream_path
+		if scope["type"] == "http":
+			if stream_path is None:
+				stream_path = scope.get("root_path", "") + reverse("portal:seat_stream")
+			if scope["path"] == stream_path:
+				return await seat_stream_app(scope, receive, send)
+		return await django_app(scope, receive, send)
+
+	return application
+
+
+def check_shared_cache(app_configs=None, **kwargs) -> list[checks.CheckMessage]:
+	plan = server_plan()
+	backend = settings.CACHES["default"]["BACKEND"]
+	if plan.worker_class != UVICORN_WORKER or plan.workers < 2 or backend not in _PROCESS_LOCAL_CACHES:
+		return []
+	return [
+		checks.Warning(
+			f"{plan.workers} uvicorn workers with a per-process cache ({backend.rsplit('.', 1)[-1]}): "
+			"seat streams only see enrollments made in their own worker.",
+			hint="Set DJANGO_CACHE_URL to a file:// or redis:// cache, or WEB_CONCURRENCY=1.",
+			id="portal.W002",
+		)
+	]
+
+
+checks.register(check_shared_cache, checks.Tags.caches)
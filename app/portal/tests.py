@@ -3,12 +3,30 @@ from __future__ import annotations
 from datetime import date, timedelta
 
 from django.contrib.auth.models import Group, User
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
-from .models import Course, Enrollment, FeeInvoice, Section, SupportMessage, SupportTicket, Term, TranscriptRequest
+from .models import (
+	Announcement,
+	Course,
+	CourseRequisite,
+	DegreeProgram,
+	DegreeRequirement,
+	Enrollment,
+	FeeInvoice,
+	Grade,
+	Section,
+	SectionInstructor,
+	StudentProgram,
+	SupportMessage,
+	SupportTicket,
+	Term,
+	TranscriptRequest,
+)
 from .roles import (
+	ROLE_FACULTY,
 	ROLE_FINANCE,
 	ROLE_IT_ADMIN,
 	ROLE_REGISTRAR,
@@ -19,6 +37,7 @@ from .roles import (
 
 class PortalSmokeTests(TestCase):
 	def setUp(self):
+		cache.clear()
 		ensure_groups_exist()
 		self.student = User.objects.create_user(username="student_test", password="password123")
 		self.student.groups.add(Group.objects.get(name=ROLE_STUDENT))
@@ -182,6 +201,27 @@ class PortalSmokeTests(TestCase):
 		self.assertEqual(resp6.status_code, 200)
 		self.assertIn("official_transcript_TR", resp6.get("Content-Disposition", ""))
 
+	def test_transcript_transitions_recheck_the_status(self):
+		from .models import TranscriptRequestEvent
+
+		tr = TranscriptRequest.objects.create(
+			requester=self.student, purpose="Visa", delivery_method=TranscriptRequest.DeliveryMethod.EMAIL
+		)
+		self.client.force_login(self.registrar)
+		approve = reverse("portal:registrar_approve", kwargs={"request_id": tr.id})
+		self.client.post(approve, data={"reason": "OK"})
+		# A double-submitted approve, and an issue of a request cancelled meanwhile, change nothing.
+		resp = self.client.post(approve, data={"reason": "again"}, follow=True)
+		self.assertContains(resp, "This request is approved and can&#x27;t be approved.")
+		TranscriptRequest.objects.filter(id=tr.id).update(status=TranscriptRequest.Status.REJECTED)
+		self.client.post(reverse("portal:registrar_issue", kwargs={"request_id": tr.id}))
+		tr.refresh_from_db()
+		self.assertEqual((tr.status, tr.issued_at), (TranscriptRequest.Status.REJECTED, None))
+		self.assertEqual(
+			list(TranscriptRequestEvent.objects.filter(request=tr).values_list("from_status", "to_status")),
+			[(TranscriptRequest.Status.SUBMITTED, TranscriptRequest.Status.APPROVED)],
+		)
+
 	def test_unofficial_transcript_pdf_downloads_for_student(self):
 		ok = self.client.login(username="student_test", password="password123")
 		self.assertTrue(ok)
@@ -238,3 +278,1578 @@ class PortalSmokeTests(TestCase):
 		self.assertTrue(ok2)
 		resp2 = self.client.get(reverse("portal:finance"))
 		self.assertEqual(resp2.status_code, 200)
+
+
+class TimetableFeedTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		ensure_groups_exist()
+		self.student = User.objects.create_user(username="feed_student", password="password123")
+		self.student.groups.add(Group.objects.get(name=ROLE_STUDENT))
+		self.faculty = User.objects.create_user(username="feed_faculty", password="password123")
+		self.faculty.groups.add(Group.objects.get(name=ROLE_FACULTY))
+		self.term = Term.objects.create(
+			name="Fall 2026", start_date=date(2026, 9, 1), end_date=date(2026, 12, 15), is_active=True
+		)
+		course = Course.objects.create(code="MA101", title="Calculus, Part I")
+		self.section = Section.objects.create(
+			term=self.term,
+			course=course,
+			meeting_days="Tue,Thu",
+			start_time="09:00",
+			end_time="10:15",
+			location="Room 1",
+		)
+		SectionInstructor.objects.create(section=self.section, instructor=self.faculty)
+
+	def _feed_url(self, user):
+		self.client.force_login(user)
+		resp = self.client.get(reverse("portal:timetable"))
+		self.client.logout()
+		return resp.context["feed_url"]
+
+	def test_feed_renders_weekly_events_for_enrolled_sections(self):
+		Enrollment.objects.create(section=self.section, student=self.student)
+		resp = self.client.get(self._feed_url(self.student))
+		self.assertEqual(resp.status_code, 200)
+		self.assertEqual(resp["Content-Type"], "text/calendar; charset=utf-8")
+		body = resp.content.decode()
+		self.assertIn("DTSTART:20260901T090000", body)
+		self.assertIn("RRULE:FREQ=WEEKLY;BYDAY=TU,TH;UNTIL=20261215T235959", body)
+		self.assertIn("SUMMARY:MA101 Calculus\\, Part I (A)", body)
+
+		resp2 = self.client.get(self._feed_url(self.faculty))
+		self.assertIn("UID:section-%d@university-portal" % self.section.id, resp2.content.decode())
+
+	def test_conditional_get_returns_304_until_enrollment_changes(self):
+		url = self._feed_url(self.student)
+		resp = self.client.get(url)
+		etag = resp["ETag"]
+		self.assertNotIn("VEVENT", resp.content.decode())
+
+		with self.assertNumQueries(0):
+			resp2 = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(resp2.status_code, 304)
+
+		with self.captureOnCommitCallbacks(execute=True):
+			Enrollment.objects.create(section=self.section, student=self.student)
+		resp3 = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(resp3.status_code, 200)
+		self.assertNotEqual(resp3["ETag"], etag)
+		self.assertIn("VEVENT", resp3.content.decode())
+
+	def test_tampered_token_is_rejected(self):
+		resp = self.client.get(reverse("portal:timetable_feed", kwargs={"token": "bogus"}))
+		self.assertEqual(resp.status_code, 404)
+
+
+class ScheduleAnalysisTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		ensure_groups_exist()
+		self.registrar = User.objects.create_user(username="sched_registrar", password="password123")
+		self.registrar.groups.add(Group.objects.get(name=ROLE_REGISTRAR))
+		self.prof = User.objects.create_user(username="sched_prof", password="password123")
+		self.term = Term.objects.create(
+			name="Fall 2026", start_date=date(2026, 9, 1), end_date=date(2026, 12, 15), is_active=True
+		)
+
+	def _section(self, code, days, start, end, location):
+		course = Course.objects.create(code=code, title=code)
+		return Section.objects.create(
+			term=self.term, course=course, meeting_days=days, start_time=start, end_time=end, location=location
+		)
+
+	def test_detects_room_and_instructor_double_booking(self):
+		a = self._section("CS101", "Mon,Wed", "09:00", "10:30", "LT-1")
+		b = self._section("CS102", "Wed,Fri", "10:00", "11:00", "lt-1")
+		c = self._section("CS103", "Mon", "10:30", "12:00", "LT-1")
+		d = self._section("CS104", "Tue", "09:00", "10:00", "LT-2")
+		SectionInstructor.objects.create(section=a, instructor=self.prof)
+		SectionInstructor.objects.create(section=d, instructor=self.prof)
+		SectionInstructor.objects.create(section=c, instructor=self.prof)
+
+		from .scheduling import analyze_term
+
+		report = analyze_term(self.term)
+		self.assertEqual([(x.section_ids, x.weekdays) for x in report["room_conflicts"]], [((a.id, b.id), [2])])
+		self.assertEqual(report["instructor_conflicts"], [])
+
+		usage = {u.room: u for u in report["room_usage"]}
+		# LT-1: Mon 9:00-12:00, Wed 9:00-11:00, Fri 10:00-11:00 = 360 of 3000 minutes.
+		self.assertEqual(usage["LT-1"].busy_minutes, 360)
+		self.assertEqual(usage["LT-1"].percent, 12.0)
+
+		SectionInstructor.objects.create(section=b, instructor=self.prof)
+		report = analyze_term(self.term)
+		self.assertEqual(len(report["instructor_conflicts"]), 1)
+		self.assertEqual(report["instructor_conflicts"][0].labels, ("CS101-A", "CS102-A"))
+
+	def test_registrar_view_renders_report(self):
+		self._section("CS101", "Mon", "09:00", "10:00", "LT-1")
+		self._section("CS102", "Mon", "09:30", "10:30", "LT-1")
+		self.client.force_login(self.registrar)
+		resp = self.client.get(reverse("portal:registrar_schedule"))
+		self.assertEqual(resp.status_code, 200)
+		self.assertContains(resp, "CS101-A × CS102-A")
+		self.assertEqual(self.client.get(reverse("portal:registrar_schedule") + "?term=abc").status_code, 404)
+
+
+class CourseCatalogSearchTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.user = User.objects.create_user(username="catalog_user", password="password123")
+		for i in range(30):
+			Course.objects.create(
+				code=f"CS{100 + i}", title=f"Computing {i}", department="CS", level="100" if i < 20 else "200"
+			)
+		Course.objects.create(code="MA101", title="Calculus", department="MATH", level="100")
+
+	def test_search_facets_and_pagination(self):
+		from .catalog import PAGE_SIZE, search_catalog
+
+		result = search_catalog()
+		self.assertEqual(result["total"], 31)
+		self.assertEqual(result["department_facets"], [("CS", 30), ("MATH", 1)])
+		self.assertEqual(result["level_facets"], [("100", 21), ("200", 10)])
+		self.assertEqual(len(result["courses"]), PAGE_SIZE)
+		self.assertEqual(result["num_pages"], 2)
+
+		result = search_catalog(department="CS", level="200")
+		self.assertEqual(result["total"], 10)
+		# The department facet still reflects the other selected facet (level 200).
+		self.assertEqual(result["department_facets"], [("CS", 10)])
+		self.assertEqual(result["level_facets"], [("100", 20), ("200", 10)])
+
+		self.assertEqual([c["code"] for c in search_catalog(q="calc")["courses"]], ["MA101"])
+		self.assertEqual([c["code"] for c in search_catalog(q="ma1")["courses"]], ["MA101"])
+
+	def test_results_are_cached_until_a_course_changes(self):
+		self.client.force_login(self.user)
+		url = reverse("portal:courses") + "?department=MATH"
+		self.assertContains(self.client.get(url), "Calculus")
+		Course.objects.filter(code="MA101").update(title="Renamed")  # bypasses signals
+		self.assertContains(self.client.get(url), "Calculus")
+
+		course = Course.objects.get(code="MA101")
+		course.title = "Linear Algebra"
+		with self.captureOnCommitCallbacks(execute=True):
+			course.save()
+		self.assertContains(self.client.get(url), "Linear Algebra")
+
+
+class PerformanceMiddlewareTests(TestCase):
+	def setUp(self):
+		from . import instrumentation
+
+		instrumentation.reset()
+		self.user = User.objects.create_user(username="perf_user", password="password123")
+
+	@override_settings(PORTAL_PERF_SAMPLE_RATE=1.0, PORTAL_PERF_SERVER_TIMING=True)
+	def test_sampled_request_records_queries_and_server_timing(self):
+		from . import instrumentation
+
+		self.client.force_login(self.user)
+		with self.assertLogs("portal.perf", level="INFO") as logs:
+			resp = self.client.get(reverse("portal:profile"))
+		self.assertEqual(resp.status_code, 200)
+		self.assertRegex(resp["Server-Timing"], r'db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, total;dur=[\d.]+')
+		self.assertIn('"view": "portal:profile"', logs.output[0])
+
+		stats = instrumentation.snapshot()["portal:profile"]
+		self.assertEqual(stats["total_ms"]["count"], 1)
+		self.assertGreater(stats["queries"]["sum"], 0)
+		self.assertGreater(stats["template_ms"]["sum"], 0)
+
+	@override_settings(PORTAL_PERF_SAMPLE_RATE=0.0, PORTAL_PERF_SERVER_TIMING=True)
+	def test_unsampled_request_is_not_instrumented(self):
+		from . import instrumentation
+
+		resp = self.client.get(reverse("portal:healthz"))
+		self.assertNotIn("Server-Timing", resp)
+		self.assertEqual(instrumentation.snapshot(), {})
+
+
+class MetricsAndProbesTests(TestCase):
+	def setUp(self):
+		from . import metrics
+
+		metrics.reset()
+		self.user = User.objects.create_user(username="metrics_user", password="password123")
+
+	def test_metrics_endpoint_exposes_request_counts_and_latency(self):
+		self.client.force_login(self.user)
+		self.client.get(reverse("portal:profile"))
+		resp = self.client.get(reverse("portal:metrics"))
+		self.assertEqual(resp.status_code, 200)
+		body = resp.content.decode()
+		self.assertIn("# TYPE portal_requests_total counter", body)
+		self.assertIn('portal_requests_total{method="GET",status="2xx",view="portal:profile"} 1', body)
+		self.assertIn('portal_request_duration_seconds_bucket{view="portal:profile",le="+Inf"} 1', body)
+		self.assertIn("portal_audit_queue_depth 0", body)
+
+	@override_settings(PORTAL_METRICS_TOKEN="s3cret")
+	def test_metrics_token_is_enforced_when_configured(self):
+		self.assertEqual(self.client.get(reverse("portal:metrics")).status_code, 403)
+		resp = self.client.get(reverse("portal:metrics"), HTTP_AUTHORIZATION="Bearer s3cret")
+		self.assertEqual(resp.status_code, 200)
+
+	def test_production_settings_require_a_metrics_token(self):
+		import importlib
+		import os
+		from unittest import mock
+
+		env = {"DJANGO_SECRET_KEY": "x", "DJANGO_METRICS_TOKEN": "", "DJANGO_ALLOWED_HOSTS": "example.com"}
+		with mock.patch.dict(os.environ, env), self.assertRaisesMessage(RuntimeError, "DJANGO_METRICS_TOKEN"):
+			importlib.reload(importlib.import_module("university_portal.settings_prod"))
+
+	def test_metrics_merge_snapshots_from_other_workers(self):
+		import json
+		import tempfile
+		from pathlib import Path
+
+		from . import metrics
+
+		with tempfile.TemporaryDirectory() as tmp, override_settings(PORTAL_METRICS_DIR=tmp):
+			metrics.inc("portal_requests_total", {"view": "v", "method": "GET", "status": "2xx"})
+			other = {
+				"pid": 999999999,
+				"counters": [["portal_requests_total", [["method", "GET"], ["status", "2xx"], ["view", "v"]], 2]],
+				"histograms": [["portal_pdf_render_seconds", [["document", "transcript"]], [0.5, 1.0], [1, 2, 0], 1.75]],
+				"gauges": [["portal_audit_queue_depth", [], 7]],
+			}
+			Path(tmp, "metrics-999999999.json").write_text(json.dumps(other))
+			body = metrics.render_prometheus()
+			# The exited worker's snapshot is folded into one aggregate file and removed.
+			self.assertEqual(sorted(p.name for p in Path(tmp).glob("*.json")), ["metrics-exited.json"])
+			self.assertEqual(metrics.render_prometheus(), body)
+		self.assertIn('portal_requests_total{method="GET",status="2xx",view="v"} 3', body)
+		self.assertIn('portal_pdf_render_seconds_bucket{document="transcript",le="1.0"} 3', body)
+		# Gauges from exited workers are dropped.
+		self.assertIn("portal_audit_queue_depth 0", body)
+
+	@override_settings(PORTAL_AUDIT_BUFFER_SIZE=100, PORTAL_AUDIT_FLUSH_SECONDS=3600)
+	def test_buffered_audit_rows_are_counted_and_flushed(self):
+		from . import audit
+		from .models import AuditLog
+
+		self.client.post(reverse("portal:login"), {"username": "metrics_user", "password": "password123"})
+		self.assertEqual(audit.queue_depth(), 1)
+		self.assertFalse(AuditLog.objects.filter(action="auth.login").exists())
+		self.assertEqual(audit.flush(), 1)
+		self.assertTrue(AuditLog.objects.filter(action="auth.login").exists())
+
+	def test_liveness_and_readiness_probes(self):
+		self.assertEqual(self.client.get(reverse("portal:livez")).status_code, 200)
+		resp = self.client.get(reverse("portal:readyz"))
+		self.assertEqual(resp.status_code, 200)
+		self.assertContains(resp, "migrations: ok")
+		self.assertContains(resp, "cache: ok")
+
+
+class SeedScaleCommandTests(TestCase):
+	def test_generates_reproducible_dataset(self):
+		from io import StringIO
+
+		from django.core.management import call_command
+		from django.core.management.base import CommandError
+
+		args = {"students": 40, "faculty": 4, "courses": 12, "terms": 2, "enrollments_per_student": 3, "stdout": StringIO()}
+		call_command("seed_scale", prefix="bench", seed=7, **args)
+		self.assertEqual(User.objects.filter(username__startswith="bench_s").count(), 40)
+		self.assertEqual(Enrollment.objects.filter(student__username__startswith="bench_s").count(), 40 * 3 * 2)
+		self.assertTrue(Term.objects.get(name="bench Term 2").is_active)
+		self.assertTrue(User.objects.get(username="bench_s000001").groups.filter(name=ROLE_STUDENT).exists())
+		self.assertTrue(User.objects.get(username="bench_s000001").check_password("password123"))
+		first = list(
+			Enrollment.objects.filter(student__username__startswith="bench_s")
+			.order_by("student__username", "section__course__code", "section__section_code")
+			.values_list("student__username", "section__course__code", "status")
+		)
+
+		with self.assertRaises(CommandError):
+			call_command("seed_scale", prefix="bench", seed=7, **args)
+
+		call_command("seed_scale", prefix="again", seed=7, **args)
+		second = list(
+			Enrollment.objects.filter(student__username__startswith="again_s")
+			.order_by("student__username", "section__course__code", "section__section_code")
+			.values_list("student__username", "section__course__code", "status")
+		)
+		self.assertEqual([(u.replace("again", "bench"), c, s) for u, c, s in second], first)
+
+
+class QueryBudgetTests(TestCase):
+	def test_views_stay_within_query_budgets(self):
+		from io import StringIO
+
+		from django.core.management import call_command
+
+		from . import benchmarks
+
+		call_command(
+			"seed_scale", prefix="budget", seed=3, students=60, faculty=5, courses=15, terms=1, stdout=StringIO()
+		)
+		results = benchmarks.run(iterations=1, warmup=1)
+		self.assertEqual([name for name, stats in results.items() if "skipped" in stats], [])
+		self.assertEqual(benchmarks.check(results), [])
+
+		slow = {name: dict(stats) for name, stats in results.items()}
+		slow["dashboard"]["p50_ms"] = results["dashboard"]["p50_ms"] * 2 + 1
+		slow["finance"]["queries"] = 99
+		baseline = {"views": results}
+		failures = benchmarks.check(slow, baseline, threshold=0.25)
+		self.assertTrue(any(f.startswith("dashboard: p50") for f in failures))
+		self.assertTrue(any(f.startswith("finance: 99 queries exceeds budget") for f in failures))
+
+
+class RegistrationLoadHarnessTests(LiveServerTestCase):
+	def test_harness_drives_add_drop_without_overbooking(self):
+		from io import StringIO
+
+		from django.core.management import call_command
+
+		ensure_groups_exist()
+		for i in range(3):
+			user = User.objects.create_user(username=f"load_s{i:06d}", password="password123")
+			user.groups.add(Group.objects.get(name=ROLE_STUDENT))
+		term = Term.objects.create(
+			name="Load Term",
+			start_date=date.today(),
+			end_date=date.today() + timedelta(days=90),
+			is_active=True,
+			registration_start=timezone.now() - timedelta(days=1),
+			registration_end=timezone.now() + timedelta(days=7),
+		)
+		section = Section.objects.create(term=term, course=Course.objects.create(code="LD101", title="Load"), capacity=1)
+
+		out = StringIO()
+		call_command(
+			"load_registration",
+			url=self.live_server_url,
+			prefix="load",
+			students=3,
+			concurrency=1,
+			hot_sections=1,
+			adds=1,
+			drop_rate=0,
+			stdout=out,
+			stderr=StringIO(),
+		)
+		output = out.getvalue()
+		self.assertIn("Outcomes: enrolled=1, waitlisted=2", output)
+		self.assertIn("Lock wait: 3 locks", output)
+		self.assertIn("Overbooked sections: 0", output)
+		self.assertEqual(section.enrollments.filter(status=Enrollment.Status.ENROLLED).count(), 1)
+
+
+class SectionAvailabilityCacheTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		ensure_groups_exist()
+		self.term = Term.objects.create(
+			name="Avail Term",
+			start_date=date.today(),
+			end_date=date.today() + timedelta(days=90),
+			is_active=True,
+			registration_start=timezone.now() - timedelta(days=1),
+			registration_end=timezone.now() + timedelta(days=7),
+		)
+		self.section = Section.objects.create(
+			term=self.term, course=Course.objects.create(code="AV101", title="Avail"), capacity=1
+		)
+		self.students = []
+		for i in range(2):
+			user = User.objects.create_user(username=f"avail{i}", password="password123")
+			user.groups.add(Group.objects.get(name=ROLE_STUDENT))
+			self.students.append(user)
+
+	def test_enrollment_commit_pushes_new_count(self):
+		from . import availability
+
+		self.assertEqual(availability.term_sections(self.term)[0].enrolled_count, 0)
+		self.client.force_login(self.students[0])
+		with self.captureOnCommitCallbacks(execute=True):
+			self.client.post(reverse("portal:registration"), {"action": "add", "section_id": self.section.id})
+		# Still inside the fresh window, so the count comes from the pushed update.
+		with self.assertNumQueries(0):
+			row = availability.term_sections(self.term)[0]
+		self.assertEqual((row.enrolled_count, row.has_seats()), (1, False))
+
+		self.client.force_login(self.students[1])
+		resp = self.client.get(reverse("portal:registration"))
+		self.assertContains(resp, f'<span data-seats-taken="{self.section.id}">1</span>/1')
+
+	@override_settings(PORTAL_AVAILABILITY_FRESH_SECONDS=0, PORTAL_AVAILABILITY_STALE_SECONDS=60)
+	def test_concurrent_recompute_serves_previous_copy(self):
+		from . import availability
+
+		availability.seats_taken(self.term.id)
+		Enrollment.objects.create(section=self.section, student=self.students[0])
+		cache.add(f"portal:avail:seats:{self.term.id}:lock", 1)
+		with self.assertNumQueries(0):
+			self.assertEqual(availability.seats_taken(self.term.id), {})
+		cache.delete(f"portal:avail:seats:{self.term.id}:lock")
+		self.assertEqual(availability.seats_taken(self.term.id), {self.section.id: 1})
+
+
+class SeatStreamTests(TransactionTestCase):
+	# The view does its DB work in pool threads, which only see committed rows.
+	def setUp(self):
+		cache.clear()
+		ensure_groups_exist()
+		self.term = Term.objects.create(
+			name="Stream Term",
+			start_date=date.today(),
+			end_date=date.today() + timedelta(days=90),
+			is_active=True,
+		)
+		self.section = Section.objects.create(
+			term=self.term, course=Course.objects.create(code="SS101", title="Stream"), capacity=2
+		)
+		self.student = User.objects.create_user(username="stream_student", password="password123")
+		self.student.groups.add(Group.objects.get(name=ROLE_STUDENT))
+
+	async def test_asgi_stream_pushes_enrollment_commits(self):
+		import asyncio
+		from urllib.parse import urlsplit
+
+		from asgiref.sync import sync_to_async
+
+		from . import availability, pubsub, streams
+
+		url = urlsplit(streams.stream_url(self.student, [self.section.id]))
+		scope = {"type": "http", "path": url.path, "query_string": url.query.encode(), "root_path": ""}
+		inbox: asyncio.Queue = asyncio.Queue()
+		outbox: asyncio.Queue = asyncio.Queue()
+		await inbox.put({"type": "http.request", "body": b"", "more_body": False})
+		# The Django app is never reached for the stream path.
+		task = asyncio.ensure_future(streams.with_seat_stream(None)(scope, inbox.get, outbox.put))
+
+		start = await asyncio.wait_for(outbox.get(), 5)
+		self.assertEqual(start["status"], 200)
+		self.assertIn((b"content-type", b"text/event-stream"), start["headers"])
+		first = (await asyncio.wait_for(outbox.get(), 5))["body"].decode()
+		self.assertEqual(first, f'retry: 5000\n\nevent: seats\ndata: {{"seats":{{"{self.section.id}":0}}}}\n\n')
+		self.assertEqual(pubsub.broker.subscriber_count(), 1)
+
+		await Enrollment.objects.acreate(section=self.section, student=self.student)
+		await sync_to_async(availability.push_section)(self.section.id)
+		update = (await asyncio.wait_for(outbox.get(), 5))["body"].decode()
+		self.assertEqual(update, f'event: seats\ndata: {{"seats":{{"{self.section.id}":1}}}}\n\n')
+
+		await inbox.put({"type": "http.disconnect"})
+		await asyncio.wait_for(task, 5)
+		self.assertEqual(pubsub.broker.subscriber_count(), 0)
+
+	@override_settings(PORTAL_SEAT_STREAM_POLL_SECONDS=0.05)
+	async def test_asgi_stream_picks_up_commits_from_other_processes(self):
+		import asyncio
+		import time
+		from urllib.parse import urlsplit
+
+		from . import availability, streams
+
+		url = urlsplit(streams.stream_url(self.student, [self.section.id]))
+		scope = {"type": "http", "path": url.path, "query_string": url.query.encode(), "root_path": ""}
+		inbox: asyncio.Queue = asyncio.Queue()
+		outbox: asyncio.Queue = asyncio.Queue()
+		task = asyncio.ensure_future(streams.with_seat_stream(None)(scope, inbox.get, outbox.put))
+		await asyncio.wait_for(outbox.get(), 5)
+		await asyncio.wait_for(outbox.get(), 5)
+		await asyncio.sleep(0.3)
+
+		# Another process's `push_section` only reaches this one through the shared cache (kept fresh here so
+		# the poller doesn't recount from the database).
+		await cache.aset(
+			availability._seats_key(self.term.id), {"built": time.time() + 60, "seats": {self.section.id: 2}}, 60
+		)
+		update = (await asyncio.wait_for(outbox.get(), 5))["body"].decode()
+		self.assertEqual(update, f'event: seats\ndata: {{"seats":{{"{self.section.id}":2}}}}\n\n')
+
+		await inbox.put({"type": "http.disconnect"})
+		await asyncio.wait_for(task, 5)
+		self.assertEqual(streams._pollers, {})
+
+	def test_uvicorn_workers_need_a_shared_cache(self):
+		import os
+		from unittest import mock
+
+		from .streams import check_shared_cache
+
+		locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+		filebased = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": "/tmp"}}
+		with mock.patch.dict(os.environ, {"GUNICORN_MODE": "uvicorn", "WEB_CONCURRENCY": "3"}):
+			os.environ.pop("GUNICORN_POOL", None)
+			with override_settings(CACHES=locmem):
+				[warning] = check_shared_cache()
+				self.assertEqual(warning.id, "portal.W002")
+				with mock.patch.dict(os.environ, {"WEB_CONCURRENCY": "1"}):
+					self.assertEqual(check_shared_cache(), [])
+			with override_settings(CACHES=filebased):
+				self.assertEqual(check_shared_cache(), [])
+
+	def test_wsgi_gets_single_snapshot_and_retry(self):
+		self.client.force_login(self.student)
+		resp = self.client.get(reverse("portal:registration"))
+		stream_url = resp.context["seat_stream_url"]
+		body = self.client.get(stream_url).content.decode()
+		self.assertTrue(body.startswith("retry: 5000\n\nevent: seats\n"))
+		self.assertIn(f'"{self.section.id}":0', body)
+		self.assertEqual(self.client.get(stream_url + "&sections=x").status_code, 400)
+		self.assertEqual(self.client.get(reverse("portal:seat_stream")).status_code, 403)
+
+
+class AsyncViewTests(TransactionTestCase):
+	# The async views gather queries in pool threads, which only see committed rows.
+	def setUp(self):
+		cache.clear()
+		ensure_groups_exist()
+		self.term = Term.objects.create(
+			name="Async Term",
+			start_date=date.today(),
+			end_date=date.today() + timedelta(days=90),
+			is_active=True,
+		)
+		self.course = Course.objects.create(code="AS101", title="Async Basics")
+		self.section = Section.objects.create(term=self.term, course=self.course, section_code="A", capacity=3)
+		self.student = User.objects.create_user(username="async_student", password="password123")
+		self.student.groups.add(Group.objects.get(name=ROLE_STUDENT))
+		Enrollment.objects.create(section=self.section, student=self.student)
+		SupportTicket.objects.create(created_by=self.student, subject="Async ticket", category="OTHER")
+
+	def _get(self, view, user, *args):
+		import asyncio
+
+		from django.test import AsyncRequestFactory
+
+		request = AsyncRequestFactory().get("/")
+		request.user = user
+
+		async def auser():
+			return user
+
+		request.auser = auser
+		return self._strip_tokens(asyncio.run(view(request, *args)).content.decode())
+
+	@staticmethod
+	def _strip_tokens(html):
+		import re
+
+		# Tokens are signed per call; drop them before comparing pages.
+		return re.sub(r'(csrfmiddlewaretoken" value="|token=|/timetable/feed/)[^"&]+', r"\1", html)
+
+	def test_async_pages_match_sync_views(self):
+		from . import async_views
+
+		self.client.force_login(self.student)
+		for name, args in (
+			("dashboard", ()),
+			("courses", ()),
+			("course_detail", ("as101",)),
+			("announcements", ()),
+			("grades", ()),
+			("timetable", ()),
+		):
+			with self.subTest(view=name):
+				sync_html = self._strip_tokens(self.client.get(reverse(f"portal:{name}", args=args)).content.decode())
+				self.assertEqual(self._get(getattr(async_views, name), self.student, *args), sync_html)
+		dashboard = self._get(async_views.dashboard, self.student)
+		self.assertIn("AS101", dashboard)
+		self.assertIn("Async ticket", dashboard)
+
+	def test_async_views_enforce_roles_and_404(self):
+		from django.core.exceptions import PermissionDenied
+		from django.http import Http404
+
+		from . import async_views
+
+		outsider = User.objects.create_user(username="async_outsider", password="password123")
+		with self.assertRaises(PermissionDenied):
+			self._get(async_views.grades, outsider)
+		with self.assertRaises(Http404):
+			self._get(async_views.course_detail, self.student, "NOPE1")
+
+	def test_async_course_detail_lists_requisites(self):
+		from . import async_views
+
+		basics = Course.objects.create(code="AS100", title="Before Async")
+		CourseRequisite.objects.create(course=self.course, required_course=basics)
+		self.client.force_login(self.student)
+		sync_html = self._strip_tokens(self.client.get(reverse("portal:course_detail", args=("as101",))).content.decode())
+		async_html = self._get(async_views.course_detail, self.student, "as101")
+		self.assertIn("Prerequisites: AS100", async_html)
+		self.assertEqual(async_html, sync_html)
+
+
+class DashboardCacheTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		ensure_groups_exist()
+		self.term = Term.objects.create(
+			name="Dash Term", start_date=date.today(), end_date=date.today() + timedelta(days=90), is_active=True
+		)
+		self.section = Section.objects.create(
+			term=self.term, course=Course.objects.create(code="DC101", title="Dash"), section_code="A"
+		)
+		self.student = User.objects.create_user(username="dash_student", password="password123")
+		self.student.groups.add(Group.objects.get(name=ROLE_STUDENT))
+		self.client.force_login(self.student)
+
+	def test_role_groups_exist_after_migrate(self):
+		from django.core.management import call_command
+
+		from .roles import ALL_ROLES
+
+		Group.objects.all().delete()
+		call_command("migrate", "portal", verbosity=0)
+		self.assertEqual(Group.objects.filter(name__in=ALL_ROLES).count(), len(ALL_ROLES))
+
+	def test_warm_dashboard_only_loads_the_user(self):
+		# The session comes from the cache (portal.sessions).
+		self.client.get(reverse("portal:dashboard"))
+		with self.assertNumQueries(1):
+			resp = self.client.get(reverse("portal:dashboard"))
+		self.assertContains(resp, "No enrollments yet.")
+		self.assertContains(resp, "Registration</a>")
+
+	def test_panels_follow_changes(self):
+		self.client.get(reverse("portal:dashboard"))
+		author = User.objects.create_user(username="dash_author", password="password123")
+		with self.captureOnCommitCallbacks(execute=True):
+			Enrollment.objects.create(section=self.section, student=self.student)
+			ticket = SupportTicket.objects.create(created_by=self.student, category="IT", subject="Dash ticket", description="x")
+			announcement = Announcement.objects.create(title="Dash news", body="x", created_by=author)
+			announcement.target_roles.add(Group.objects.get(name=ROLE_FACULTY))
+		resp = self.client.get(reverse("portal:dashboard"))
+		self.assertContains(resp, "DC101 Dash (A)")
+		self.assertContains(resp, "Dash ticket")
+		self.assertNotContains(resp, "Dash news")
+
+		with self.captureOnCommitCallbacks(execute=True):
+			self.student.groups.add(Group.objects.get(name=ROLE_FACULTY))
+			ticket.status = SupportTicket.Status.CLOSED
+			ticket.save()
+			self.section.course.title = "Dashing"
+			self.section.course.save()
+		resp = self.client.get(reverse("portal:dashboard"))
+		self.assertContains(resp, "Dash news")
+		self.assertContains(resp, "DC101 Dashing (A)")
+		self.assertContains(resp, "No open tickets.")
+		self.assertContains(resp, "Teaching")
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+	# The replica is a second connection to the test database, so rows must be committed.
+	def setUp(self):
+		from . import db_routing
+
+		cache.clear()
+		db_routing._health.clear()
+		ensure_groups_exist()
+		self.term = Term.objects.create(
+			name="Replica Term",
+			start_date=date.today(),
+			end_date=date.today() + timedelta(days=90),
+			is_active=True,
+			registration_start=timezone.now() - timedelta(days=1),
+			registration_end=timezone.now() + timedelta(days=7),
+		)
+		self.section = Section.objects.create(
+			term=self.term, course=Course.objects.create(code="RR101", title="Replicas"), section_code="A", capacity=5
+		)
+		self.student = User.objects.create_user(username="replica_student", password="password123")
+		self.student.groups.add(Group.objects.get(name=ROLE_STUDENT))
+		self.client.force_login(self.student)
+
+	def _add_replica(self, alias):
+		from django.db import connections
+
+		cls = type(self)
+		connections.settings[alias] = dict(connections.settings["default"])
+		cls.databases = {*cls.databases, alias}
+
+		def remove():
+			cls.databases = cls.databases - {alias}
+			connections[alias].close()
+			del connections[alias]
+			del connections.settings[alias]
+
+		self.addCleanup(remove)
+		return connections[alias]
+
+	def test_reads_use_replica_until_the_browser_writes(self):
+		from django.test.utils import CaptureQueriesContext
+
+		from .db_routing import STICKY_COOKIE, use_replica
+
+		replica = self._add_replica("replica_test")
+		url = reverse("portal:course_detail", args=["RR101"])
+		with override_settings(PORTAL_DB_REPLICAS=["replica_test"]):
+			with CaptureQueriesContext(replica) as replica_queries:
+				self.assertContains(self.client.get(url), "Replicas")
+			self.assertTrue(any("portal_course" in q["sql"] for q in replica_queries))
+
+			resp = self.client.post(reverse("portal:registration"), {"action": "add", "section_id": self.section.id})
+			self.assertEqual(resp.status_code, 302)
+			self.assertIn(STICKY_COOKIE, resp.cookies)
+			self.assertEqual(Enrollment.objects.using("default").filter(student=self.student).count(), 1)
+
+			with CaptureQueriesContext(replica) as replica_queries:
+				self.assertContains(self.client.get(url), "Replicas")
+			self.assertEqual(len(replica_queries), 0)
+
+			# Rows read from a replica are still saved to the primary.
+			with use_replica("replica_test"):
+				course = Course.objects.get(code="RR101")
+			self.assertEqual(course._state.db, "replica_test")
+			course.title = "Primary"
+			course.save()
+			self.assertEqual(Course.objects.using("default").get(code="RR101").title, "Primary")
+
+	def test_unreachable_replica_falls_back_to_primary(self):
+		from .db_routing import STICKY_COOKIE, healthy_replicas
+
+		with override_settings(PORTAL_DB_REPLICAS=["replica_missing"]):
+			with self.assertLogs("portal.db", level="WARNING"):
+				resp = self.client.get(reverse("portal:course_detail", args=["RR101"]))
+			self.assertContains(resp, "Replicas")
+			self.assertNotIn(STICKY_COOKIE, resp.cookies)
+			self.assertEqual(healthy_replicas(), [])
+
+
+class TransactionScopeTests(TransactionTestCase):
+	# Runs outside the TestCase transaction so `in_atomic_block` reflects what the view opened.
+	def setUp(self):
+		from django.db import connection
+
+		cache.clear()
+		ensure_groups_exist()
+		self.student = User.objects.create_user(username="txn_student", password="password123")
+		self.student.groups.add(Group.objects.get(name=ROLE_STUDENT))
+		self.client.force_login(self.student)
+		# Production may still opt in to ATOMIC_REQUESTS; the scoped views must hold up under it.
+		atomic_requests = connection.settings_dict["ATOMIC_REQUESTS"]
+		connection.settings_dict["ATOMIC_REQUESTS"] = True
+		self.addCleanup(connection.settings_dict.__setitem__, "ATOMIC_REQUESTS", atomic_requests)
+
+	def test_read_and_pdf_views_opt_out_of_request_transactions(self):
+		from django.urls import resolve
+
+		for name in ("courses", "announcements", "grades", "timetable", "finance", "registrar_queue", "unofficial_transcript_pdf"):
+			view = resolve(reverse(f"portal:{name}")).func
+			self.assertIn("default", getattr(view, "_non_atomic_requests", set()), name)
+		for name in ("registration", "transcript_request_new", "support_new"):
+			view = resolve(reverse(f"portal:{name}")).func
+			self.assertNotIn("default", getattr(view, "_non_atomic_requests", set()), name)
+
+	def test_pdf_renders_outside_any_transaction(self):
+		from unittest import mock
+
+		from django.db import connection
+
+		from . import views
+
+		build = views._build_unofficial_transcript_pdf
+		seen = []
+
+		def spy(user, rows):
+			seen.append((connection.in_atomic_block, type(rows)))
+			return build(user, rows)
+
+		with mock.patch.object(views, "_build_unofficial_transcript_pdf", spy):
+			resp = self.client.get(reverse("portal:unofficial_transcript_pdf"))
+		self.assertEqual(resp.status_code, 200)
+		self.assertEqual(seen, [(False, list)])
+
+	def test_writes_commit_in_their_own_block(self):
+		resp = self.client.post(
+			reverse("portal:support_new"), data={"category": "IT", "subject": "Scoped", "description": "x"}
+		)
+		self.assertEqual(resp.status_code, 302)
+		ticket = SupportTicket.objects.get(subject="Scoped")
+		resp = self.client.post(reverse("portal:support_detail", kwargs={"ticket_id": ticket.id}), data={"message": "Hi"})
+		self.assertEqual(resp.status_code, 302)
+		self.assertEqual(SupportMessage.objects.filter(ticket=ticket).count(), 1)
+
+
+class ConnectionPoolTests(TestCase):
+	def test_production_settings_pool_postgres_connections(self):
+		import importlib
+		import os
+		from unittest import mock
+
+		env = {"DJANGO_SECRET_KEY": "x", "DJANGO_METRICS_TOKEN": "x", "DJANGO_ALLOWED_HOSTS": "example.com", "DJANGO_DB_POOL_MAX_SIZE": "6"}
+		with mock.patch.dict(os.environ, env):
+			settings_prod = importlib.reload(importlib.import_module("university_portal.settings_prod"))
+		config = settings_prod._database("postgres://portal:pw@db:5432/portal", atomic_requests=False)
+		self.assertEqual(config["CONN_MAX_AGE"], 0)
+		self.assertTrue(config["CONN_HEALTH_CHECKS"])
+		self.assertEqual(config["OPTIONS"]["pool"]["max_size"], 6)
+		self.assertNotIn("pool", settings_prod._database("sqlite:///portal.sqlite3", atomic_requests=False).get("OPTIONS", {}))
+
+	def test_settings_size_pools_like_gunicorn_before_it_starts(self):
+		import importlib
+		import os
+		import runpy
+		from unittest import mock
+
+		from django.conf import settings
+
+		# What `migrate` sees in entrypoint.sh: gunicorn's variables, but gunicorn.conf.py not loaded yet.
+		env = {"DJANGO_SECRET_KEY": "x", "DJANGO_METRICS_TOKEN": "x", "DJANGO_ALLOWED_HOSTS": "example.com", "GUNICORN_THREADS": "6", "GUNICORN_MAX_WORKERS": "1"}
+		with mock.patch.dict(os.environ, env):
+			for name in ("WEB_CONCURRENCY", "DJANGO_DB_POOL_MAX_SIZE", "DJANGO_DB_CLIENT_PROCESSES", "GUNICORN_POOL", "GUNICORN_MODE"):
+				os.environ.pop(name, None)
+			base = importlib.reload(importlib.import_module("university_portal.settings"))
+			settings_prod = importlib.reload(importlib.import_module("university_portal.settings_prod"))
+			gunicorn = runpy.run_path(str(settings.BASE_DIR / "gunicorn.conf.py"))
+		self.addCleanup(importlib.reload, base)
+		self.assertEqual((gunicorn["workers"], gunicorn["threads"]), (1, 6))
+		self.assertEqual(base.PORTAL_DB_CLIENT_PROCESSES, gunicorn["workers"])
+		self.assertEqual(settings_prod.db_pool_options["max_size"], gunicorn["threads"])
+
+	def test_capacity_check_warns_when_pools_exceed_the_server_limit(self):
+		from unittest import mock
+
+		from django.db import connections
+
+		from .db_pool import check_pool_capacity
+
+		with mock.patch.dict(connections["default"].settings_dict["OPTIONS"], {"pool": {"max_size": 4}}):
+			with override_settings(PORTAL_DB_CLIENT_PROCESSES=8, PORTAL_DB_MAX_CONNECTIONS=100):
+				self.assertEqual(check_pool_capacity(databases=["default"]), [])
+			with override_settings(PORTAL_DB_CLIENT_PROCESSES=30, PORTAL_DB_MAX_CONNECTIONS=100):
+				[warning] = check_pool_capacity(databases=["default"])
+		self.assertEqual(warning.id, "portal.W001")
+		self.assertIn("120 pooled connections", warning.msg)
+		self.assertEqual(check_pool_capacity(databases=["default"]), [])
+
+	def test_labelled_gauges_are_exported(self):
+		from . import metrics
+
+		metrics.register_gauge("portal_db_pool_waiting", lambda: 3, {"alias": "test"})
+		self.addCleanup(metrics._gauges.pop, ("portal_db_pool_waiting", (("alias", "test"),)))
+		self.assertIn('portal_db_pool_waiting{alias="test"} 3', metrics.render_prometheus())
+
+
+class SQLiteProfileTests(TestCase):
+	def test_tuned_connections_get_pragmas_and_immediate_transactions(self):
+		import shutil
+		import sqlite3
+		import tempfile
+		from pathlib import Path
+
+		from django.conf import settings
+		from django.db import connections
+		from django.db.backends.sqlite3.base import DatabaseWrapper
+
+		workdir = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, workdir, True)
+		path = str(Path(workdir) / "tuned.sqlite3")
+		config = {**connections["default"].settings_dict, "NAME": path, "OPTIONS": dict(settings.PORTAL_SQLITE_OPTIONS)}
+		wrapper = DatabaseWrapper(config, alias="sqlite_tuned")
+		self.addCleanup(wrapper.close)
+		with override_settings(PORTAL_SQLITE_TUNED=True):
+			wrapper.ensure_connection()
+		with wrapper.cursor() as cursor:
+			cursor.execute("PRAGMA journal_mode")
+			self.assertEqual(cursor.fetchone()[0], "wal")
+			cursor.execute("PRAGMA synchronous")
+			self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+			cursor.execute("PRAGMA busy_timeout")
+			self.assertEqual(cursor.fetchone()[0], settings.PORTAL_SQLITE_PRAGMAS["busy_timeout"])
+
+		# An atomic block holds the write lock from BEGIN, before it has written anything.
+		wrapper._start_transaction_under_autocommit()
+		other = sqlite3.connect(path, timeout=0, isolation_level=None)
+		self.addCleanup(other.close)
+		with self.assertRaisesRegex(sqlite3.OperationalError, "locked"):
+			other.execute("BEGIN IMMEDIATE")
+		wrapper.connection.rollback()
+
+	def test_production_settings_tune_sqlite_by_default(self):
+		import importlib
+		import os
+		from unittest import mock
+
+		with mock.patch.dict(os.environ, {"DJANGO_SECRET_KEY": "x", "DJANGO_METRICS_TOKEN": "x", "DJANGO_ALLOWED_HOSTS": "example.com"}):
+			os.environ.pop("DATABASE_URL", None)
+			settings_prod = importlib.reload(importlib.import_module("university_portal.settings_prod"))
+		self.assertTrue(settings_prod.PORTAL_SQLITE_TUNED)
+		self.assertEqual(settings_prod.DATABASES["default"]["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+		# The development settings' database dict is left as it was.
+		dev_database = importlib.import_module("university_portal.settings").DATABASES["default"]
+		self.assertNotIn("transaction_mode", dev_database.get("OPTIONS", {}))
+
+
+class HotPathIndexTests(TestCase):
+	def test_hot_queries_use_indexes(self):
+		from io import StringIO
+
+		from django.core.management import call_command
+
+		call_command("seed_scale", prefix="plan", seed=5, students=30, faculty=3, courses=8, terms=1, stdout=StringIO())
+		out = StringIO()
+		call_command("explain_hotpaths", "--strict", stdout=out)
+		self.assertIn("enrollment_enrolled_idx", out.getvalue())
+		self.assertIn("no full scans", out.getvalue())
+		# Substring search is only indexed (pg_trgm) on Postgres.
+		self.assertIn("Skipping catalog: search: only indexed on postgresql.", out.getvalue())
+
+	def test_full_scan_detection(self):
+		from .hotpaths import full_scans
+
+		sqlite_plan = "4 0 0 SCAN portal_feeinvoice\n6 0 0 SCAN portal_course USING INDEX course_title_idx"
+		self.assertEqual(full_scans(sqlite_plan, "sqlite"), ["portal_feeinvoice"])
+		postgres_plan = "Sort\n  ->  Seq Scan on portal_grade\n  ->  Index Scan using grade_released_student_idx on portal_grade"
+		self.assertEqual(full_scans(postgres_plan, "postgresql"), ["portal_grade"])
+
+
+class StartupTests(SimpleTestCase):
+	def test_workers_import_reportlab_only_when_rendering_pdfs(self):
+		import subprocess
+		import sys
+
+		from django.conf import settings
+
+		code = "import django; django.setup(); import portal.urls, sys; print('reportlab' in sys.modules)"
+		proc = subprocess.run(
+			[sys.executable, "-c", code], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+		)
+		self.assertEqual(proc.stdout.strip(), "False")
+
+	def test_warm_up_loads_urls_and_templates(self):
+		from django.template import engines
+
+		from university_portal.warmup import warm_up
+
+		with self.assertLogs("portal.startup", level="INFO") as logs:
+			timings = warm_up()
+		self.assertEqual(set(timings), {"urls", "templates", "pdf"})
+		self.assertTrue(any("templates:" in line for line in logs.output))
+		loader = engines["django"].engine.template_loaders[0]
+		self.assertIn("portal/dashboard.html", {key.split("-")[0] for key in loader.get_template_cache})
+
+	def test_parse_importtime(self):
+		from .management.commands.profile_imports import parse_importtime
+
+		records = parse_importtime(
+			"import time: self [us] | cumulative | imported package\n"
+			"import time:       120 |        120 |     reportlab.lib\n"
+			"import time:      1500 |       1620 |   reportlab.pdfgen.canvas\n"
+		)
+		self.assertEqual(
+			[(r.module, r.self_us, r.cumulative_us, r.depth) for r in records],
+			[("reportlab.lib", 120, 120, 2), ("reportlab.pdfgen.canvas", 1500, 1620, 1)],
+		)
+
+
+class WorkerLifecycleTests(TransactionTestCase):
+	# flush_buffers closes the connection, which a TestCase transaction can't survive.
+	def _load_config(self, **env):
+		import os
+		import runpy
+		from unittest import mock
+
+		from django.conf import settings
+
+		with mock.patch.dict(os.environ, env):
+			for name in ("WEB_CONCURRENCY", "GUNICORN_THREADS", "GUNICORN_MAX_REQUESTS", "PORT"):
+				if name not in env:
+					os.environ.pop(name, None)
+			return runpy.run_path(str(settings.BASE_DIR / "gunicorn.conf.py"))
+
+	def test_gunicorn_config_per_pool(self):
+		web = self._load_config(GUNICORN_IO_SHARE="0.75")
+		self.assertEqual(web["worker_class"], "gthread")
+		self.assertEqual(web["threads"], 4)
+		self.assertEqual(web["workers"], min(web["cpus"] + 1, 12))
+		self.assertEqual(web["bind"], "0.0.0.0:8000")
+		self.assertGreater(web["max_requests_jitter"], 0)
+
+		pdf = self._load_config(GUNICORN_POOL="pdf", WEB_CONCURRENCY="3")
+		self.assertEqual((pdf["worker_class"], pdf["workers"], pdf["timeout"]), ("sync", 3, 120))
+		self.assertEqual(pdf["bind"], "0.0.0.0:8001")
+
+		asgi = self._load_config(GUNICORN_MODE="uvicorn")
+		self.assertEqual(asgi["worker_class"], "uvicorn.workers.UvicornWorker")
+		self.assertEqual(asgi["wsgi_app"], "university_portal.asgi:application")
+
+	@override_settings(PORTAL_AUDIT_BUFFER_SIZE=100, PORTAL_AUDIT_FLUSH_SECONDS=3600)
+	def test_lifespan_shutdown_flushes_buffered_audit_rows(self):
+		import asyncio
+
+		from asgiref.sync import async_to_sync
+
+		from . import audit
+		from .lifecycle import with_lifespan
+		from .models import AuditLog
+
+		audit.write(AuditLog(action="test.buffered", entity_type="test"))
+		self.assertFalse(AuditLog.objects.filter(action="test.buffered").exists())
+
+		async def run_lifespan():
+			inbox: asyncio.Queue = asyncio.Queue()
+			sent = []
+			for message in ("lifespan.startup", "lifespan.shutdown"):
+				await inbox.put({"type": message})
+
+			async def send(message):
+				sent.append(message["type"])
+
+			await with_lifespan(None)({"type": "lifespan"}, inbox.get, send)
+			return sent
+
+		sent = async_to_sync(run_lifespan)()
+		self.assertEqual(sent, ["lifespan.startup.complete", "lifespan.shutdown.complete"])
+		self.assertEqual(audit.queue_depth(), 0)
+		self.assertTrue(AuditLog.objects.filter(action="test.buffered").exists())
+
+
+class TemplateProfilingTests(TestCase):
+	def setUp(self):
+		from . import instrumentation
+
+		cache.clear()
+		instrumentation.reset()
+		ensure_groups_exist()
+		self.user = User.objects.create_user(username="tpl_student", password="password123")
+		self.user.groups.add(Group.objects.get(name=ROLE_STUDENT))
+
+	def test_queries_during_render_are_attributed_to_the_template_line(self):
+		from django.db import connection
+		from django.template import Context, engines
+
+		from . import instrumentation
+
+		instrumentation._install_template_timer()
+		template = engines["django"].from_string("<ul>\n{% for g in user.groups.all %}<li>{{ g.name }}</li>{% endfor %}</ul>")
+		stats = instrumentation.RequestStats()
+		token = instrumentation._current.set(stats)
+		try:
+			with connection.execute_wrapper(stats), self.assertLogs("portal.perf", level="WARNING") as logs:
+				html = template.template.render(Context({"user": self.user}))
+		finally:
+			instrumentation._current.reset(token)
+		self.assertIn(ROLE_STUDENT, html)
+		self.assertEqual([site[:3] for site in stats.render_queries], [("<string>", 2, "{% for g in user.groups.all %}")])
+		self.assertIn("template_query", logs.output[0])
+		self.assertEqual(instrumentation.template_snapshot()["<string>"]["queries"], 1)
+
+	@override_settings(PORTAL_PERF_SAMPLE_RATE=1.0)
+	def test_profile_page_renders_without_queries(self):
+		from . import instrumentation
+
+		self.client.force_login(self.user)
+		self.assertContains(self.client.get(reverse("portal:profile")), ROLE_STUDENT)
+		profile = instrumentation.template_snapshot()["portal/profile.html"]
+		self.assertEqual(profile["render_ms"]["count"], 1)
+		self.assertEqual(profile["queries"], 0)
+
+	def test_template_metrics_are_typed_in_the_metrics_output(self):
+		from . import instrumentation, metrics
+
+		metrics.reset()
+		with self.assertLogs("portal.perf", level="WARNING"):
+			instrumentation._record_template("x.html", 12.0, [("x.html", 3, "{{ user.groups.all }}", "SELECT 1")])
+		body = self.client.get(reverse("portal:metrics")).content.decode()
+		self.assertIn("# TYPE portal_template_render_seconds histogram", body)
+		self.assertIn('portal_template_render_seconds_bucket{template="x.html",le="+Inf"} 1', body)
+		self.assertIn("# TYPE portal_template_queries_total counter", body)
+		self.assertIn('portal_template_queries_total{template="x.html"} 1', body)
+		self.assertNotIn("untyped", body)
+
+	def test_production_templates_use_the_cached_loader(self):
+		import importlib
+		import os
+		from unittest import mock
+
+		with mock.patch.dict(os.environ, {"DJANGO_SECRET_KEY": "x", "DJANGO_METRICS_TOKEN": "x", "DJANGO_ALLOWED_HOSTS": "example.com"}):
+			settings_prod = importlib.reload(importlib.import_module("university_portal.settings_prod"))
+		options = settings_prod.TEMPLATES[0]["OPTIONS"]
+		self.assertFalse(settings_prod.TEMPLATES[0]["APP_DIRS"])
+		self.assertEqual(options["loaders"][0][0], "django.template.loaders.cached.Loader")
+		self.assertIn("portal.context_processors.portal_nav", options["context_processors"])
+		self.assertTrue(importlib.import_module("university_portal.settings").TEMPLATES[0]["APP_DIRS"])
+
+
+class CacheAndSessionTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		ensure_groups_exist()
+		self.user = User.objects.create_user(username="session_user", password="password123")
+		self.user.groups.add(Group.objects.get(name=ROLE_STUDENT))
+
+	def test_clearing_a_group_drops_its_members_cached_roles(self):
+		from .roles import role_names
+
+		student_group = Group.objects.get(name=ROLE_STUDENT)
+		self.assertIn(ROLE_STUDENT, role_names(self.user))
+		with self.captureOnCommitCallbacks(execute=True):
+			student_group.user_set.clear()
+		self.assertNotIn(ROLE_STUDENT, role_names(User.objects.get(pk=self.user.pk)))
+
+	def test_version_bumps_wait_for_the_commit(self):
+		from .caching import get_version
+
+		before = get_version("catalog")
+		with self.captureOnCommitCallbacks() as callbacks:
+			Course.objects.create(code="VB101", title="Versioned")
+			# A read before the commit must not cache the uncommitted row under a new version.
+			self.assertEqual(get_version("catalog"), before)
+		for callback in callbacks:
+			callback()
+		self.assertNotEqual(get_version("catalog"), before)
+
+	def test_cache_url_picks_the_backend(self):
+		from django.core.exceptions import ImproperlyConfigured
+
+		from university_portal.settings import _cache_from_url
+
+		self.assertEqual(_cache_from_url("locmem://")["BACKEND"], "django.core.cache.backends.locmem.LocMemCache")
+		file_cache = _cache_from_url("file:///var/cache/portal")
+		self.assertEqual(file_cache["BACKEND"], "django.core.cache.backends.filebased.FileBasedCache")
+		self.assertEqual(file_cache["LOCATION"], "/var/cache/portal")
+		redis_cache = _cache_from_url("redis://cache:6379/0")
+		self.assertEqual(redis_cache["BACKEND"], "django.core.cache.backends.redis.RedisCache")
+		self.assertEqual(redis_cache["LOCATION"], "redis://cache:6379/0")
+		with self.assertRaises(ImproperlyConfigured):
+			_cache_from_url("memcached://127.0.0.1:11211")
+
+	def test_production_defaults_to_a_shared_file_cache(self):
+		import importlib
+		import os
+		from unittest import mock
+
+		with mock.patch.dict(os.environ, {"DJANGO_SECRET_KEY": "x", "DJANGO_METRICS_TOKEN": "x", "DJANGO_ALLOWED_HOSTS": "example.com"}):
+			os.environ.pop("DJANGO_CACHE_URL", None)
+			settings_prod = importlib.reload(importlib.import_module("university_portal.settings_prod"))
+		self.assertEqual(settings_prod.CACHES["default"]["BACKEND"], "django.core.cache.backends.filebased.FileBasedCache")
+		self.assertEqual(settings_prod.SESSION_ENGINE, "portal.sessions")
+
+	def test_warm_requests_read_the_session_from_the_cache(self):
+		from django.db import connection
+		from django.test.utils import CaptureQueriesContext
+
+		self.client.post(reverse("portal:login"), {"username": "session_user", "password": "password123"})
+		self.client.get(reverse("portal:profile"))
+		with CaptureQueriesContext(connection) as ctx:
+			self.assertEqual(self.client.get(reverse("portal:profile")).status_code, 200)
+		self.assertFalse([q["sql"] for q in ctx.captured_queries if "django_session" in q["sql"]])
+
+	@override_settings(SESSION_SAVE_EVERY_REQUEST=True, PORTAL_SESSION_WRITE_BACK_SECONDS=300)
+	def test_expiry_only_saves_are_written_back_to_the_database_periodically(self):
+		import time
+		from unittest import mock
+
+		from django.contrib.sessions.models import Session
+
+		self.client.post(reverse("portal:login"), {"username": "session_user", "password": "password123"})
+		key = self.client.session.session_key
+		written = Session.objects.get(session_key=key).expire_date
+		self.client.get(reverse("portal:profile"))
+		self.assertEqual(Session.objects.get(session_key=key).expire_date, written)
+
+		with mock.patch("portal.sessions.time.time", return_value=time.time() + 301):
+			self.client.get(reverse("portal:profile"))
+		self.assertGreater(Session.objects.get(session_key=key).expire_date, written)
+
+
+class ImportUsersTests(TestCase):
+	def _import(self, text: str, **options):
+		import os
+		import tempfile
+		from io import StringIO
+
+		from django.core.management import call_command
+
+		with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+			f.write(text)
+		self.addCleanup(os.unlink, f.name)
+		out, err = StringIO(), StringIO()
+		call_command("import_users", f.name, workers=1, stdout=out, stderr=err, **options)
+		return out.getvalue()
+
+	def test_import_is_idempotent_and_assigns_roles(self):
+		csv_text = (
+			"username,email,first_name,last_name,password,roles\n"
+			"intake_a,A@Example.EDU,Ada,Lovelace,Secret-pass-1,STUDENT\n"
+			"intake_b,,,,,\n"
+			"intake_c,,,,,Student;FACULTY\n"
+			"intake_a,,,,,\n"
+		)
+		out = self._import(csv_text, default_roles="STUDENT")
+		self.assertIn("3 users created", out)
+		self.assertIn("1 repeated in the file", out)
+		ada = User.objects.get(username="intake_a")
+		self.assertTrue(ada.check_password("Secret-pass-1"))
+		self.assertEqual(ada.email, "A@example.edu")
+		self.assertFalse(User.objects.get(username="intake_b").has_usable_password())
+		self.assertEqual(
+			set(User.objects.get(username="intake_c").groups.values_list("name", flat=True)), {ROLE_STUDENT, "Faculty"}
+		)
+		self.assertEqual(list(User.objects.get(username="intake_b").groups.values_list("name", flat=True)), [ROLE_STUDENT])
+
+		out = self._import(csv_text)
+		self.assertIn("0 users created", out)
+		self.assertIn("3 already existed", out)
+		self.assertEqual(User.objects.filter(username__startswith="intake_").count(), 3)
+
+	def test_usernames_taken_during_the_import_are_not_counted_or_given_roles(self):
+		from unittest import mock
+
+		from django.contrib.auth.hashers import make_password
+
+		def racing_make_password(password):
+			# Another import creates `race_b` after this batch checked which usernames exist.
+			User.objects.get_or_create(username="race_b")
+			return make_password(password)
+
+		with mock.patch("portal.management.commands.import_users.make_password", side_effect=racing_make_password):
+			out = self._import("username,roles\nrace_a,STUDENT\nrace_b,FACULTY\n")
+		self.assertIn("1 users created", out)
+		self.assertIn("1 already existed", out)
+		self.assertIn("1 group memberships added", out)
+		self.assertFalse(User.objects.get(username="race_b").groups.exists())
+
+	def test_invalid_rows_are_reported_and_skipped(self):
+		from django.core.management.base import CommandError
+
+		with self.assertRaisesMessage(CommandError, "2 invalid row(s)"):
+			self._import("username,roles\nok_user,STUDENT\nbad user!,STUDENT\nwizard,WIZARD\n")
+		self.assertTrue(User.objects.filter(username="ok_user").exists())
+		self.assertFalse(User.objects.filter(username="wizard").exists())
+
+
+class TermRolloverTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		ensure_groups_exist()
+		self.registrar = User.objects.create_user(username="rollover_registrar", password="password123")
+		self.registrar.groups.add(Group.objects.get(name=ROLE_REGISTRAR))
+		self.prof = User.objects.create_user(username="rollover_prof", password="password123")
+		self.fall = Term.objects.create(
+			name="Fall 2026",
+			start_date=date(2026, 9, 1),
+			end_date=date(2026, 12, 15),
+			is_active=True,
+			registration_start=timezone.now(),
+		)
+		self.sections = []
+		for code in ("CS101", "CS102", "CS103"):
+			course = Course.objects.create(code=code, title=code)
+			self.sections.append(
+				Section.objects.create(term=self.fall, course=course, capacity=40, meeting_days="Mon", location="LT-1")
+			)
+		SectionInstructor.objects.create(section=self.sections[0], instructor=self.prof)
+
+	def test_plan_and_apply_into_a_new_term(self):
+		from .rollover import apply_rollover, plan_rollover
+
+		plan = plan_rollover(
+			self.fall, "Spring 2027", start_date=date(2027, 1, 10), end_date=date(2027, 5, 10), capacity_percent=10
+		)
+		self.assertIsNone(plan.target)
+		self.assertEqual((len(plan.new_sections), plan.instructor_links, plan.capacity_changes), (3, 1, 3))
+		self.assertEqual(plan.seats, (120, 132))
+		self.assertFalse(Term.objects.filter(name="Spring 2027").exists())
+
+		# Savepoints, get_or_create of the term, its lock and sections, 2 inserts and 2 updates.
+		with self.assertNumQueries(12), self.captureOnCommitCallbacks(execute=True):
+			result = apply_rollover(plan, activate=True)
+		spring = Term.objects.get(name="Spring 2027")
+		self.assertEqual(result.term, spring)
+		self.assertTrue(spring.is_active)
+		self.assertFalse(Term.objects.get(id=self.fall.id).is_active)
+		self.assertEqual(spring.registration_start, self.fall.registration_start + timedelta(days=131))
+		self.assertEqual(sorted(Section.objects.filter(term=spring).values_list("capacity", flat=True)), [44, 44, 44])
+		link = SectionInstructor.objects.get(section__term=spring)
+		self.assertEqual((link.section.course.code, link.instructor), ("CS101", self.prof))
+
+		# Re-running skips what is already there and reports sections only in the target.
+		Section.objects.create(term=spring, course=Course.objects.create(code="CS200", title="New"))
+		course = Course.objects.create(code="CS104", title="Added late")
+		Section.objects.create(term=self.fall, course=course)
+		plan = plan_rollover(self.fall, "Spring 2027")
+		self.assertEqual([s.course.code for s in plan.new_sections], ["CS104"])
+		self.assertEqual(len(plan.skipped), 3)
+		self.assertEqual([s.course.code for s in plan.only_in_target], ["CS200"])
+
+	def test_concurrent_apply_does_not_duplicate_sections(self):
+		from .rollover import apply_rollover, plan_rollover
+
+		dates = {"start_date": date(2027, 1, 10), "end_date": date(2027, 5, 10)}
+		first = plan_rollover(self.fall, "Spring 2027", **dates)
+		second = plan_rollover(self.fall, "Spring 2027", **dates)
+		self.assertEqual(apply_rollover(first).sections, 3)
+		# Planned before the first apply: the term and its sections now exist.
+		result = apply_rollover(second)
+		self.assertEqual((result.term.name, result.sections, result.instructor_links), ("Spring 2027", 0, 0))
+		self.assertEqual(Section.objects.filter(term__name="Spring 2027").count(), 3)
+		self.assertEqual(SectionInstructor.objects.filter(section__term__name="Spring 2027").count(), 1)
+
+	def test_new_target_needs_dates(self):
+		from .rollover import plan_rollover
+
+		with self.assertRaisesMessage(ValueError, "give its start and end dates"):
+			plan_rollover(self.fall, "Spring 2027")
+		with self.assertRaisesMessage(ValueError, "same"):
+			plan_rollover(self.fall, "Fall 2026")
+
+	def test_command_dry_run_writes_nothing(self):
+		from io import StringIO
+
+		from django.core.management import call_command
+
+		out = StringIO()
+		call_command(
+			"rollover_term", "Fall 2026", target="Spring 2027", start="2027-01-10", end="2027-05-10", dry_run=True, stdout=out
+		)
+		self.assertIn("+ 3 sections, 1 instructor assignments", out.getvalue())
+		self.assertFalse(Term.objects.filter(name="Spring 2027").exists())
+
+		call_command("rollover_term", "Fall 2026", target="Spring 2027", start="2027-01-10", end="2027-05-10", stdout=out)
+		self.assertEqual(Section.objects.filter(term__name="Spring 2027").count(), 3)
+
+	def test_registrar_previews_then_applies(self):
+		from .models import AuditLog
+
+		self.client.force_login(self.registrar)
+		url = reverse("portal:registrar_rollover")
+		self.assertEqual(self.client.get(url).status_code, 200)
+		form = {
+			"source": self.fall.id,
+			"target_name": "Spring 2027",
+			"start_date": "2027-01-10",
+			"end_date": "2027-05-10",
+			"capacity_percent": "0",
+			"with_instructors": "on",
+		}
+		resp = self.client.post(url, {**form, "action": "preview"})
+		self.assertContains(resp, "Copy 3 sections")
+		self.assertFalse(Term.objects.filter(name="Spring 2027").exists())
+
+		resp = self.client.post(url, {**form, "action": "apply"})
+		spring = Term.objects.get(name="Spring 2027")
+		self.assertRedirects(resp, f"{reverse('portal:registrar_schedule')}?term={spring.id}")
+		self.assertEqual(Section.objects.filter(term=spring).count(), 3)
+		self.assertTrue(AuditLog.objects.filter(action="registrar.term.rollover", entity_id=str(spring.id)).exists())
+
+		self.client.force_login(self.prof)
+		self.assertEqual(self.client.get(url).status_code, 403)
+
+
+class CourseRequisiteTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		ensure_groups_exist()
+		self.student = User.objects.create_user(username="req_student", password="password123")
+		self.student.groups.add(Group.objects.get(name=ROLE_STUDENT))
+		self.past = Term.objects.create(name="Fall 2025", start_date=date(2025, 9, 1), end_date=date(2025, 12, 15))
+		self.term = Term.objects.create(
+			name="Spring 2026",
+			start_date=date.today(),
+			end_date=date.today() + timedelta(days=90),
+			is_active=True,
+		)
+		self.courses = {code: Course.objects.create(code=code, title=code) for code in ("CS101", "CS201", "CS301", "CS302")}
+		self.sections = {
+			code: Section.objects.create(term=self.term, course=course) for code, course in self.courses.items()
+		}
+		with self.captureOnCommitCallbacks(execute=True):
+			self._require("CS201", "CS101")
+			self._require("CS301", "CS201")
+			self._require("CS302", "CS301", kind=CourseRequisite.Kind.COREQUISITE)
+
+	def _require(self, code, required, kind=CourseRequisite.Kind.PREREQUISITE):
+		return CourseRequisite.objects.create(
+			course=self.courses[code], required_course=self.courses[required], kind=kind
+		)
+
+	def _pass(self, code, value="B"):
+		section = Section.objects.create(term=self.past, course=self.courses[code])
+		with self.captureOnCommitCallbacks(execute=True):
+			Grade.objects.create(section=section, student=self.student, value=value, released=True)
+
+	def test_closure_is_transitive_and_cycles_are_rejected(self):
+		from django.core.exceptions import ValidationError
+
+		from .models import PrerequisiteClosure
+
+		self.assertEqual(
+			set(PrerequisiteClosure.objects.values_list("course__code", "prerequisite__code", "depth")),
+			{("CS201", "CS101", 1), ("CS301", "CS201", 1), ("CS301", "CS101", 2)},
+		)
+		loop = CourseRequisite(course=self.courses["CS101"], required_course=self.courses["CS301"])
+		with self.assertRaisesMessage(ValidationError, "cycle"):
+			loop.full_clean()
+
+		with self.captureOnCommitCallbacks(execute=True):
+			CourseRequisite.objects.filter(course__code="CS201").delete()
+		self.assertEqual(list(PrerequisiteClosure.objects.values_list("course__code", "prerequisite__code")), [("CS301", "CS201")])
+
+	def test_one_closure_rebuild_per_transaction(self):
+		from unittest import mock
+
+		from django.db import transaction
+
+		with mock.patch("portal.signals.rebuild_closure") as rebuild, self.captureOnCommitCallbacks(execute=True):
+			self._require("CS302", "CS101")
+			self._require("CS301", "CS101")
+			CourseRequisite.objects.filter(course__code="CS201").delete()
+		rebuild.assert_called_once_with()
+
+		# A rolled-back savepoint takes its queued rebuild with it; the next rule queues another.
+		with mock.patch("portal.signals.rebuild_closure") as rebuild, self.captureOnCommitCallbacks(execute=True):
+			with self.assertRaises(RuntimeError), transaction.atomic():
+				self._require("CS302", "CS201")
+				raise RuntimeError
+			self._require("CS302", "CS201")
+		rebuild.assert_called_once_with()
+
+	def test_eligibility_uses_passed_grades_and_current_enrollments(self):
+		from . import requisites
+
+		self._pass("CS101", "F")
+		problems = requisites.check_sections(self.student.id, self.sections.values())
+		self.assertEqual(set(problems), {self.sections[c].id for c in ("CS201", "CS301", "CS302")})
+		self.assertEqual(problems[self.sections["CS301"].id].missing_chain, ("CS101",))
+
+		self._pass("CS101", "C")
+		self._pass("CS201")
+		problems = requisites.check_sections(self.student.id, self.sections.values())
+		self.assertEqual(problems[self.sections["CS302"].id].message, "CS302: take CS301 in the same term.")
+		self.assertEqual(requisites.check_sections(self.student.id, self.sections.values(), frozenset({"CS301"})), {})
+
+		with self.assertNumQueries(0):
+			requisites.check_sections(self.student.id, self.sections.values())
+
+	def test_registration_flags_and_refuses_ineligible_sections(self):
+		self.client.force_login(self.student)
+		resp = self.client.get(reverse("portal:registration"))
+		self.assertContains(resp, "CS201: needs CS101 first.")
+		self.assertContains(resp, "Requisites not met", count=3)
+
+		resp = self.client.post(reverse("portal:registration"), {"action": "add", "section_id": self.sections["CS201"].id})
+		self.assertRedirects(resp, reverse("portal:registration"))
+		self.assertFalse(Enrollment.objects.filter(student=self.student).exists())
+
+		self._pass("CS101")
+		self.client.post(reverse("portal:registration"), {"action": "add", "section_id": self.sections["CS201"].id})
+		self.assertTrue(Enrollment.objects.filter(student=self.student, section=self.sections["CS201"]).exists())
+
+
+class DegreeAuditTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		ensure_groups_exist()
+		self.student = User.objects.create_user(username="audit_student", password="password123")
+		self.student.groups.add(Group.objects.get(name=ROLE_STUDENT))
+		self.advisor = User.objects.create_user(username="audit_advisor", password="password123")
+		self.advisor.groups.add(Group.objects.get(name=ROLE_FACULTY))
+		self.past = Term.objects.create(name="Fall 2025", start_date=date(2025, 9, 1), end_date=date(2025, 12, 15))
+		self.term = Term.objects.create(
+			name="Spring 2026", start_date=date(2026, 1, 10), end_date=date(2026, 5, 10), is_active=True
+		)
+		self.courses = {
+			code: Course.objects.create(code=code, title=code, department=code[:2], level=level)
+			for code, level in (("CS101", "100"), ("CS102", "100"), ("CS210", "200"), ("CS220", "200"), ("CS310", "300"), ("MA101", "100"))
+		}
+		self.program = DegreeProgram.objects.create(code="BSCS", name="Computer Science", total_credits=12)
+		core = DegreeRequirement.objects.create(program=self.program, name="Core", kind="all", position=1)
+		core.courses.set([self.courses["CS101"], self.courses["CS102"]])
+		electives = DegreeRequirement.objects.create(
+			program=self.program, name="Electives", kind="choose", min_courses=1, position=2
+		)
+		electives.courses.set([self.courses["CS210"], self.courses["CS220"], self.courses["CS101"]])
+		DegreeRequirement.objects.create(
+			program=self.program, name="Upper CS", kind="credits", min_credits=3, department="CS", min_level=300, position=3
+		)
+		StudentProgram.objects.create(student=self.student, program=self.program, cohort="2025", advisor=self.advisor)
+
+	def _grade(self, code, value="B", term=None):
+		section = Section.objects.create(term=term or self.past, course=self.courses[code])
+		with self.captureOnCommitCallbacks(execute=True):
+			Grade.objects.create(section=section, student=self.student, value=value, released=True)
+
+	def _enroll(self, code):
+		section = Section.objects.create(term=self.term, course=self.courses[code])
+		with self.captureOnCommitCallbacks(execute=True):
+			Enrollment.objects.create(section=section, student=self.student)
+
+	def test_requirements_claim_courses_once_and_track_progress(self):
+		from .degree_audit import audit_student
+
+		self._grade("CS101")
+		self._grade("CS210", "F")
+		self._grade("CS220", "A")
+		self._grade("MA101")
+		self._enroll("CS102")
+		self._enroll("CS310")
+		[audit] = audit_student(self.student.id)
+		core, electives, upper = audit.requirements
+		# CS101 counts for the core, not the electives it is also listed under.
+		self.assertEqual(([c.code for c in core.applied], core.missing), (["CS101"], ["CS102"]))
+		self.assertTrue(core.in_progress_only)
+		self.assertEqual(([c.code for c in electives.applied], electives.satisfied), (["CS220"], True))
+		self.assertEqual((upper.satisfied, [c.code for c in upper.in_progress]), (False, ["CS310"]))
+		self.assertEqual((audit.credits_earned, audit.credits_in_progress), (9, 6))
+		self.assertEqual([r.name for r in audit.remaining], ["Core", "Upper CS"])
+		self.assertFalse(audit.complete)
+
+		self._grade("CS102", term=self.term)
+		self._grade("CS310", "A-", term=self.term)
+		[audit] = audit_student(self.student.id)
+		self.assertTrue(audit.complete)
+
+	def test_audits_are_memoized_per_student_data_version(self):
+		from .degree_audit import audit_student, audit_students
+
+		self._grade("CS101")
+		audit_student(self.student.id)
+		with self.assertNumQueries(0):
+			audit_student(self.student.id)
+		self._grade("CS102")
+		self.assertEqual(audit_student(self.student.id)[0].requirements[0].missing, [])
+
+		DegreeRequirement.objects.filter(name="Core").update(name="Core courses")
+		with self.captureOnCommitCallbacks(execute=True):
+			DegreeProgram.objects.get(id=self.program.id).save()
+		self.assertEqual(audit_student(self.student.id)[0].requirements[0].name, "Core courses")
+
+		others = [User.objects.create_user(username=f"audit_bulk_{i}").id for i in range(3)]
+		for user_id in others:
+			StudentProgram.objects.create(student_id=user_id, program=self.program)
+		# Declared programs, records (grades, enrollments); the program rules are cached.
+		with self.assertNumQueries(3):
+			audits = audit_students(others + [self.student.id])
+		self.assertEqual([len(audits[user_id]) for user_id in others], [1, 1, 1])
+
+	def test_student_and_advisor_pages(self):
+		self._grade("CS101")
+		self.client.force_login(self.student)
+		resp = self.client.get(reverse("portal:degree_audit"))
+		self.assertContains(resp, "BSCS — Computer Science")
+		self.assertContains(resp, "CS102")
+		self.assertEqual(self.client.get(reverse("portal:degree_audit") + "?student=audit_advisor").status_code, 403)
+
+		self.client.force_login(self.advisor)
+		resp = self.client.get(reverse("portal:degree_audit"))
+		self.assertContains(resp, "?student=audit_student")
+		self.assertContains(resp, "3 remaining")
+		resp = self.client.get(reverse("portal:degree_audit") + "?student=audit_student")
+		self.assertContains(resp, "Upper CS")
+
+	def test_batch_command_writes_csv(self):
+		from io import StringIO
+
+		from django.core.management import call_command
+
+		self._grade("CS101")
+		out, err = StringIO(), StringIO()
+		call_command("audit_degrees", program="BSCS", workers=1, stdout=out, stderr=err)
+		lines = out.getvalue().splitlines()
+		self.assertEqual(lines[0].split(",")[:3], ["username", "program", "cohort"])
+		self.assertEqual(lines[1], "audit_student,BSCS,2025,no,3.0,0,12.0,Core; Electives; Upper CS")
+		self.assertIn("Audited 1 students", err.getvalue())
@@ -1,28 +1,38 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = "portal"
 
+# Read-heavy pages have async variants for ASGI deployments (PORTAL_ASYNC_VIEWS).
+read_views = async_views if settings.PORTAL_ASYNC_VIEWS else views
+
 urlpatterns = [
-    path("", views.dashboard, name="dashboard"),
+    path("", read_views.dashboard, name="dashboard"),
     path("healthz/", views.healthz, name="healthz"),
+    path("livez/", views.livez, name="livez"),
+    path("readyz/", views.readyz, name="readyz"),
+    path("metrics", views.metrics_view, name="metrics"),
     path("login/", views.PortalLoginView.as_view(), name="login"),
     path("logout/", views.PortalLogoutView.as_view(), name="logout"),
     path("profile/", views.profile, name="profile"),
 
     path("it/users/new/", views.admin_users_new, name="admin_users_new"),
 
-    path("courses/", views.courses, name="courses"),
-    path("courses/<str:code>/", views.course_detail, name="course_detail"),
+    path("courses/", read_views.courses, name="courses"),
+    path("courses/<str:code>/", read_views.course_detail, name="course_detail"),
 
-    path("announcements/", views.announcements, name="announcements"),
+    path("announcements/", read_views.announcements, name="announcements"),
 
     path("registration/", views.registration_add_drop, name="registration"),
+    path("registration/seats/stream", views.seat_stream, name="seat_stream"),
 
-    path("timetable/", views.timetable, name="timetable"),
+    path("timetable/", read_views.timetable, name="timetable"),
+    path("timetable/feed/<str:token>.ics", views.timetable_feed, name="timetable_feed"),
 
-    path("grades/", views.grades, name="grades"),
+    path("grades/", read_views.grades, name="grades"),
+    path("degree-audit/", views.degree_audit_view, name="degree_audit"),
     path("faculty/grades/section/<int:section_id>/", views.faculty_grades, name="faculty_grades"),
 
     path("transcripts/", views.transcript_requests, name="transcript_requests"),
@@ -33,6 +43,8 @@ urlpatterns = [
     path("transcripts/request/<int:request_id>/official.pdf", views.official_transcript_pdf, name="official_transcript_pdf"),
 
     path("registrar/queue/", views.registrar_queue, name="registrar_queue"),
+    path("registrar/schedule/", views.registrar_schedule, name="registrar_schedule"),
+    path("registrar/rollover/", views.registrar_rollover, name="registrar_rollover"),
     path("registrar/queue/<int:request_id>/approve/", views.registrar_approve, name="registrar_approve"),
     path("registrar/queue/<int:request_id>/reject/", views.registrar_reject, name="registrar_reject"),
     path("registrar/queue/<int:request_id>/issue/", views.registrar_issue, name="registrar_issue"),
@@ -1,25 +1,26 @@
 from __future__ import annotations
 
+import time
 from io import BytesIO
 
 from django.contrib import messages
 from django.contrib.auth import REDIRECT_FIELD_NAME
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.views import LoginView, LogoutView
+from django.core import signing
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.db import connection
 from django.db import transaction
-from django.db.models import Q
 from django.http import FileResponse, Http404, HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from django.utils.http import url_has_allowed_host_and_scheme
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from django.views.decorators.http import condition
 
 from .models import (
-	Announcement,
 	AuditLog,
 	Course,
 	Enrollment,
@@ -27,16 +28,27 @@ from .models import (
 	Grade,
 	Section,
 	SectionInstructor,
+	StudentProgram,
 	SupportMessage,
 	SupportTicket,
 	Term,
 	TranscriptRequest,
 	TranscriptRequestEvent,
+	with_seats_taken,
 )
-from .forms import PortalUserCreateForm
-from .roles import ensure_role_groups, is_in_role
-
-
+from . import audit, availability, degree_audit, metrics, requisites, streams
+from .caching import get_versions
+from .catalog import search_catalog
+from .dashboard import announcements_for, panels as dashboard_panels
+from .db_routing import reads_from_replica
+from .forms import PortalUserCreateForm, TermRolloverForm
+from .ical import build_timetable_calendar
+from .roles import ensure_role_groups, is_in_role, role_names
+from .rollover import apply_rollover, plan_rollover
+from .scheduling import analyze_term
+
+
+@transaction.non_atomic_requests
 def healthz(request: HttpRequest) -> HttpResponse:
 	"""Basic health endpoint for load balancers.
 
@@ -51,6 +63,77 @@ def healthz(request: HttpRequest) -> HttpResponse:
 	return HttpResponse("ok", status=200, content_type="text/plain")
 
 
+@transaction.non_atomic_requests
+def livez(request: HttpRequest) -> HttpResponse:
+	"""Liveness probe: the process is serving requests. Never touches the DB."""
+	return HttpResponse("ok", status=200, content_type="text/plain")
+
+
+_migrations_applied = False
+
+
+def _readiness_checks() -> dict[str, str]:
+	global _migrations_applied
+	results: dict[str, str] = {}
+	try:
+		with connection.cursor() as cursor:
+			cursor.execute("SELECT 1")
+		results["database"] = "ok"
+	except Exception as exc:
+		results["database"] = f"error: {exc.__class__.__name__}"
+
+	if not _migrations_applied and results["database"] == "ok":
+		from django.db.migrations.executor import MigrationExecutor
+
+		try:
+			executor = MigrationExecutor(connection)
+			pending = executor.migration_plan(executor.loader.graph.leaf_nodes())
+			# Once applied, migrations stay applied for the life of this process.
+			_migrations_applied = not pending
+			results["migrations"] = "ok" if not pending else f"pending: {len(pending)}"
+		except Exception as exc:
+			results["migrations"] = f"error: {exc.__class__.__name__}"
+	elif _migrations_applied:
+		results["migrations"] = "ok"
+	else:
+		results["migrations"] = "unknown"
+
+	try:
+		probe = f"portal:readyz:{timezone.now().timestamp()}"
+		cache.set(probe, "1", 5)
+		results["cache"] = "ok" if cache.get(probe) == "1" else "error: read-back failed"
+		cache.delete(probe)
+	except Exception as exc:
+		results["cache"] = f"error: {exc.__class__.__name__}"
+	return results
+
+
+@transaction.non_atomic_requests
+def readyz(request: HttpRequest) -> HttpResponse:
+	"""Readiness probe: database reachable, migrations applied, cache reachable."""
+	results = _readiness_checks()
+	ready = all(value == "ok" for value in results.values())
+	body = "\n".join(f"{name}: {value}" for name, value in results.items()) + "\n"
+	return HttpResponse(body, status=200 if ready else 503, content_type="text/plain")
+
+
+@transaction.non_atomic_requests
+def metrics_view(request: HttpRequest) -> HttpResponse:
+	"""Prometheus scrape endpoint (text format), aggregated across workers.
+
+	If `PORTAL_METRICS_TOKEN` is set, scrapers must send it as a bearer token.
+	"""
+	from django.conf import settings
+	from django.utils.crypto import constant_time_compare
+
+	token = getattr(settings, "PORTAL_METRICS_TOKEN", "")
+	if token:
+		supplied = (request.META.get("HTTP_AUTHORIZATION") or "").removeprefix("Bearer ").strip()
+		if not constant_time_compare(supplied, token):
+			return HttpResponse("forbidden", status=403, content_type="text/plain")
+	return HttpResponse(metrics.render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 def _client_ip(request: HttpRequest) -> str | None:
 	xff = request.META.get("HTTP_X_FORWARDED_FOR")
 	if xff:
@@ -59,14 +142,16 @@ def _client_ip(request: HttpRequest) -> str | None:
 
 
 def _audit(request: HttpRequest, *, action: str, entity_type: str, entity_id: str = "", metadata: dict | None = None) -> None:
-	AuditLog.objects.create(
-		actor=request.user if request.user.is_authenticated else None,
-		action=action,
-		entity_type=entity_type,
-		entity_id=str(entity_id or ""),
-		metadata=metadata or {},
-		ip=_client_ip(request),
-		user_agent=(request.META.get("HTTP_USER_AGENT") or "")[:300],
+	audit.write(
+		AuditLog(
+			actor=request.user if request.user.is_authenticated else None,
+			action=action,
+			entity_type=entity_type,
+			entity_id=str(entity_id or ""),
+			metadata=metadata or {},
+			ip=_client_ip(request),
+			user_agent=(request.META.get("HTTP_USER_AGENT") or "")[:300],
+		)
 	)
 
 
@@ -105,7 +190,6 @@ class PortalLoginView(LoginView):
 		return reverse("portal:dashboard")
 
 	def form_valid(self, form):
-		ensure_role_groups()
 		_audit(self.request, action="auth.login", entity_type="user", entity_id=str(form.get_user().id))
 		response = super().form_valid(form)
 		if self._next_blocked_reason:
@@ -136,26 +220,25 @@ def admin_users_new(request: HttpRequest) -> HttpResponse:
 			from django.contrib.auth.models import Group
 
 			User = get_user_model()
-			user = User.objects.create_user(
-				username=form.cleaned_data["username"],
-				email=form.cleaned_data.get("email") or "",
-				password=form.cleaned_data["password1"],
-			)
-			user.is_staff = bool(form.cleaned_data.get("is_staff"))
-			user.save(update_fields=["is_staff"])
-
 			roles = form.cleaned_data.get("roles") or []
-			for role_name in roles:
-				group = Group.objects.get(name=role_name)
-				user.groups.add(group)
-
-			_audit(
-				request,
-				action="admin.user.create",
-				entity_type="user",
-				entity_id=str(user.id),
-				metadata={"username": user.username, "roles": list(roles), "is_staff": user.is_staff},
+			groups = list(Group.objects.filter(name__in=roles))
+			# Hash the password before the transaction opens; it is the slow part.
+			user = User(
+				username=User.normalize_username(form.cleaned_data["username"]),
+				email=User.objects.normalize_email(form.cleaned_data.get("email") or ""),
+				is_staff=bool(form.cleaned_data.get("is_staff")),
 			)
+			user.set_password(form.cleaned_data["password1"])
+			with transaction.atomic():
+				user.save()
+				user.groups.add(*groups)
+				_audit(
+					request,
+					action="admin.user.create",
+					entity_type="user",
+					entity_id=str(user.id),
+					metadata={"username": user.username, "roles": list(roles), "is_staff": user.is_staff},
+				)
 			messages.success(request, f"Created user '{user.username}'.")
 			return redirect("portal:admin_users_new")
 	else:
@@ -164,21 +247,41 @@ def admin_users_new(request: HttpRequest) -> HttpResponse:
 	return render(request, "portal/admin_users_new.html", {"form": form})
 
 
+@transaction.non_atomic_requests
 @login_required
+@reads_from_replica
 def courses(request: HttpRequest) -> HttpResponse:
 	active_term = Term.objects.filter(is_active=True).order_by("-start_date").first()
-	items = Course.objects.order_by("code")
-	return render(request, "portal/courses.html", {"active_term": active_term, "courses": items})
+	try:
+		page = int(request.GET.get("page") or 1)
+	except ValueError:
+		page = 1
+	result = search_catalog(
+		q=request.GET.get("q") or "",
+		department=request.GET.get("department") or "",
+		level=request.GET.get("level") or "",
+		page=page,
+	)
+	return render(request, "portal/courses.html", {"active_term": active_term, "catalog": result, "courses": result["courses"]})
 
 
+@transaction.non_atomic_requests
 @login_required
+@reads_from_replica
 def course_detail(request: HttpRequest, code: str) -> HttpResponse:
 	active_term = Term.objects.filter(is_active=True).order_by("-start_date").first()
 	course = get_object_or_404(Course, code=code.upper())
-	sections = Section.objects.select_related("term").filter(course=course)
+	sections = Section.objects.select_related("term").filter(course=course).order_by("section_code")
+	stream_url = None
 	if active_term:
-		sections = sections.filter(term=active_term)
-	sections = sections.order_by("section_code")
+		sections = list(sections.filter(term=active_term))
+		seats = availability.seats_taken(active_term.id)
+		for section in sections:
+			section.seats_taken = seats.get(section.id, 0)
+		if sections:
+			stream_url = streams.stream_url(request.user, [section.id for section in sections])
+	else:
+		sections = with_seats_taken(sections)
 
 	enrolled = set(
 		Enrollment.objects.filter(
@@ -190,61 +293,37 @@ def course_detail(request: HttpRequest, code: str) -> HttpResponse:
 	return render(
 		request,
 		"portal/course_detail.html",
-		{"active_term": active_term, "course": course, "sections": sections, "enrolled_section_ids": enrolled},
+		{
+			"active_term": active_term,
+			"course": course,
+			"requirements": requisites.requirements_map().get(course.code),
+			"sections": sections,
+			"enrolled_section_ids": enrolled,
+			"seat_stream_url": stream_url,
+		},
 	)
 
 
+@transaction.non_atomic_requests
 @login_required
 def dashboard(request: HttpRequest) -> HttpResponse:
-	ensure_role_groups()
-
-	now = timezone.now()
-	if request.user.is_superuser:
-		announcements_qs = Announcement.objects.all()
-	else:
-		announcements_qs = Announcement.objects.filter(
-			Q(target_roles__isnull=True) | Q(target_roles__in=request.user.groups.all())
-		).distinct()
-	announcements_qs = announcements_qs.order_by("-is_pinned", "-publish_at")
-	announcements = [a for a in announcements_qs[:50] if a.is_active(now)]
-
-	active_term = Term.objects.filter(is_active=True).order_by("-start_date").first()
-	my_enrollments = Enrollment.objects.select_related("section__course", "section__term").filter(
-		student=request.user, status=Enrollment.Status.ENROLLED
-	)
-	my_sections = [e.section for e in my_enrollments]
-
-	my_teaching = Section.objects.select_related("course", "term").filter(
-		instructors__instructor=request.user
-	)
-
-	open_tickets = SupportTicket.objects.filter(created_by=request.user).exclude(
-		status__in=[SupportTicket.Status.RESOLVED, SupportTicket.Status.CLOSED]
-	)
-
-	context = {
-		"active_term": active_term,
-		"announcements": announcements,
-		"my_sections": my_sections,
-		"my_teaching": my_teaching,
-		"open_tickets": open_tickets,
-	}
-	return render(request, "portal/dashboard.html", context)
+	# Each panel is cached under the version counters of its rows (portal.dashboard).
+	return render(request, "portal/dashboard.html", dashboard_panels(request.user, timezone.now()))
 
 
+@transaction.non_atomic_requests
 @login_required
 def profile(request: HttpRequest) -> HttpResponse:
-	return render(request, "portal/profile.html")
+	# The cached role names the navigation already loaded, not a groups query while rendering.
+	return render(request, "portal/profile.html", {"roles": sorted(role_names(request.user))})
 
 
+@transaction.non_atomic_requests
 @login_required
+@reads_from_replica
 def announcements(request: HttpRequest) -> HttpResponse:
 	now = timezone.now()
-	if request.user.is_superuser:
-		qs = Announcement.objects.all()
-	else:
-		qs = Announcement.objects.filter(Q(target_roles__isnull=True) | Q(target_roles__in=request.user.groups.all())).distinct()
-	items = [a for a in qs.order_by("-is_pinned", "-publish_at")[:200] if a.is_active(now)]
+	items = [a for a in announcements_for(request.user)[:200] if a.is_active(now)]
 	return render(request, "portal/announcements.html", {"announcements": items})
 
 
@@ -257,11 +336,13 @@ def registration_add_drop(request: HttpRequest) -> HttpResponse:
 		messages.info(request, "No active term is configured yet.")
 		return render(request, "portal/registration.html", {"active_term": None})
 
-	available_sections = Section.objects.select_related("course").filter(term=active_term).order_by("course__code")
+	available_sections = availability.term_sections(active_term)
 	my_enrollments = Enrollment.objects.select_related("section__course").filter(
 		student=request.user, section__term=active_term
 	)
 	enrolled_section_ids = {e.section_id for e in my_enrollments if e.status == Enrollment.Status.ENROLLED}
+	# Courses taken this term count towards co-requisites.
+	taking = frozenset(e.section.course.code for e in my_enrollments if e.status == Enrollment.Status.ENROLLED)
 
 	now = timezone.now()
 	reg_open = True
@@ -280,7 +361,17 @@ def registration_add_drop(request: HttpRequest) -> HttpResponse:
 		section = get_object_or_404(Section, id=section_id, term=active_term)
 
 		if action == "add":
+			if section.id not in enrolled_section_ids:
+				problem = requisites.check(section.course.code, requisites.passed_courses(request.user.id), taking)
+				if problem is not None:
+					messages.error(request, f"You can't add {problem.message}")
+					return redirect("portal:registration")
 			with transaction.atomic():
+				# Lock the section row so concurrent adds to the same section serialize;
+				# locking only existing enrollment rows would not stop two new inserts.
+				lock_started = time.perf_counter()
+				section = Section.objects.select_for_update().get(id=section.id)
+				metrics.observe("portal_registration_lock_wait_seconds", time.perf_counter() - lock_started)
 				enrollment = Enrollment.objects.select_for_update().filter(section=section, student=request.user).first()
 				if enrollment and enrollment.status == Enrollment.Status.ENROLLED:
 					messages.info(request, "Already enrolled.")
@@ -305,45 +396,134 @@ def registration_add_drop(request: HttpRequest) -> HttpResponse:
 						_audit(request, action="registration.waitlist", entity_type="section", entity_id=str(section.id))
 						messages.warning(request, "Section full; you are waitlisted.")
 		elif action == "drop":
-			enrollment = Enrollment.objects.filter(section=section, student=request.user).first()
-			if not enrollment or enrollment.status != Enrollment.Status.ENROLLED:
-				messages.info(request, "Not enrolled.")
-			else:
-				enrollment.status = Enrollment.Status.DROPPED
-				enrollment.save(update_fields=["status"])
-				_audit(request, action="registration.drop", entity_type="section", entity_id=str(section.id))
-				messages.success(request, "Dropped successfully.")
+			with transaction.atomic():
+				enrollment = Enrollment.objects.select_for_update().filter(section=section, student=request.user).first()
+				if not enrollment or enrollment.status != Enrollment.Status.ENROLLED:
+					messages.info(request, "Not enrolled.")
+				else:
+					enrollment.status = Enrollment.Status.DROPPED
+					enrollment.save(update_fields=["status"])
+					_audit(request, action="registration.drop", entity_type="section", entity_id=str(section.id))
+					messages.success(request, "Dropped successfully.")
 		else:
 			messages.error(request, "Invalid action.")
 
 		return redirect("portal:registration")
 
+	# One pass over the whole listing: the requirement map and passed courses are cached sets.
+	unmet = requisites.check_sections(request.user.id, available_sections, taking)
+	for row in available_sections:
+		if row.id in unmet:
+			row.unmet_requisites = unmet[row.id].message
+
 	context = {
 		"active_term": active_term,
 		"reg_open": reg_open,
 		"sections": available_sections,
 		"my_enrollments": my_enrollments,
 		"enrolled_section_ids": enrolled_section_ids,
+		"seat_stream_url": streams.stream_url(request.user),
 	}
 	return render(request, "portal/registration.html", context)
 
 
+@transaction.non_atomic_requests
+def seat_stream(request: HttpRequest) -> HttpResponse:
+	"""One-shot seat snapshot for EventSource clients when not running under ASGI.
+
+	Under ASGI this URL is served by `portal.streams.seat_stream_app`, which keeps
+	the connection open and pushes changes. Here the browser gets the current
+	counts and reconnects after `streams.RETRY_MS`.
+	"""
+	try:
+		section_ids = streams.parse_request(request.GET.get("token", ""), request.GET.get("sections", ""))
+	except streams.StreamRequestError as exc:
+		return HttpResponse(str(exc), status=exc.status, content_type="text/plain; charset=utf-8")
+	term_id = streams.active_term_id()
+	if term_id is None:
+		raise Http404("No active term.")
+	response = HttpResponse(streams.first_event(term_id, section_ids), content_type="text/event-stream")
+	response["Cache-Control"] = "no-cache"
+	return response
+
+
+TIMETABLE_FEED_SALT = "portal.timetable.feed"
+TIMETABLE_FEED_CACHE_SECONDS = 60 * 60 * 24
+
+
+def _timetable_sections(user, active_term):
+	if is_in_role(user, "FACULTY"):
+		sections = Section.objects.select_related("course").filter(term=active_term, instructors__instructor=user)
+	else:
+		sections = Section.objects.select_related("course").filter(
+			term=active_term, enrollments__student=user, enrollments__status=Enrollment.Status.ENROLLED
+		)
+	return sections.order_by("course__code", "section_code")
+
+
+def timetable_feed_token(user) -> str:
+	return signing.dumps(user.pk, salt=TIMETABLE_FEED_SALT)
+
+
+def _timetable_feed_etag(request: HttpRequest, token: str) -> str | None:
+	"""ETag for a feed, computed from cache-held version counters only (no SQL)."""
+	try:
+		user_id = signing.loads(token, salt=TIMETABLE_FEED_SALT)
+	except signing.BadSignature:
+		return None
+	versions = get_versions(
+		[("enrollments", user_id), ("teaching", user_id), ("roles", user_id), ("schedule", "")]
+	)
+	return "tt-{}-{}".format(user_id, "-".join(str(v) for v in versions.values()))
+
+
+@transaction.non_atomic_requests
 @login_required
+@reads_from_replica
 def timetable(request: HttpRequest) -> HttpResponse:
 	_require_role(request, "STUDENT", "FACULTY")
 
 	active_term = Term.objects.filter(is_active=True).order_by("-start_date").first()
-	if is_in_role(request.user, "FACULTY"):
-		sections = Section.objects.select_related("course").filter(term=active_term, instructors__instructor=request.user)
-	else:
-		sections = Section.objects.select_related("course").filter(
-			term=active_term, enrollments__student=request.user, enrollments__status=Enrollment.Status.ENROLLED
-		)
-	sections = sections.order_by("course__code", "section_code")
-	return render(request, "portal/timetable.html", {"active_term": active_term, "sections": sections})
+	sections = list(_timetable_sections(request.user, active_term))
+	feed_url = request.build_absolute_uri(
+		reverse("portal:timetable_feed", kwargs={"token": timetable_feed_token(request.user)})
+	)
+	return render(request, "portal/timetable.html", {"active_term": active_term, "sections": sections, "feed_url": feed_url})
+
 
+@transaction.non_atomic_requests
+@condition(etag_func=_timetable_feed_etag)
+def timetable_feed(request: HttpRequest, token: str) -> HttpResponse:
+	"""Per-user iCalendar feed for calendar apps (authenticated by a signed token).
 
+	Conditional GETs are answered with 304 by `condition` before this body runs;
+	unconditional polls are served from the cached rendering for the same ETag.
+	"""
+	etag = _timetable_feed_etag(request, token)
+	if etag is None:
+		raise Http404()
+	cache_key = f"portal:ics:{etag}"
+	body = cache.get(cache_key)
+	metrics.cache_lookup("timetable_feed", body is not None)
+	if body is None:
+		from django.contrib.auth import get_user_model
+
+		user = get_object_or_404(get_user_model(), pk=signing.loads(token, salt=TIMETABLE_FEED_SALT), is_active=True)
+		if not (user.is_superuser or is_in_role(user, "STUDENT") or is_in_role(user, "FACULTY")):
+			raise Http404()
+		active_term = Term.objects.filter(is_active=True).order_by("-start_date").first()
+		sections = _timetable_sections(user, active_term) if active_term else []
+		body = build_timetable_calendar(active_term, sections, name=f"Timetable — {user.username}")
+		cache.set(cache_key, body, TIMETABLE_FEED_CACHE_SECONDS)
+	response = HttpResponse(body, content_type="text/calendar; charset=utf-8")
+	response["Content-Disposition"] = 'inline; filename="timetable.ics"'
+	patch_cache_control(response, private=True, max_age=900)
+	return response
+
+
+@transaction.non_atomic_requests
 @login_required
+@reads_from_replica
 def grades(request: HttpRequest) -> HttpResponse:
 	_require_role(request, "STUDENT")
 
@@ -352,7 +532,42 @@ def grades(request: HttpRequest) -> HttpResponse:
 		.filter(student=request.user, released=True)
 		.order_by("-section__term__start_date", "section__course__code")
 	)
-	return render(request, "portal/grades.html", {"grades": grades_qs})
+	return render(request, "portal/grades.html", {"grades": list(grades_qs)})
+
+
+@transaction.non_atomic_requests
+@login_required
+def degree_audit_view(request: HttpRequest) -> HttpResponse:
+	"""A student's own audit; advisors see their advisees (and registrars anyone) with `?student=<username>`."""
+	username = (request.GET.get("student") or "").strip()
+	if username and username != request.user.username:
+		from django.contrib.auth import get_user_model
+
+		student = get_object_or_404(get_user_model(), username=username)
+		if not (
+			request.user.is_superuser
+			or is_in_role(request.user, "REGISTRAR")
+			or StudentProgram.objects.filter(student=student, advisor=request.user).exists()
+		):
+			raise PermissionDenied()
+	elif is_in_role(request.user, "STUDENT"):
+		student = request.user
+	else:
+		# Advisor overview: one batch audit for every advisee.
+		_require_role(request, "FACULTY", "REGISTRAR")
+		advisees = list(
+			StudentProgram.objects.select_related("student", "program")
+			.filter(advisor=request.user)
+			.order_by("student__username", "program__code")
+		)
+		audits = degree_audit.audit_students([a.student_id for a in advisees])
+		rows = [
+			(a, next((d for d in audits[a.student_id] if d.program_code == a.program.code), None)) for a in advisees
+		]
+		return render(request, "portal/degree_audit.html", {"advisee_rows": rows, "student": None})
+
+	audits = degree_audit.audit_student(student.id)
+	return render(request, "portal/degree_audit.html", {"student": student, "audits": audits})
 
 
 @login_required
@@ -388,6 +603,11 @@ def faculty_grades(request: HttpRequest, section_id: int) -> HttpResponse:
 
 
 def _build_unofficial_transcript_pdf(user, grades_qs) -> bytes:
+	# ReportLab takes tens of milliseconds to import; load it on the PDF paths only
+	# so workers and management commands that never render a PDF don't pay for it.
+	from reportlab.lib.pagesizes import letter
+	from reportlab.pdfgen import canvas
+
 	buffer = BytesIO()
 	pdf = canvas.Canvas(buffer, pagesize=letter)
 	width, height = letter
@@ -424,19 +644,26 @@ def _build_unofficial_transcript_pdf(user, grades_qs) -> bytes:
 	return buffer.getvalue()
 
 
+@transaction.non_atomic_requests
 @login_required
+@reads_from_replica
 def unofficial_transcript_pdf(request: HttpRequest) -> HttpResponse:
 	_require_role(request, "STUDENT", "ALUMNI")
 	grades_qs = Grade.objects.select_related("section__term", "section__course").filter(student=request.user, released=True)
-	content = _build_unofficial_transcript_pdf(request.user, grades_qs.order_by("section__term__start_date", "section__course__code"))
+	# Load the rows first so ReportLab runs with no query (or transaction) in flight.
+	rows = list(grades_qs.order_by("section__term__start_date", "section__course__code"))
+	started = time.perf_counter()
+	content = _build_unofficial_transcript_pdf(request.user, rows)
+	metrics.observe("portal_pdf_render_seconds", time.perf_counter() - started, {"document": "unofficial_transcript"})
 	_audit(request, action="transcript.unofficial.download", entity_type="user", entity_id=str(request.user.id))
 	return FileResponse(BytesIO(content), as_attachment=True, filename="unofficial_transcript.pdf")
 
 
+@transaction.non_atomic_requests
 @login_required
 def transcript_requests(request: HttpRequest) -> HttpResponse:
 	_require_role(request, "STUDENT", "ALUMNI")
-	items = TranscriptRequest.objects.filter(requester=request.user).order_by("-created_at")
+	items = list(TranscriptRequest.objects.filter(requester=request.user).order_by("-created_at"))
 	return render(request, "portal/transcript_requests.html", {"requests": items})
 
 
@@ -450,26 +677,28 @@ def transcript_request_new(request: HttpRequest) -> HttpResponse:
 		if not purpose or delivery_method not in TranscriptRequest.DeliveryMethod.values:
 			messages.error(request, "Please fill all required fields.")
 		else:
-			tr = TranscriptRequest.objects.create(
-				requester=request.user,
-				purpose=purpose,
-				delivery_method=delivery_method,
-				recipient_details=recipient_details,
-				status=TranscriptRequest.Status.SUBMITTED,
-			)
-			TranscriptRequestEvent.objects.create(
-				request=tr,
-				actor=request.user,
-				from_status="",
-				to_status=tr.status,
-				note="Created by requester",
-			)
-			_audit(request, action="transcript.request.create", entity_type="transcript_request", entity_id=str(tr.id))
+			with transaction.atomic():
+				tr = TranscriptRequest.objects.create(
+					requester=request.user,
+					purpose=purpose,
+					delivery_method=delivery_method,
+					recipient_details=recipient_details,
+					status=TranscriptRequest.Status.SUBMITTED,
+				)
+				TranscriptRequestEvent.objects.create(
+					request=tr,
+					actor=request.user,
+					from_status="",
+					to_status=tr.status,
+					note="Created by requester",
+				)
+				_audit(request, action="transcript.request.create", entity_type="transcript_request", entity_id=str(tr.id))
 			messages.success(request, "Request submitted.")
 			return redirect("portal:transcript_requests")
 	return render(request, "portal/transcript_request_new.html", {"delivery_methods": TranscriptRequest.DeliveryMethod.choices})
 
 
+@transaction.non_atomic_requests
 @login_required
 def transcript_request_detail(request: HttpRequest, request_id: int) -> HttpResponse:
 	_require_role(request, "STUDENT", "ALUMNI")
@@ -478,57 +707,151 @@ def transcript_request_detail(request: HttpRequest, request_id: int) -> HttpResp
 	return render(request, "portal/transcript_request_detail.html", {"tr": tr, "events": events})
 
 
+# Statuses each transcript request transition may start from.
+_CANCELLABLE = {TranscriptRequest.Status.SUBMITTED, TranscriptRequest.Status.IN_REVIEW, TranscriptRequest.Status.APPROVED}
+_APPROVABLE = {TranscriptRequest.Status.SUBMITTED, TranscriptRequest.Status.IN_REVIEW}
+_REJECTABLE = _CANCELLABLE
+_ISSUABLE = {TranscriptRequest.Status.APPROVED}
+
+
+def _lock_for_transition(request: HttpRequest, request_id: int, allowed: set, verb: str) -> TranscriptRequest | None:
+	"""Lock the request row and re-check its status; None (with a message) if it has moved on meanwhile."""
+	tr = TranscriptRequest.objects.select_for_update().get(id=request_id)
+	if tr.status not in allowed:
+		messages.error(request, f"This request is {tr.get_status_display().lower()} and can't be {verb}.")
+		return None
+	return tr
+
+
 @login_required
 def transcript_request_cancel(request: HttpRequest, request_id: int) -> HttpResponse:
 	_require_role(request, "STUDENT", "ALUMNI")
 	tr = get_object_or_404(TranscriptRequest, id=request_id, requester=request.user)
-	if tr.status in [TranscriptRequest.Status.ISSUED, TranscriptRequest.Status.REJECTED]:
+	if tr.status not in _CANCELLABLE:
 		messages.info(request, "This request can no longer be cancelled.")
 		return redirect("portal:transcript_request_detail", request_id=tr.id)
 	if request.method == "POST":
-		prev = tr.status
-		tr.status = TranscriptRequest.Status.REJECTED
-		tr.review_reason = "Cancelled by requester"
-		tr.reviewed_by = request.user
-		tr.save(update_fields=["status", "review_reason", "reviewed_by", "updated_at"])
-		TranscriptRequestEvent.objects.create(
-			request=tr,
-			actor=request.user,
-			from_status=prev,
-			to_status=tr.status,
-			note="Cancelled by requester",
-		)
-		_audit(request, action="transcript.request.cancel", entity_type="transcript_request", entity_id=str(tr.id))
+		with transaction.atomic():
+			tr = _lock_for_transition(request, tr.id, _CANCELLABLE, "cancelled")
+			if tr is None:
+				return redirect("portal:transcript_request_detail", request_id=request_id)
+			prev = tr.status
+			tr.status = TranscriptRequest.Status.REJECTED
+			tr.review_reason = "Cancelled by requester"
+			tr.reviewed_by = request.user
+			tr.save(update_fields=["status", "review_reason", "reviewed_by", "updated_at"])
+			TranscriptRequestEvent.objects.create(
+				request=tr,
+				actor=request.user,
+				from_status=prev,
+				to_status=tr.status,
+				note="Cancelled by requester",
+			)
+			_audit(request, action="transcript.request.cancel", entity_type="transcript_request", entity_id=str(tr.id))
 		messages.success(request, "Request cancelled.")
 		return redirect("portal:transcript_requests")
 	return render(request, "portal/confirm.html", {"title": "Cancel transcript request", "message": "Cancel this request?"})
 
 
+@transaction.non_atomic_requests
 @login_required
+@reads_from_replica
 def registrar_queue(request: HttpRequest) -> HttpResponse:
 	_require_role(request, "REGISTRAR")
-	items = TranscriptRequest.objects.all().order_by("status", "created_at")
+	items = list(TranscriptRequest.objects.select_related("requester").order_by("status", "created_at"))
 	return render(request, "portal/registrar_queue.html", {"items": items})
 
 
+@transaction.non_atomic_requests
+@login_required
+@reads_from_replica
+def registrar_schedule(request: HttpRequest) -> HttpResponse:
+	_require_role(request, "REGISTRAR")
+	terms = list(Term.objects.order_by("-start_date"))
+	term_id = request.GET.get("term")
+	if term_id:
+		try:
+			term_id = int(term_id)
+		except ValueError:
+			raise Http404("No such term.") from None
+		term = get_object_or_404(Term, id=term_id)
+	else:
+		term = Term.objects.filter(is_active=True).order_by("-start_date").first()
+	report = analyze_term(term) if term else None
+	return render(request, "portal/registrar_schedule.html", {"terms": terms, "term": term, "report": report})
+
+
+@login_required
+def registrar_rollover(request: HttpRequest) -> HttpResponse:
+	"""Clone a term's sections (and instructor links) into a new or existing term; preview first."""
+	_require_role(request, "REGISTRAR")
+	plan = None
+	if request.method == "POST":
+		form = TermRolloverForm(request.POST)
+		if form.is_valid():
+			data = form.cleaned_data
+			try:
+				plan = plan_rollover(
+					data["source"],
+					data["target_name"],
+					start_date=data["start_date"],
+					end_date=data["end_date"],
+					capacity_percent=data["capacity_percent"],
+					with_instructors=data["with_instructors"],
+				)
+			except ValueError as exc:
+				form.add_error(None, str(exc))
+			else:
+				if request.POST.get("action") == "apply":
+					result = apply_rollover(plan, activate=data["activate"])
+					_audit(
+						request,
+						action="registrar.term.rollover",
+						entity_type="term",
+						entity_id=str(result.term.id),
+						metadata={
+							"source": plan.source.name,
+							"target": result.term.name,
+							"sections": result.sections,
+							"instructor_links": result.instructor_links,
+							"skipped": len(plan.skipped),
+							"capacity_percent": plan.capacity_percent,
+							"activated": data["activate"],
+						},
+					)
+					messages.success(
+						request,
+						f"Copied {result.sections} sections and {result.instructor_links} instructor assignments "
+						f"into {result.term.name}.",
+					)
+					return redirect(f"{reverse('portal:registrar_schedule')}?term={result.term.id}")
+	else:
+		form = TermRolloverForm(initial={"source": Term.objects.filter(is_active=True).order_by("-start_date").first()})
+	return render(request, "portal/registrar_rollover.html", {"form": form, "plan": plan})
+
+
 @login_required
 def registrar_approve(request: HttpRequest, request_id: int) -> HttpResponse:
 	_require_role(request, "REGISTRAR")
 	tr = get_object_or_404(TranscriptRequest, id=request_id)
 	if request.method == "POST":
-		prev = tr.status
-		tr.status = TranscriptRequest.Status.APPROVED
-		tr.reviewed_by = request.user
-		tr.review_reason = (request.POST.get("reason") or "").strip()
-		tr.save(update_fields=["status", "reviewed_by", "review_reason", "updated_at"])
-		TranscriptRequestEvent.objects.create(
-			request=tr,
-			actor=request.user,
-			from_status=prev,
-			to_status=tr.status,
-			note=tr.review_reason,
-		)
-		_audit(request, action="transcript.request.approve", entity_type="transcript_request", entity_id=str(tr.id))
+		with transaction.atomic():
+			tr = _lock_for_transition(request, tr.id, _APPROVABLE, "approved")
+			if tr is None:
+				return redirect("portal:registrar_queue")
+			prev = tr.status
+			tr.status = TranscriptRequest.Status.APPROVED
+			tr.reviewed_by = request.user
+			tr.review_reason = (request.POST.get("reason") or "").strip()
+			tr.save(update_fields=["status", "reviewed_by", "review_reason", "updated_at"])
+			TranscriptRequestEvent.objects.create(
+				request=tr,
+				actor=request.user,
+				from_status=prev,
+				to_status=tr.status,
+				note=tr.review_reason,
+			)
+			_audit(request, action="transcript.request.approve", entity_type="transcript_request", entity_id=str(tr.id))
 		messages.success(request, "Approved.")
 		return redirect("portal:registrar_queue")
 	return render(request, "portal/registrar_action.html", {"tr": tr, "action": "approve"})
@@ -543,19 +866,23 @@ def registrar_reject(request: HttpRequest, request_id: int) -> HttpResponse:
 		if not reason:
 			messages.error(request, "Reason is required.")
 		else:
-			prev = tr.status
-			tr.status = TranscriptRequest.Status.REJECTED
-			tr.reviewed_by = request.user
-			tr.review_reason = reason
-			tr.save(update_fields=["status", "reviewed_by", "review_reason", "updated_at"])
-			TranscriptRequestEvent.objects.create(
-				request=tr,
-				actor=request.user,
-				from_status=prev,
-				to_status=tr.status,
-				note=reason,
-			)
-			_audit(request, action="transcript.request.reject", entity_type="transcript_request", entity_id=str(tr.id))
+			with transaction.atomic():
+				tr = _lock_for_transition(request, tr.id, _REJECTABLE, "rejected")
+				if tr is None:
+					return redirect("portal:registrar_queue")
+				prev = tr.status
+				tr.status = TranscriptRequest.Status.REJECTED
+				tr.reviewed_by = request.user
+				tr.review_reason = reason
+				tr.save(update_fields=["status", "reviewed_by", "review_reason", "updated_at"])
+				TranscriptRequestEvent.objects.create(
+					request=tr,
+					actor=request.user,
+					from_status=prev,
+					to_status=tr.status,
+					note=reason,
+				)
+				_audit(request, action="transcript.request.reject", entity_type="transcript_request", entity_id=str(tr.id))
 			messages.success(request, "Rejected.")
 			return redirect("portal:registrar_queue")
 	return render(request, "portal/registrar_action.html", {"tr": tr, "action": "reject"})
@@ -566,25 +893,30 @@ def registrar_issue(request: HttpRequest, request_id: int) -> HttpResponse:
 	_require_role(request, "REGISTRAR")
 	tr = get_object_or_404(TranscriptRequest, id=request_id)
 	if request.method == "POST":
-		prev = tr.status
-		tr.status = TranscriptRequest.Status.ISSUED
-		tr.reviewed_by = request.user
-		tr.issued_at = timezone.now()
-		tr.ensure_verification_code()
-		tr.save(update_fields=["status", "reviewed_by", "issued_at", "verification_code", "updated_at"])
-		TranscriptRequestEvent.objects.create(
-			request=tr,
-			actor=request.user,
-			from_status=prev,
-			to_status=tr.status,
-			note="Issued",
-		)
-		_audit(request, action="transcript.request.issue", entity_type="transcript_request", entity_id=str(tr.id))
+		with transaction.atomic():
+			tr = _lock_for_transition(request, tr.id, _ISSUABLE, "issued")
+			if tr is None:
+				return redirect("portal:registrar_queue")
+			prev = tr.status
+			tr.status = TranscriptRequest.Status.ISSUED
+			tr.reviewed_by = request.user
+			tr.issued_at = timezone.now()
+			tr.ensure_verification_code()
+			tr.save(update_fields=["status", "reviewed_by", "issued_at", "verification_code", "updated_at"])
+			TranscriptRequestEvent.objects.create(
+				request=tr,
+				actor=request.user,
+				from_status=prev,
+				to_status=tr.status,
+				note="Issued",
+			)
+			_audit(request, action="transcript.request.issue", entity_type="transcript_request", entity_id=str(tr.id))
 		messages.success(request, "Issued.")
 		return redirect("portal:registrar_queue")
 	return render(request, "portal/registrar_action.html", {"tr": tr, "action": "issue"})
 
 
+@transaction.non_atomic_requests
 @login_required
 def official_transcript_pdf(request: HttpRequest, request_id: int) -> HttpResponse:
 	_require_role(request, "REGISTRAR")
@@ -593,7 +925,10 @@ def official_transcript_pdf(request: HttpRequest, request_id: int) -> HttpRespon
 		raise Http404()
 
 	grades_qs = Grade.objects.select_related("section__term", "section__course").filter(student=tr.requester, released=True)
-	content = _build_unofficial_transcript_pdf(tr.requester, grades_qs.order_by("section__term__start_date", "section__course__code"))
+	rows = list(grades_qs.order_by("section__term__start_date", "section__course__code"))
+	started = time.perf_counter()
+	content = _build_unofficial_transcript_pdf(tr.requester, rows)
+	metrics.observe("portal_pdf_render_seconds", time.perf_counter() - started, {"document": "official_transcript"})
 
 	# Stamp a minimal verification line on first page (simple MVP).
 	buffer = BytesIO()
@@ -604,7 +939,9 @@ def official_transcript_pdf(request: HttpRequest, request_id: int) -> HttpRespon
 	return FileResponse(buffer, as_attachment=True, filename=f"official_transcript_TR{tr.id}.pdf")
 
 
+@transaction.non_atomic_requests
 @login_required
+@reads_from_replica
 def finance(request: HttpRequest) -> HttpResponse:
 	_require_role(request, "STUDENT", "ALUMNI", "FINANCE")
 	if is_in_role(request.user, "FINANCE") or request.user.is_superuser:
@@ -612,14 +949,15 @@ def finance(request: HttpRequest) -> HttpResponse:
 		invoices = FeeInvoice.objects.select_related("term", "student").order_by("-due_date")
 		if student_id:
 			invoices = invoices.filter(student_id=student_id)
-		return render(request, "portal/finance_staff.html", {"invoices": invoices})
+		return render(request, "portal/finance_staff.html", {"invoices": list(invoices)})
 	invoices = FeeInvoice.objects.select_related("term").filter(student=request.user).order_by("-due_date")
-	return render(request, "portal/finance.html", {"invoices": invoices})
+	return render(request, "portal/finance.html", {"invoices": list(invoices)})
 
 
+@transaction.non_atomic_requests
 @login_required
 def support(request: HttpRequest) -> HttpResponse:
-	items = SupportTicket.objects.filter(created_by=request.user).order_by("-updated_at")
+	items = list(SupportTicket.objects.filter(created_by=request.user).order_by("-updated_at"))
 	return render(request, "portal/support.html", {"tickets": items})
 
 
@@ -632,14 +970,15 @@ def support_new(request: HttpRequest) -> HttpResponse:
 		if not category or not subject or not description:
 			messages.error(request, "All fields are required.")
 		else:
-			t = SupportTicket.objects.create(
-				created_by=request.user,
-				category=category,
-				subject=subject,
-				description=description,
-				status=SupportTicket.Status.OPEN,
-			)
-			_audit(request, action="support.ticket.create", entity_type="support_ticket", entity_id=str(t.id))
+			with transaction.atomic():
+				t = SupportTicket.objects.create(
+					created_by=request.user,
+					category=category,
+					subject=subject,
+					description=description,
+					status=SupportTicket.Status.OPEN,
+				)
+				_audit(request, action="support.ticket.create", entity_type="support_ticket", entity_id=str(t.id))
 			messages.success(request, "Ticket created.")
 			return redirect("portal:support_detail", ticket_id=t.id)
 	return render(request, "portal/support_new.html")
@@ -654,10 +993,11 @@ def support_detail(request: HttpRequest, ticket_id: int) -> HttpResponse:
 	if request.method == "POST":
 		msg = (request.POST.get("message") or "").strip()
 		if msg:
-			SupportMessage.objects.create(ticket=t, author=request.user, message=msg)
-			t.updated_at = timezone.now()
-			t.save(update_fields=["updated_at"])
-			_audit(request, action="support.message.create", entity_type="support_ticket", entity_id=str(t.id))
+			with transaction.atomic():
+				SupportMessage.objects.create(ticket=t, author=request.user, message=msg)
+				t.updated_at = timezone.now()
+				t.save(update_fields=["updated_at"])
+				_audit(request, action="support.message.create", entity_type="support_ticket", entity_id=str(t.id))
 			return redirect("portal:support_detail", ticket_id=t.id)
 
 	ticket_messages = t.messages.select_related("author").order_by("created_at")
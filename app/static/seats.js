@@ -0,0 +1,14 @@
+// Live seat counts: subscribes to the seat stream given in data-stream and
+// updates every element with a matching data-seats-taken="<section id>".
+(function () {
+    var script = document.currentScript;
+    if (!window.EventSource || !script || !script.dataset.stream) return;
+    var source = new EventSource(script.dataset.stream);
+    source.addEventListener("seats", function (event) {
+        var seats = JSON.parse(event.data).seats;
+        Object.keys(seats).forEach(function (id) {
+            var cell = document.querySelector('[data-seats-taken="' + id + '"]');
+            if (cell) cell.textContent = seats[id];
+        });
+    });
+})();
@@ -13,4 +13,19 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'university_portal.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Live seat-count streams are served outside Django's request handling so an
+# idle connection doesn't hold a thread; see portal/streams.py. The lifespan
+# wrapper writes buffered audit rows and metrics when the server shuts down.
+from portal.lifecycle import with_lifespan  # noqa: E402  (needs apps loaded)
+from portal.streams import with_seat_stream  # noqa: E402
+
+application = with_lifespan(with_seat_stream(django_application))
+
+from django.conf import settings  # noqa: E402
+
+if settings.PORTAL_TEMPLATE_WARMUP:
+    from university_portal.warmup import warm_up
+
+    warm_up(pdf=False)
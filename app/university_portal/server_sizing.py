@@ -0,0 +1,72 @@
+"""Worker, thread and database pool sizes of the app server, from the environment.
+
+`gunicorn.conf.py` sizes its workers with `server_plan`, and the settings use
+the same plan for the Postgres pool size (settings_prod) and the process count
+of the capacity check (portal.W001, portal/db_pool.py). The check runs in
+`manage.py migrate` too, before gunicorn has started, so both sides have to
+work the numbers out from the same variables rather than pass them along.
+Stdlib only: gunicorn imports this before Django is set up.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Mapping
+
+UVICORN_WORKER = "uvicorn.workers.UvicornWorker"
+# Connections per process under uvicorn: the async views' thread pool, not the workers' threads.
+ASYNC_POOL_SIZE = 4
+
+
+def _env_int(environ: Mapping[str, str], name: str, default: int) -> int:
+	value = environ.get(name, "").strip()
+	return int(value) if value else default
+
+
+def cpu_count() -> int:
+	try:
+		# The CPUs this process may run on, which a container limits.
+		return len(os.sched_getaffinity(0))
+	except AttributeError:
+		return os.cpu_count() or 1
+
+
+@dataclass(frozen=True)
+class ServerPlan:
+	pool: str
+	worker_class: str
+	workers: int
+	threads: int
+	# Connections each process's Postgres pool may hold (DJANGO_DB_POOL_MAX_SIZE).
+	db_pool_size: int
+
+
+def server_plan(environ: Mapping[str, str] | None = None) -> ServerPlan:
+	"""The sizing for GUNICORN_POOL / GUNICORN_MODE (see gunicorn.conf.py)."""
+	environ = os.environ if environ is None else environ
+	pool = environ.get("GUNICORN_POOL", "web").strip().lower()
+	mode = environ.get("GUNICORN_MODE", "gthread").strip().lower()
+	cpus = cpu_count()
+	if pool == "pdf":
+		worker_class = "sync"
+		workers = _env_int(environ, "WEB_CONCURRENCY", cpus)
+		threads = 1
+	elif mode == "uvicorn":
+		worker_class = UVICORN_WORKER
+		workers = _env_int(environ, "WEB_CONCURRENCY", cpus + 1)
+		threads = 1
+	else:
+		io_share = min(max(float(environ.get("GUNICORN_IO_SHARE", "0.75")), 0.0), 0.95)
+		worker_class = "gthread"
+		workers = _env_int(environ, "WEB_CONCURRENCY", min(cpus + 1, _env_int(environ, "GUNICORN_MAX_WORKERS", 12)))
+		threads = _env_int(environ, "GUNICORN_THREADS", round(1 / (1 - io_share)))
+	# One connection per thread that may query at once.
+	default_pool_size = ASYNC_POOL_SIZE if worker_class == UVICORN_WORKER else max(threads, 2)
+	return ServerPlan(
+		pool=pool,
+		worker_class=worker_class,
+		workers=workers,
+		threads=threads,
+		db_pool_size=_env_int(environ, "DJANGO_DB_POOL_MAX_SIZE", default_pool_size),
+	)
@@ -12,6 +12,8 @@ from __future__ import annotations
 import os
 from pathlib import Path
 
+from .server_sizing import server_plan
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -63,11 +65,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'portal.instrumentation.PerformanceMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'portal.db_routing.PrimaryStickinessMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -102,6 +106,113 @@ DATABASES = {
     }
 }
 
+# Tuned SQLite profile for single-node deployments (portal/sqlite.py). The
+# PRAGMAs are applied to every new SQLite connection; write transactions start
+# with BEGIN IMMEDIATE so concurrent writers queue on the busy timeout instead
+# of failing with "database is locked" when a read lock can't be upgraded.
+# On by default in settings_prod when it runs on SQLite.
+PORTAL_SQLITE_TUNED = _env_bool("DJANGO_SQLITE_TUNED", False)
+PORTAL_SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "busy_timeout": int(os.environ.get("DJANGO_SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "synchronous": "NORMAL",
+    "mmap_size": int(os.environ.get("DJANGO_SQLITE_MMAP_BYTES", str(128 * 1024 * 1024))),
+    # Negative means KiB: a 32 MiB page cache per connection.
+    "cache_size": -int(os.environ.get("DJANGO_SQLITE_CACHE_KIB", str(32 * 1024))),
+    "temp_store": "MEMORY",
+}
+PORTAL_SQLITE_OPTIONS = {
+    "transaction_mode": "IMMEDIATE",
+    "timeout": PORTAL_SQLITE_PRAGMAS["busy_timeout"] / 1000,
+}
+if PORTAL_SQLITE_TUNED:
+    DATABASES['default']['OPTIONS'] = dict(PORTAL_SQLITE_OPTIONS)
+
+# Read replicas (portal.db_routing). Each URL in DATABASE_REPLICA_URLS becomes a
+# `replica<N>` alias that read-only views read from, e.g. for a local trial:
+#   cp db.sqlite3 replica.sqlite3
+#   DATABASE_REPLICA_URLS=sqlite:///replica.sqlite3 python manage.py runserver
+_replica_urls = _env_csv("DATABASE_REPLICA_URLS")
+PORTAL_DB_REPLICAS = [f"replica{n}" for n in range(1, len(_replica_urls) + 1)]
+if _replica_urls:
+    import dj_database_url
+
+    for _alias, _url in zip(PORTAL_DB_REPLICAS, _replica_urls):
+        # Tests run against the primary's test database instead of one per replica.
+        DATABASES[_alias] = {**dj_database_url.parse(_url), "TEST": {"MIRROR": "default"}}
+DATABASE_ROUTERS = ["portal.db_routing.ReplicaRouter"]
+# Seconds a browser keeps reading from the primary after it writes.
+PORTAL_REPLICA_STICKY_SECONDS = int(os.environ.get("DJANGO_REPLICA_STICKY_SECONDS", "10"))
+# How often each process re-probes a replica, and the replay lag (Postgres) at which it is skipped.
+PORTAL_REPLICA_CHECK_SECONDS = float(os.environ.get("DJANGO_REPLICA_CHECK_SECONDS", "5"))
+PORTAL_REPLICA_MAX_LAG_SECONDS = float(os.environ.get("DJANGO_REPLICA_MAX_LAG_SECONDS", "10"))
+# Connection pooling (settings_prod, Postgres): processes that each open their own
+# pool (all app servers together; defaults to this server's gunicorn workers, worked
+# out from the same variables as gunicorn.conf.py so `migrate` sees them too), and
+# the server's connection limit when it should not be read from `SHOW max_connections`.
+# See portal/db_pool.py and university_portal/server_sizing.py.
+PORTAL_DB_CLIENT_PROCESSES = int(os.environ.get("DJANGO_DB_CLIENT_PROCESSES") or server_plan().workers)
+PORTAL_DB_MAX_CONNECTIONS = int(os.environ.get("DJANGO_DB_MAX_CONNECTIONS") or "0")
+
+
+# Cache layer. Every app cache (dashboard panels, roles, catalog, seat counts,
+# version counters, feeds) and the sessions use the `default` cache, picked by
+# DJANGO_CACHE_URL:
+#   locmem://                 per process (the development default)
+#   file:///var/cache/portal  shared by the processes on one host (production default)
+#   redis://host:6379/0       shared by every host (any Redis-compatible server)
+# With more than one worker, use a shared cache: version bumps and seat counts
+# written by one worker must be seen by the others.
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "rediss": "django.core.cache.backends.redis.RedisCache",
+    "dummy": "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def _cache_from_url(url: str) -> dict:
+    from urllib.parse import urlparse
+
+    from django.core.exceptions import ImproperlyConfigured
+
+    parsed = urlparse(url)
+    if parsed.scheme not in CACHE_BACKENDS:
+        raise ImproperlyConfigured(
+            f"DJANGO_CACHE_URL scheme {parsed.scheme!r} is not one of {', '.join(sorted(CACHE_BACKENDS))}"
+        )
+    config = {
+        "BACKEND": CACHE_BACKENDS[parsed.scheme],
+        "KEY_PREFIX": os.environ.get("DJANGO_CACHE_KEY_PREFIX", "portal"),
+        "TIMEOUT": int(os.environ.get("DJANGO_CACHE_TIMEOUT", "300")),
+    }
+    if parsed.scheme == "locmem":
+        config["LOCATION"] = parsed.netloc or "portal"
+        config["OPTIONS"] = {"MAX_ENTRIES": int(os.environ.get("DJANGO_CACHE_MAX_ENTRIES", "10000"))}
+    elif parsed.scheme == "file":
+        if not parsed.path:
+            raise ImproperlyConfigured("DJANGO_CACHE_URL file:// needs an absolute directory, e.g. file:///var/cache/portal")
+        config["LOCATION"] = parsed.path
+        # Each cull lists the directory, so keep it rare: FileBasedCache's default is 300 entries.
+        config["OPTIONS"] = {"MAX_ENTRIES": int(os.environ.get("DJANGO_CACHE_MAX_ENTRIES", "50000")), "CULL_FREQUENCY": 4}
+    elif parsed.scheme in {"redis", "rediss"}:
+        config["LOCATION"] = url
+    return config
+
+
+CACHES = {"default": _cache_from_url(os.environ.get("DJANGO_CACHE_URL", "locmem://"))}
+
+# Sessions are read from the cache and fall back to (and are saved to) the
+# database, see portal/sessions.py. With DJANGO_SESSION_SAVE_EVERY_REQUEST=1
+# (sliding expiry) a save that only extends the expiry refreshes the cache and
+# writes the row back at most every DJANGO_SESSION_WRITE_BACK_SECONDS
+# (0 = write every save through to the database).
+SESSION_ENGINE = "portal.sessions"
+SESSION_CACHE_ALIAS = "default"
+SESSION_SAVE_EVERY_REQUEST = _env_bool("DJANGO_SESSION_SAVE_EVERY_REQUEST", False)
+PORTAL_SESSION_WRITE_BACK_SECONDS = int(os.environ.get("DJANGO_SESSION_WRITE_BACK_SECONDS", "300"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -151,6 +262,54 @@ LOGIN_URL = 'portal:login'
 LOGIN_REDIRECT_URL = 'portal:dashboard'
 LOGOUT_REDIRECT_URL = 'portal:login'
 
+# Per-request performance instrumentation (portal.instrumentation).
+# Fraction of requests that record query count, DB/template/total time.
+PORTAL_PERF_SAMPLE_RATE = float(os.environ.get("DJANGO_PERF_SAMPLE_RATE", "1.0"))
+PORTAL_PERF_SERVER_TIMING = _env_bool("DJANGO_PERF_SERVER_TIMING", True)
+
+# Metrics (/metrics, Prometheus text format). Set DJANGO_METRICS_DIR to a directory
+# shared by all gunicorn workers on the host to aggregate their metrics.
+PORTAL_METRICS_DIR = os.environ.get("DJANGO_METRICS_DIR", "").strip() or None
+PORTAL_METRICS_FLUSH_SECONDS = float(os.environ.get("DJANGO_METRICS_FLUSH_SECONDS", "5"))
+# Optional bearer token required by /metrics.
+PORTAL_METRICS_TOKEN = os.environ.get("DJANGO_METRICS_TOKEN", "").strip()
+
+# Audit log buffering (0 = write each audit row immediately).
+PORTAL_AUDIT_BUFFER_SIZE = int(os.environ.get("DJANGO_AUDIT_BUFFER_SIZE", "0"))
+PORTAL_AUDIT_FLUSH_SECONDS = float(os.environ.get("DJANGO_AUDIT_FLUSH_SECONDS", "5"))
+
+# Section availability cache (seats taken per term) used by registration pages.
+# Counts are recomputed after FRESH seconds; while one worker recomputes, others
+# may serve the previous copy until it is STALE seconds old.
+PORTAL_AVAILABILITY_FRESH_SECONDS = float(os.environ.get("DJANGO_AVAILABILITY_FRESH_SECONDS", "1"))
+PORTAL_AVAILABILITY_STALE_SECONDS = float(os.environ.get("DJANGO_AVAILABILITY_STALE_SECONDS", "2"))
+# How often each ASGI process re-reads that cache for its open seat streams, to pick
+# up enrollments committed in other processes (portal/streams.py).
+PORTAL_SEAT_STREAM_POLL_SECONDS = float(os.environ.get("DJANGO_SEAT_STREAM_POLL_SECONDS", "1"))
+
+# Serve the read-heavy pages with the async views in portal.async_views (for ASGI servers).
+PORTAL_ASYNC_VIEWS = _env_bool("DJANGO_ASYNC_VIEWS", False)
+
+# Compile every template when the WSGI/ASGI app loads (university_portal/warmup.py)
+# instead of on each template's first request. A preloaded gunicorn already does
+# this before forking; turn it on for servers that load the app per worker.
+PORTAL_TEMPLATE_WARMUP = _env_bool("DJANGO_TEMPLATE_WARMUP", False)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # Set DJANGO_PORTAL_LOG_LEVEL=INFO to emit one JSON line per sampled request.
+        'portal': {
+            'handlers': ['console'],
+            'level': os.environ.get('DJANGO_PORTAL_LOG_LEVEL', 'WARNING'),
+        },
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
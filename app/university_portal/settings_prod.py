@@ -9,11 +9,15 @@ This module intentionally enforces environment-provided secrets and secure defau
 from __future__ import annotations
 
 import os
+import tempfile
+from pathlib import Path
 from urllib.parse import urlparse
 
 import dj_database_url
 
+from .server_sizing import server_plan
 from .settings import *  # noqa: F403
+from .settings import _cache_from_url
 
 
 def _env_bool(name: str, default: bool = False) -> bool:
@@ -23,6 +27,11 @@ def _env_bool(name: str, default: bool = False) -> bool:
 	return val.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _env_int(name: str, default: int) -> int:
+	val = (os.environ.get(name) or "").strip()
+	return int(val) if val else default
+
+
 def _env_csv(name: str) -> list[str]:
 	val = (os.environ.get(name) or "").strip()
 	if not val:
@@ -37,6 +46,11 @@ SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", "").strip()  # noqa: F405
 if not SECRET_KEY:
 	raise RuntimeError("DJANGO_SECRET_KEY is required in production")
 
+# /metrics lists every view, template and queue of the site; never serve it unauthenticated.
+PORTAL_METRICS_TOKEN = os.environ.get("DJANGO_METRICS_TOKEN", "").strip()  # noqa: F405
+if not PORTAL_METRICS_TOKEN:
+	raise RuntimeError("DJANGO_METRICS_TOKEN is required in production")
+
 
 # --- Hosts / origins ---
 ALLOWED_HOSTS = _env_csv("DJANGO_ALLOWED_HOSTS")  # noqa: F405
@@ -78,18 +92,59 @@ X_FRAME_OPTIONS = os.environ.get("DJANGO_X_FRAME_OPTIONS", "DENY")  # noqa: F405
 SECURE_REFERRER_POLICY = os.environ.get("DJANGO_SECURE_REFERRER_POLICY", "same-origin")  # noqa: F405
 
 
+# --- Performance instrumentation ---
+# Sample a small fraction of requests; don't expose timings to clients by default.
+PORTAL_PERF_SAMPLE_RATE = float(os.environ.get("DJANGO_PERF_SAMPLE_RATE", "0.05"))  # noqa: F405
+PORTAL_PERF_SERVER_TIMING = _env_bool("DJANGO_PERF_SERVER_TIMING", False)  # noqa: F405
+
+
 # --- Static files ---
 # For real production, serve static files via CDN/reverse-proxy.
 STATIC_ROOT = BASE_DIR / "staticfiles"  # noqa: F405
 
 # Simple static serving for small deployments (reverse proxy still recommended).
-MIDDLEWARE.insert(1, "whitenoise.middleware.WhiteNoiseMiddleware")  # noqa: F405
+# The portal's subclass is async-capable so ASGI streaming views don't need a thread each.
+MIDDLEWARE.insert(1, "portal.middleware.AsyncWhiteNoiseMiddleware")  # noqa: F405
 STORAGES = {  # noqa: F405
 	"default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
 	"staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
 }
 
 
+# --- Cache ---
+# Shared by the workers on this host unless DJANGO_CACHE_URL points elsewhere
+# (redis://... for more than one host); see settings.py.
+CACHES = {  # noqa: F405
+	"default": _cache_from_url(
+		os.environ.get("DJANGO_CACHE_URL") or f"file://{Path(tempfile.gettempdir()) / 'university-portal-cache'}"
+	)
+}
+
+
+# --- Templates ---
+# Spelled out rather than left to APP_DIRS: each template (and the base.html
+# every page extends) is read and compiled once per process, then served from
+# the cached loader's memory. DJANGO_TEMPLATE_WARMUP=1 compiles them all at start-up.
+TEMPLATES = [  # noqa: F405
+	{
+		**TEMPLATES[0],  # noqa: F405
+		"APP_DIRS": False,
+		"OPTIONS": {
+			**TEMPLATES[0]["OPTIONS"],  # noqa: F405
+			"loaders": [
+				(
+					"django.template.loaders.cached.Loader",
+					[
+						"django.template.loaders.filesystem.Loader",
+						"django.template.loaders.app_directories.Loader",
+					],
+				)
+			],
+		},
+	}
+]
+
+
 # --- Admin security (optional but recommended) ---
 # If you want to force admin login over HTTPS even when other pages don't:
 # SECURE_SSL_REDIRECT = True
@@ -98,15 +153,61 @@ STORAGES = {  # noqa: F405
 # --- Database (optional override) ---
 # This demo uses SQLite by default.
 # Provide DATABASE_URL for production deployments.
-database_url = (os.environ.get("DATABASE_URL") or "").strip()
-if database_url:
+#
+# On Postgres each process keeps a psycopg connection pool (DJANGO_DB_POOL=0 falls
+# back to persistent connections). DJANGO_DB_POOL_MAX_SIZE caps the connections
+# one process may hold; it defaults to the threads that query at once (gthread
+# threads, or the async views' thread pool under uvicorn; see server_sizing.py). Pools hand out only
+# connections that pass a check, recycle them after DJANGO_DB_POOL_MAX_LIFETIME
+# and close idle ones above DJANGO_DB_POOL_MIN_SIZE. portal/db_pool.py warns when
+# processes x max size exceeds the server's max_connections.
+db_pool = _env_bool("DJANGO_DB_POOL", True)
+db_pool_options = {
+	"min_size": _env_int("DJANGO_DB_POOL_MIN_SIZE", 2),
+	"max_size": server_plan().db_pool_size,
+	# Seconds a request waits for a free connection before failing.
+	"timeout": _env_int("DJANGO_DB_POOL_TIMEOUT", 10),
+	"max_idle": _env_int("DJANGO_DB_POOL_MAX_IDLE", 300),
+	"max_lifetime": _env_int("DJANGO_DB_POOL_MAX_LIFETIME", 1800),
+}
+
+
+def _database(url: str, *, atomic_requests: bool) -> dict:
 	db_ssl_require = _env_bool("DJANGO_DB_SSL_REQUIRE", True)
-	scheme = urlparse(database_url).scheme.lower()
+	scheme = urlparse(url).scheme.lower()
 	ssl_require = db_ssl_require if scheme in {"postgres", "postgresql", "postgis"} else False
-	db_config = dj_database_url.parse(database_url, conn_max_age=60, ssl_require=ssl_require)
+	db_config = dj_database_url.parse(url, conn_max_age=60, conn_health_checks=True, ssl_require=ssl_require)
 	# Postgres-specific tuning (avoid passing unsupported params to other engines like SQLite).
 	if scheme in {"postgres", "postgresql", "postgis"}:
 		db_config.setdefault("OPTIONS", {})
 		db_config["OPTIONS"].setdefault("connect_timeout", 5)
-		db_config["ATOMIC_REQUESTS"] = True
-	DATABASES = {"default": db_config}  # noqa: F405
+		db_config["ATOMIC_REQUESTS"] = atomic_requests
+		if db_pool:
+			# Pooled connections go back to the pool after each request instead of persisting.
+			db_config["CONN_MAX_AGE"] = 0
+			db_config["OPTIONS"]["pool"] = dict(db_pool_options)
+	return db_config
+
+
+database_url = (os.environ.get("DATABASE_URL") or "").strip()
+if database_url:
+	# Views open their own short `transaction.atomic()` blocks around writes, so
+	# reads and PDF rendering run in autocommit instead of holding a transaction
+	# (and its snapshot/locks) for the whole request. DJANGO_DB_ATOMIC_REQUESTS=1
+	# restores the old wrap-every-view behaviour; read-only and PDF views opt out
+	# of it with @transaction.non_atomic_requests either way.
+	DATABASES = {  # noqa: F405
+		"default": _database(database_url, atomic_requests=_env_bool("DJANGO_DB_ATOMIC_REQUESTS", False))
+	}
+
+# Without DATABASE_URL (or with a sqlite:// one) production runs on SQLite;
+# use the tuned profile there unless DJANGO_SQLITE_TUNED=0 (see settings.py).
+PORTAL_SQLITE_TUNED = _env_bool("DJANGO_SQLITE_TUNED", True)  # noqa: F405
+if PORTAL_SQLITE_TUNED and DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":  # noqa: F405
+	_sqlite_options = {**DATABASES["default"].get("OPTIONS", {}), **PORTAL_SQLITE_OPTIONS}  # noqa: F405
+	DATABASES = {**DATABASES, "default": {**DATABASES["default"], "OPTIONS": _sqlite_options}}  # noqa: F405
+
+# Read replicas (DATABASE_REPLICA_URLS, comma-separated): see portal/db_routing.py.
+# Replicas only serve reads, so their requests aren't wrapped in transactions.
+for alias, url in zip(PORTAL_DB_REPLICAS, _env_csv("DATABASE_REPLICA_URLS")):  # noqa: F405
+	DATABASES[alias] = {**_database(url, atomic_requests=False), "TEST": {"MIRROR": "default"}}  # noqa: F405
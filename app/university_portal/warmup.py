@@ -0,0 +1,87 @@
+"""Load what a worker would otherwise load lazily on its first requests.
+
+Called by the gunicorn config (`gunicorn.conf.py`) in the master process when
+the app is preloaded, before workers are forked. The URLconf with every view
+module, the compiled templates (kept by Django's cached template loader) and
+ReportLab are then loaded once and shared copy-on-write by all workers instead
+of being loaded again, and slowly, in each worker. With
+`PORTAL_TEMPLATE_WARMUP` on, `wsgi.py` and `asgi.py` also warm the URLconf and
+templates (not ReportLab) wherever the app is loaded, for servers that load it
+in each worker instead.
+
+Nothing here may open a database connection: a connection inherited across
+`fork()` would be shared by every worker.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from io import BytesIO
+from pathlib import Path
+
+logger = logging.getLogger("portal.startup")
+
+TEMPLATE_SUFFIXES = (".html", ".txt", ".ics")
+
+
+def _load_urls() -> int:
+	from django.urls import get_resolver
+
+	# Build the reverse() lookup tables of the root and every namespace, which
+	# imports every view module on the way.
+	count = 0
+	resolvers = [get_resolver()]
+	while resolvers:
+		resolver = resolvers.pop()
+		count += sum(1 for key in resolver.reverse_dict if isinstance(key, str))
+		resolvers.extend(sub for _, sub in resolver.namespace_dict.values())
+	return count
+
+
+def _compile_templates() -> int:
+	from django.template import TemplateSyntaxError, engines
+
+	count = 0
+	for engine in engines.all():
+		for directory in getattr(engine, "template_dirs", ()):
+			root = Path(directory)
+			for path in root.rglob("*"):
+				if path.suffix not in TEMPLATE_SUFFIXES or not path.is_file():
+					continue
+				try:
+					engine.get_template(path.relative_to(root).as_posix())
+				except TemplateSyntaxError as exc:
+					logger.warning("warm-up could not compile %s: %s", path, exc)
+					continue
+				count += 1
+	return count
+
+
+def _load_pdf() -> int:
+	from reportlab.lib.pagesizes import letter
+	from reportlab.pdfgen import canvas
+
+	# Rendering one page also loads the standard font metrics the transcripts use.
+	pdf = canvas.Canvas(BytesIO(), pagesize=letter)
+	pdf.setFont("Helvetica-Bold", 16)
+	pdf.drawString(50, 50, "warm-up")
+	pdf.save()
+	return 1
+
+
+def warm_up(*, pdf: bool = True) -> dict[str, float]:
+	"""Warm the URLconf, templates and (optionally) ReportLab; return seconds per step."""
+	from django.db import connections
+
+	steps = [("urls", _load_urls), ("templates", _compile_templates)]
+	if pdf:
+		steps.append(("pdf", _load_pdf))
+	timings = {}
+	for name, step in steps:
+		started = time.perf_counter()
+		loaded = step()
+		timings[name] = time.perf_counter() - started
+		logger.info("warm-up %s: %d loaded in %.0f ms", name, loaded, timings[name] * 1000)
+	connections.close_all()
+	return timings
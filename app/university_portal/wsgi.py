@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'university_portal.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.PORTAL_TEMPLATE_WARMUP:
+    from university_portal.warmup import warm_up
+
+    warm_up(pdf=False)
@@ -3,9 +3,18 @@ set -eu
 
 cd /workspace/app
 
+# Workers, threads, timeouts and recycling come from app/gunicorn.conf.py.
+# APP_SERVER=uvicorn (or GUNICORN_MODE=uvicorn) serves over ASGI with uvicorn
+# workers and the async read views; GUNICORN_POOL=pdf runs the transcript PDF
+# pool (see README). Set before `migrate`: its pool capacity check (portal.W001)
+# sizes the workers and pools the same way (university_portal/server_sizing.py).
+if [ "${APP_SERVER:-gunicorn}" = "uvicorn" ]; then
+  export GUNICORN_MODE=uvicorn
+fi
+
 # Run DB migrations and prepare static assets on startup.
 # These are idempotent and safe to run on each release.
 python manage.py migrate --noinput
 python manage.py collectstatic --noinput
 
-exec gunicorn university_portal.wsgi:application --bind 0.0.0.0:${PORT:-8000}
+exec gunicorn
@@ -17,6 +17,7 @@ fi
 # Required by settings_prod.py
 export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:-university_portal.settings_prod}"
 export DJANGO_SECRET_KEY="${DJANGO_SECRET_KEY:-dev-verify-not-for-production-change-me-$(printf 'x%.0s' {1..48})}"
+export DJANGO_METRICS_TOKEN="${DJANGO_METRICS_TOKEN:-dev-verify-metrics-token}"
 export DJANGO_ALLOWED_HOSTS="${DJANGO_ALLOWED_HOSTS:-localhost,127.0.0.1}"
 
 # Helpful for deploy checks and CSRF; safe defaults for local verification.